@@ -0,0 +1,76 @@
+"""
+Compare two load benchmark result files.
+
+    python -m benchmarks.compare benchmarks/results/abc123-1k.json \\
+        benchmarks/results/def456-1k.json --threshold 0.10
+
+Prints the change in p50/p95/p99 and throughput for every route and
+concurrency level present in both files, and exits non-zero if any p95
+got worse by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> tuple:
+    """Read a results file and index it by (method, route, concurrency)."""
+    with open(path, encoding="utf-8") as file:
+        report = json.load(file)
+    return report, {
+        (row["method"], row["route"], row["concurrency"]): row
+        for row in report["results"]
+    }
+
+
+def change(old: float, new: float) -> float:
+    """Relative change from old to new (0.1 == 10% higher)."""
+    return (new - old) / old if old else 0.0
+
+
+def main(argv=None) -> int:
+    """Print the comparison and return the exit code."""
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed relative p95 slowdown before failing (default 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    old_report, old_rows = load(args.baseline)
+    new_report, new_rows = load(args.candidate)
+    print(
+        f"{old_report['commit']} -> {new_report['commit']} "
+        f"(scale {old_report['scale']} -> {new_report['scale']})"
+    )
+
+    regressions = 0
+    for key in sorted(old_rows.keys() & new_rows.keys()):
+        old, new = old_rows[key], new_rows[key]
+        p95_change = change(old["p95_ms"], new["p95_ms"])
+        flag = ""
+        if p95_change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        method, route, concurrency = key
+        print(
+            f"{method:<5} {route:<40} c={concurrency:<4} "
+            f"p50 {change(old['p50_ms'], new['p50_ms']):+7.1%} "
+            f"p95 {p95_change:+7.1%} "
+            f"p99 {change(old['p99_ms'], new['p99_ms']):+7.1%} "
+            f"rps {change(old['throughput_rps'], new['throughput_rps']):+7.1%}"
+            f"{flag}"
+        )
+    if regressions:
+        print(f"{regressions} route(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+Load benchmark for every API and HTML route.
+
+Starts a throwaway local mongod (or uses --mongodb-uri), seeds it with
+synthetic data at the chosen scale, then drives each route in api_router and
+html_router in-process at several concurrency levels. Reports p50/p95/p99
+latency, throughput and RSS, and writes the results as JSON so runs can be
+compared across commits with ``python -m benchmarks.compare``.
+
+Run from the project root, for example:
+
+    python -m benchmarks.load --scale 1k --concurrency 1,10,50
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import re
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+BENCH_DB_NAME = "rocketracker_bench"
+
+LAUNCH_BODY = {
+    "boosterNumber": 14,
+    "shipNumber": 35,
+    "boosterFlightCount": 2,
+    "shipFlightCount": 1,
+    "launchSite": "Starbase",
+    "launchDate": "2026-03-01",
+    "launchTime": "12:30",
+}
+MISSION_BODY = {
+    "launch_id": "",
+    "mission_category": "starlink",
+    "starlink_count": 24,
+    "group": "10-1",
+}
+NEWS_BODY = {
+    "title": "Benchmark post",
+    "content": "Written by the load benchmark.",
+    "author": "bench",
+}
+# Responses that never end; a request to them would never complete
+STREAMING_ROUTES = frozenset({"/api/stream"})
+# Numbers each submitted body, so writes are not all rejected as duplicates
+_submissions = itertools.count()
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1_048_576
+    except (OSError, ValueError):
+        # Not Linux: fall back to the peak, which is reported in KB here
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1)
+    return sorted_values[max(index, 0)]
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, or 'unknown'."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_mongod(binary: str):
+    """Run a throwaway mongod on a free port, yielding its URI."""
+    from pymongo import MongoClient  # pylint: disable=import-outside-toplevel
+
+    path = shutil.which(binary)
+    if path is None:
+        sys.exit(f"Could not find {binary}; install MongoDB or pass --mongodb-uri")
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix="rocketracker-bench-") as dbpath:
+        process = subprocess.Popen(  # pylint: disable=consider-using-with
+            [path, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        uri = f"mongodb://127.0.0.1:{port}"
+        try:
+            MongoClient(uri, serverSelectionTimeoutMS=20_000).admin.command("ping")
+            yield uri
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def build_requests(samples: dict) -> list:
+    """One (method, template, url, body) entry per route in both routers.
+
+    Streaming routes are left out.
+
+    ``body`` is None or a function returning a fresh body for each request.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.api.routes import api_router
+    from src.web.routes import html_router
+
+    def launch():
+        n = next(_submissions)
+        return {**LAUNCH_BODY, "livestream": f"https://example.com/bench/{n}"}
+
+    def news():
+        return {**NEWS_BODY, "content": f"{NEWS_BODY['content']} #{next(_submissions)}"}
+
+    def mission():
+        n = next(_submissions)
+        return {
+            **MISSION_BODY,
+            "launch_id": samples["launch_id"],
+            "additional_notes": f"bench {n}",
+        }
+
+    bodies = {
+        "/api/report/launch": launch,
+        "/api/report/launch/bulk": lambda: [launch() for _ in range(10)],
+        "/api/news/post": news,
+        "/api/missions": mission,
+        "/api/missions/bulk": lambda: [mission() for _ in range(10)],
+    }
+    requests = []
+    for prefix, router in (("/api", api_router), ("", html_router)):
+        for route in router.routes:
+            template = prefix + route.path
+            if template in STREAMING_ROUTES:
+                continue
+            url = re.sub(
+                r"{(\w+)(?::\w+)?}", lambda m: samples.get(m.group(1), "1"), template
+            )
+            for method in sorted(route.methods):
+                requests.append((method, template, url, bodies.get(template)))
+    return requests
+
+
+async def drive(client, method, url, body, total: int, concurrency: int) -> dict:
+    """Issue total requests with the given concurrency and summarise them."""
+    latencies = []
+    statuses = {}
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            json_body = body() if body is not None else None
+            response = await client.request(method, url, json=json_body)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": total,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "rss_mb": round(rss_mb(), 1),
+    }
+
+
+async def run(args, samples: dict) -> list:
+    """Drive every route at every concurrency level."""
+    import httpx  # pylint: disable=import-outside-toplevel
+
+    from src.server import create_app  # pylint: disable=import-outside-toplevel
+
+    app = create_app()
+    skip = re.compile(args.skip) if args.skip else None
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=300
+        ) as client:
+            for method, template, url, body in build_requests(samples):
+                if skip and skip.search(template):
+                    continue
+                for concurrency in args.concurrency:
+                    summary = await drive(
+                        client, method, url, body, args.requests, concurrency
+                    )
+                    results.append(
+                        {
+                            "method": method,
+                            "route": template,
+                            "concurrency": concurrency,
+                            **summary,
+                        }
+                    )
+                    print(
+                        f"{method:<5} {template:<40} c={concurrency:<4} "
+                        f"p50={summary['p50_ms']:>9.2f}ms "
+                        f"p95={summary['p95_ms']:>9.2f}ms "
+                        f"p99={summary['p99_ms']:>9.2f}ms "
+                        f"{summary['throughput_rps']:>9.1f} req/s "
+                        f"rss={summary['rss_mb']:.0f}MB"
+                    )
+    return results
+
+
+def parse_args(argv=None):
+    """Command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", choices=["1k", "100k", "1m"], default="1k")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 10, 50],
+        help="comma-separated concurrency levels (default 1,10,50)",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="requests per route and level"
+    )
+    parser.add_argument(
+        "--skip",
+        help="regex of route templates to leave out, e.g. '^/api/getlaunches$'",
+    )
+    parser.add_argument(
+        "--mongodb-uri", help="use this MongoDB instead of starting a local mongod"
+    )
+    parser.add_argument("--mongod", default="mongod", help="mongod binary to start")
+    parser.add_argument("--output", help="results file (default benchmarks/results/)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Seed, benchmark and write the results file."""
+    from pymongo import MongoClient  # pylint: disable=import-outside-toplevel
+
+    from benchmarks.seed import seed  # pylint: disable=import-outside-toplevel
+
+    args = parse_args(argv)
+    commit = git_commit()
+
+    if args.mongodb_uri:
+        mongodb = nullcontext(args.mongodb_uri)
+    else:
+        mongodb = local_mongod(args.mongod)
+
+    with mongodb as uri:
+        print(f"Seeding {args.scale} documents per collection...")
+        started = time.perf_counter()
+        samples = seed(MongoClient(uri)[BENCH_DB_NAME], args.scale)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+        # The app reads its configuration from the environment on import
+        os.environ["MONGODB_URI"] = uri
+        os.environ["MONGODB_DB_NAME"] = BENCH_DB_NAME
+        os.environ["RATELIMIT"] = "false"
+        results = asyncio.run(run(args, samples))
+
+    report = {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "scale": args.scale,
+        "concurrency": args.concurrency,
+        "requests_per_level": args.requests,
+        "python": platform.python_version(),
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "results": results,
+    }
+    output = Path(args.output or RESULTS_DIR / f"{commit}-{args.scale}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Synthetic data for benchmarks.
+
+Generates launches, missions and news posts shaped like the documents the
+API writes, and bulk-loads them into a MongoDB database in bounded batches
+so even the 1M scale never holds the whole data set in memory.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from bson import ObjectId
+
+SCALES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+SITES = ["Starbase", "LC-39A", "SLC-37", "Gulf of Mexico"]
+CATEGORIES = ["starlink", "propellant", "cargo", "crew", "test", "other"]
+BATCH_SIZE = 10_000
+
+
+def launches(count: int, rng: random.Random) -> Iterator[dict]:
+    """Yield synthetic launch reports."""
+    start = datetime(2023, 4, 20)
+    for index in range(count):
+        when = start + timedelta(minutes=index * 37)
+        yield {
+            "_id": ObjectId(),
+            "boosterNumber": rng.randint(1, 40),
+            "shipNumber": rng.randint(20, 60),
+            "boosterFlightCount": rng.randint(1, 20),
+            "shipFlightCount": rng.randint(1, 10),
+            "launchSite": rng.choice(SITES),
+            "launchDate": when.strftime("%Y-%m-%d"),
+            "launchTime": when.strftime("%H:%M"),
+            "livestream": "https://example.com/live",
+            "timestamp": when.isoformat(),
+        }
+
+
+def missions(launch_ids: list, count: int, rng: random.Random) -> Iterator[dict]:
+    """Yield synthetic mission reports attached to the given launches."""
+    for _ in range(count):
+        category = rng.choice(CATEGORIES)
+        yield {
+            "launch_id": str(rng.choice(launch_ids)),
+            "mission_category": category,
+            "starlink_count": rng.randint(20, 60) if category == "starlink" else None,
+            "group": f"{rng.randint(1, 12)}-{rng.randint(1, 30)}",
+            "payload_description": "Synthetic payload",
+            "destination": "LEO",
+            "additional_notes": None,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+
+def news_posts(count: int, rng: random.Random) -> Iterator[dict]:
+    """Yield synthetic news posts."""
+    start = datetime(2023, 1, 1)
+    for index in range(count):
+        yield {
+            "title": f"Flight update {index}",
+            "content": "Synthetic news content about booster catches. " * 5,
+            "author": rng.choice(["alice", "bob", "carol"]),
+            "timestamp": (start + timedelta(hours=index)).isoformat(),
+        }
+
+
+def _insert_batched(collection, documents: Iterator[dict]) -> int:
+    total = 0
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= BATCH_SIZE:
+            collection.insert_many(batch, ordered=False)
+            total += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        total += len(batch)
+    return total
+
+
+def seed(db, scale: str, seed_value: int = 42) -> dict:
+    """Replace the benchmark database contents with data at the given scale.
+
+    ``db`` is a synchronous pymongo Database. Returns sample values for route
+    parameters (a real launch id, ship, booster and news post id).
+    """
+    count = SCALES[scale]
+    rng = random.Random(seed_value)
+    for name in ("launch_reports", "missions", "news_posts", "fleet_summary"):
+        db[name].drop()
+
+    # Keep a sample of ids for mission references without storing them all
+    launch_ids = []
+    sample_launch = None
+
+    def tracked_launches():
+        nonlocal sample_launch
+        for launch in launches(count, rng):
+            if len(launch_ids) < 10_000:
+                launch_ids.append(launch["_id"])
+            sample_launch = sample_launch or launch
+            yield launch
+
+    _insert_batched(db.launch_reports, tracked_launches())
+    _insert_batched(db.missions, missions(launch_ids, count, rng))
+    _insert_batched(db.news_posts, news_posts(max(count // 10, 10), rng))
+    sample_post = db.news_posts.find_one({}, {"_id": 1})
+    if sample_launch is None or sample_post is None:
+        raise RuntimeError(f"Seeding at scale {scale} stored no launches or news")
+    return {
+        "launch_id": str(sample_launch["_id"]),
+        "ship_id": str(sample_launch["shipNumber"]),
+        "booster_id": str(sample_launch["boosterNumber"]),
+        "post_id": str(sample_post["_id"]),
+    }
@@ -0,0 +1,88 @@
+"""
+Serialization benchmark for launch listings.
+
+Compares the old response path (stringify every ``_id``, then FastAPI's
+``jsonable_encoder`` and ``JSONResponse``) with ``BSONJSONResponse``.
+
+Run from the project root with ``python -m benchmarks.serialization``.
+"""
+
+import argparse
+import copy
+import random
+import statistics
+import time
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.responses import BSONJSONResponse
+
+SITES = ["Starbase", "LC-39A", "SLC-37", "Gulf of Mexico"]
+
+
+def make_launches(count: int) -> list:
+    """Build synthetic launch documents shaped like launch_reports."""
+    rng = random.Random(42)
+    return [
+        {
+            "_id": ObjectId(),
+            "boosterNumber": rng.randint(1, 40),
+            "shipNumber": rng.randint(20, 60),
+            "boosterFlightCount": rng.randint(1, 20),
+            "shipFlightCount": rng.randint(1, 10),
+            "launchSite": rng.choice(SITES),
+            "launchDate": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "launchTime": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "livestream": "https://example.com/live",
+            "timestamp": "2026-01-01T00:00:00",
+        }
+        for _ in range(count)
+    ]
+
+
+def old_path(launches: list) -> bytes:
+    """Stringify ids, run jsonable_encoder, render with JSONResponse."""
+    for launch in launches:
+        launch["_id"] = str(launch["_id"])
+    return JSONResponse(jsonable_encoder(launches)).body
+
+
+def new_path(launches: list) -> bytes:
+    """Render raw documents with BSONJSONResponse."""
+    return BSONJSONResponse(launches).body
+
+
+def measure(func, launches: list, repeat: int) -> list:
+    """Time func over fresh copies of the documents, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        docs = copy.deepcopy(launches)
+        start = time.perf_counter()
+        func(docs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    """Run both paths and print median and best timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    launches = make_launches(args.count)
+    print(f"Serializing {args.count} launches, {args.repeat} runs each")
+    results = {}
+    for name, func in (("old", old_path), ("new", new_path)):
+        timings = measure(func, launches, args.repeat)
+        results[name] = statistics.median(timings)
+        print(
+            f"{name:>4}: median {results[name]:8.2f} ms   best {min(timings):8.2f} ms"
+        )
+    print(f"speedup: {results['old'] / results['new']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
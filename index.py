@@ -2,12 +2,14 @@
 Main entry point for the application.
 """
 
+import argparse
 import os
-import subprocess
+import tempfile
 from typing import Any
-from dotenv import load_dotenv
+import uvicorn
+from src.config import load_env
 
-load_dotenv()
+load_env()
 
 
 def required_env(name: str) -> Any:
@@ -18,23 +20,61 @@ def required_env(name: str) -> Any:
     return value
 
 
+def parse_args():
+    """Read launcher options from the command line, falling back to env vars."""
+    parser = argparse.ArgumentParser(description="Run the RocketTracker server.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WORKERS", "0")) or os.cpu_count() or 1,
+        help="worker processes (default: WORKERS or the CPU count)",
+    )
+    parser.add_argument(
+        "--loop",
+        choices=["auto", "asyncio", "uvloop"],
+        default=os.getenv("LOOP", "auto"),
+        help="event loop implementation",
+    )
+    parser.add_argument(
+        "--http",
+        choices=["auto", "h11", "httptools"],
+        default=os.getenv("HTTP", "auto"),
+        help="HTTP/1.1 parser implementation",
+    )
+    return parser.parse_args()
+
+
 port = int(required_env("PORT"))
-dev = required_env("DEV")
+dev = required_env("DEV").lower() == "true"
+args = parse_args()
+# --reload cannot be combined with multiple workers, so dev runs one
+workers = 1 if dev else args.workers
+
+if workers > 1 and not os.getenv("RATELIMIT_STORAGE_URI"):
+    # Per-process memory counters would multiply every limit by the worker
+    # count, so give all workers one file-backed store instead
+    ratelimit_db = os.path.join(tempfile.gettempdir(), f"rocketracker-{port}.db")
+    os.environ["RATELIMIT_STORAGE_URI"] = f"sqlite:///{ratelimit_db}"
+
+if workers > 1 and not os.getenv("METRICS_DIR"):
+    # A scrape reaches one worker, so they all publish their metrics to a
+    # directory (fresh each run) that /metrics adds up
+    metrics_dir = tempfile.mkdtemp(prefix=f"rocketracker-{port}-metrics-")
+    os.environ["METRICS_DIR"] = metrics_dir
 
 try:
-    print(port, dev, os.getcwd())
-    subprocess.run(
-        [
-            "uvicorn",
-            "src.server:app",
-            *(["--reload"] if dev else []),
-            "--host",
-            "0.0.0.0",
-            "--port",
-            str(port),
-        ],
-        cwd=os.getcwd(),
-        check=True,
+    print(port, dev, workers, os.getcwd())
+    uvicorn.run(
+        "src.server:create_app",
+        factory=True,
+        host="0.0.0.0",
+        port=port,
+        reload=dev,
+        workers=workers,
+        loop=args.loop,
+        http=args.http,
+        # Event streams never finish on their own, so don't wait on them forever
+        timeout_graceful_shutdown=int(os.getenv("SHUTDOWN_TIMEOUT", "10")),
     )
 except KeyboardInterrupt:
     print("Server stopped by user.")
@@ -3,6 +3,12 @@ document.addEventListener('DOMContentLoaded', function() {
     loadBoosterDetails();
 });
 
+// Data the server embedded in the page, or null to fetch it from the API
+function initialData() {
+    const element = document.getElementById('initial-data');
+    return element ? JSON.parse(element.textContent) : null;
+}
+
 async function loadBoosterDetails() {
     try {
         // Extract booster ID from URL
@@ -13,17 +19,23 @@ async function loadBoosterDetails() {
             throw new Error('No booster ID provided');
         }
         
-        // Fetch specific booster missions
-        const response = await fetch(`/api/mission/booster/${encodeURIComponent(boosterId)}`);
-        if (response.status === 429) {
-            showError('ratelimit, slow down!');
-            return;
-        }
-        if (!response.ok) {
-            throw new Error('Failed to fetch booster data');
-        }
+        const embedded = initialData();
+        let boosterLaunches;
+        if (embedded) {
+            boosterLaunches = embedded;
+        } else {
+            // Fetch specific booster missions
+            const response = await fetch(`/api/mission/booster/${encodeURIComponent(boosterId)}`);
+            if (response.status === 429) {
+                showError('ratelimit, slow down!');
+                return;
+            }
+            if (!response.ok) {
+                throw new Error('Failed to fetch booster data');
+            }
 
-        const boosterLaunches = await response.json();
+            boosterLaunches = await response.json();
+        }
         
         if (boosterLaunches.length === 0) {
             showError('Booster not found');
@@ -3,86 +3,37 @@ document.addEventListener('DOMContentLoaded', function() {
     loadFleetData();
 });
 
+// Data the server embedded in the page, or null to fetch it from the API
+function initialData() {
+    const element = document.getElementById('initial-data');
+    return element ? JSON.parse(element.textContent) : null;
+}
+
 async function loadFleetData() {
+    const embedded = initialData();
+    if (embedded) {
+        renderFleetData(embedded.boosters || [], embedded.ships || []);
+        return;
+    }
     try {
-        const response = await fetch('/api/getlaunches');
+        const response = await fetch('/api/fleet');
         if (response.status === 429) {
             showError('ratelimit, slow down!');
             return;
         }
         if (!response.ok) {
-            throw new Error('Failed to fetch launch data');
+            throw new Error('Failed to fetch fleet data');
         }
 
-        const launches = await response.json();
-        processFleetData(launches);
+        // Summary is precomputed server-side and already sorted by flight count
+        const fleet = await response.json();
+        renderFleetData(fleet.boosters || [], fleet.ships || []);
     } catch (error) {
         console.error('Error loading fleet data:', error);
         showError('Failed to load fleet data. Please try again later.');
     }
 }
 
-function processFleetData(launches) {
-    const boosters = new Map();
-    const ships = new Map();
-    
-    // Process all launches to gather unique boosters and ships
-    launches.forEach(launch => {
-        // Process boosters
-        const boosterNum = launch.boosterNumber;
-        if (boosterNum) {
-            if (!boosters.has(boosterNum)) {
-                boosters.set(boosterNum, {
-                    id: boosterNum,
-                    flightCount: 0,
-                    missions: [],
-                    launchSites: new Set()
-                });
-            }
-            const booster = boosters.get(boosterNum);
-            booster.flightCount = Math.max(booster.flightCount, launch.boosterFlightCount || 0);
-            booster.missions.push({
-                id: launch._id,
-                date: launch.launchDate,
-                time: launch.launchTime,
-                site: launch.launchSite
-            });
-            booster.launchSites.add(launch.launchSite);
-        }
-        
-        // Process ships
-        const shipNum = launch.shipNumber;
-        if (shipNum) {
-            if (!ships.has(shipNum)) {
-                ships.set(shipNum, {
-                    id: shipNum,
-                    flightCount: 0,
-                    missions: [],
-                    launchSites: new Set()
-                });
-            }
-            const ship = ships.get(shipNum);
-            ship.flightCount = Math.max(ship.flightCount, launch.shipFlightCount || 0);
-            ship.missions.push({
-                id: launch._id,
-                date: launch.launchDate,
-                time: launch.launchTime,
-                site: launch.launchSite
-            });
-            ship.launchSites.add(launch.launchSite);
-        }
-    });
-    
-    // Sort by flight count (descending)
-    const sortedBoosters = Array.from(boosters.values())
-        .sort((a, b) => b.flightCount - a.flightCount);
-    
-    const sortedShips = Array.from(ships.values())
-        .sort((a, b) => b.flightCount - a.flightCount);
-    
-    renderFleetData(sortedBoosters, sortedShips);
-}
-
 function renderFleetData(boosters, ships) {
     renderFleetSection('boosters-list', boosters, 'Booster');
     renderFleetSection('ships-list', ships, 'Ship');
@@ -126,11 +77,11 @@ function renderFleetSection(containerId, items, type) {
                 </div>
                 <div class="stat-item">
                     <span class="stat-label">Launch Sites:</span>
-                    <span class="stat-value">${Array.from(item.launchSites).join(', ') || 'N/A'}</span>
+                    <span class="stat-value">${(item.launchSites || []).join(', ') || 'N/A'}</span>
                 </div>
                 <div class="stat-item">
                     <span class="stat-label">Missions:</span>
-                    <span class="stat-value">${item.missions.length}</span>
+                    <span class="stat-value">${item.missionCount}</span>
                 </div>
             </div>
             
@@ -1,27 +1,62 @@
-// Fetch and display launch data
-async function fetchLaunches() {
-    try {
-        const response = await fetch('/api/getlaunches');
-        if (response.status === 429) {
-            document.getElementById('launch-cards').innerHTML = '<div class="error">ratelimit, slow down!</div>';
-            return;
-        }
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
+// Only ask for the fields the launch cards actually render
+const LAUNCH_FIELDS = [
+    '_id', 'launchDate', 'launchTime', 'launchSite', 'livestream',
+    'boosterNumber', 'boosterFlightCount', 'shipNumber', 'shipFlightCount'
+].join(',');
+// Pages are cached and shared server-side, unlike the unpaged stream
+const PAGE_SIZE = 500;
+// Seconds to wait before retrying when the server gives no Retry-After
+const DEFAULT_RETRY_SECONDS = 5;
+
+// The launches on screen, kept when a refresh fails
+let launches = [];
+let retryTimer = null;
+
+function fetchPage(after) {
+    const params = new URLSearchParams({ limit: PAGE_SIZE, fields: LAUNCH_FIELDS });
+    if (after) {
+        params.set('after', after);
+    }
+    return fetch(`/api/getlaunches?${params}`);
+}
 
-        // Handle response which might be wrapped in a message object
-        const data = await response.json();
+function scheduleRetry(response) {
+    const seconds = parseInt(response.headers.get('Retry-After'), 10);
+    const delay = (seconds > 0 ? seconds : DEFAULT_RETRY_SECONDS) * 1000;
+    clearTimeout(retryTimer);
+    retryTimer = setTimeout(fetchLaunches, delay);
+}
 
-        // Extract launches array (either directly or from message property)
-        const launches = Array.isArray(data) ? data :
-                          (data.message && Array.isArray(data.message) ? data.message :
-                          (data.launches && Array.isArray(data.launches) ? data.launches : []));
+// Fetch and display launch data, one page at a time
+async function fetchLaunches() {
+    try {
+        const loaded = [];
+        let after = null;
+        do {
+            const response = await fetchPage(after);
+            if (response.status === 429 || response.status === 503) {
+                // Rate limited or busy: keep what is shown and try again later
+                if (response.status === 429 && launches.length === 0) {
+                    document.getElementById('launch-cards').innerHTML = '<div class="error">ratelimit, slow down!</div>';
+                }
+                scheduleRetry(response);
+                return;
+            }
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const page = await response.json();
+            loaded.push(...page.launches);
+            after = page.next;
+        } while (after);
 
+        launches = loaded;
         displayLaunches(launches);
     } catch (error) {
         console.error('Error fetching launches:', error);
-        document.getElementById('launch-cards').innerHTML = '<div class="error">Error loading launch data</div>';
+        if (launches.length === 0) {
+            document.getElementById('launch-cards').innerHTML = '<div class="error">Error loading launch data</div>';
+        }
     }
 }
 
@@ -57,5 +92,50 @@ function displayLaunches(launches) {
     `).join('');
 }
 
+// Apply one change-feed event to the list on screen
+async function applyLaunchEvent(message) {
+    const event = JSON.parse(message.data);
+    const index = launches.findIndex(launch => launch._id === event.id);
+    if (event.op === 'delete') {
+        if (index !== -1) {
+            launches.splice(index, 1);
+        }
+        displayLaunches(launches);
+        return;
+    }
+
+    let launch = event.data ? { _id: event.id, ...event.data } : null;
+    if (!launch) {
+        // Updates can arrive without the document; fetch just this launch
+        const response = await fetch(`/api/getlaunches/${event.id}`);
+        launch = response.ok ? await response.json() : null;
+        if (!launch) {
+            return;
+        }
+    }
+    if (index === -1) {
+        launches.push(launch);
+    } else {
+        launches[index] = launch;
+    }
+    displayLaunches(launches);
+}
+
+// Keep the list current from the server's change feed, without refetching it
+function subscribeToLaunches() {
+    if (!window.EventSource) {
+        return;
+    }
+    const events = new EventSource('/api/stream?types=launch');
+    events.addEventListener('launch', message => {
+        applyLaunchEvent(message).catch(error => {
+            console.error('Error applying launch event:', error);
+        });
+    });
+}
+
 // Load launches when page loads
-document.addEventListener('DOMContentLoaded', fetchLaunches);
+document.addEventListener('DOMContentLoaded', () => {
+    fetchLaunches();
+    subscribeToLaunches();
+});
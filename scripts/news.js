@@ -120,8 +120,9 @@ class NewsManager {
                 throw new Error('Failed to load news posts');
             }
 
-            const posts = await response.json();
-            this.renderNewsPosts(posts);
+            const page = await response.json();
+            this.renderNewsPosts(page.posts);
+            this.renderLoadMore(page.next);
         } catch (error) {
             console.error('Error loading news posts:', error);
             this.newsList.innerHTML = `
@@ -147,6 +148,43 @@ class NewsManager {
         this.newsList.innerHTML = postsHtml;
     }
 
+    renderLoadMore(cursor) {
+        if (!cursor) {
+            return;
+        }
+        const button = document.createElement('button');
+        button.className = 'submit-btn load-more-btn';
+        button.textContent = 'Load older posts';
+        button.addEventListener('click', () => this.loadOlderPosts(cursor, button));
+        this.newsList.appendChild(button);
+    }
+
+    async loadOlderPosts(cursor, button) {
+        button.disabled = true;
+        try {
+            const response = await fetch(`${this.apiUrl}?before=${encodeURIComponent(cursor)}`);
+            if (response.status === 429) {
+                button.textContent = 'ratelimit, slow down!';
+                button.disabled = false;
+                return;
+            }
+            if (!response.ok) {
+                throw new Error('Failed to load older posts');
+            }
+            const page = await response.json();
+            button.remove();
+            this.newsList.insertAdjacentHTML(
+                'beforeend',
+                page.posts.map(post => this.createPostHtml(post)).join('')
+            );
+            this.renderLoadMore(page.next);
+        } catch (error) {
+            console.error('Error loading older posts:', error);
+            button.textContent = 'Failed to load, try again';
+            button.disabled = false;
+        }
+    }
+
     createPostHtml(post) {
         const formattedDate = new Date(post.timestamp).toLocaleString();
         const contentHtml = marked.parse(post.content);
@@ -3,6 +3,12 @@ document.addEventListener('DOMContentLoaded', function() {
     loadShipDetails();
 });
 
+// Data the server embedded in the page, or null to fetch it from the API
+function initialData() {
+    const element = document.getElementById('initial-data');
+    return element ? JSON.parse(element.textContent) : null;
+}
+
 async function loadShipDetails() {
     try {
         // Extract ship ID from URL
@@ -13,17 +19,23 @@ async function loadShipDetails() {
             throw new Error('No ship ID provided');
         }
         
-        // Fetch specific ship missions
-        const response = await fetch(`/api/mission/ship/${encodeURIComponent(shipId)}`);
-        if (response.status === 429) {
-            showError('ratelimit, slow down!');
-            return;
-        }
-        if (!response.ok) {
-            throw new Error('Failed to fetch ship data');
-        }
+        const embedded = initialData();
+        let shipLaunches;
+        if (embedded) {
+            shipLaunches = embedded;
+        } else {
+            // Fetch specific ship missions
+            const response = await fetch(`/api/mission/ship/${encodeURIComponent(shipId)}`);
+            if (response.status === 429) {
+                showError('ratelimit, slow down!');
+                return;
+            }
+            if (!response.ok) {
+                throw new Error('Failed to fetch ship data');
+            }
 
-        const shipLaunches = await response.json();
+            shipLaunches = await response.json();
+        }
         
         if (shipLaunches.length === 0) {
             showError('Ship not found');
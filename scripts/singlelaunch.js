@@ -9,20 +9,25 @@ if (!launchId) {
     </div>
   `;
 } else {
-  fetch(`/api/getlaunches/${launchId}`)
-    .then(r => {
-      if (r.status === 429) {
-        document.getElementById('launch-detail').innerHTML = `
-          <div class="fleet-item">
-            <h3>Error</h3>
-            <p class="error">ratelimit, slow down!</p>
-          </div>
-        `;
-        return Promise.reject('ratelimit');
-      }
-      return r.ok ? r.json() : Promise.reject(r.status);
-    })
-    .then(launch => {
+  // The server usually embeds the launch and its missions in the page;
+  // otherwise they arrive together from one endpoint
+  const embedded = document.getElementById('initial-data');
+  const loaded = embedded
+    ? Promise.resolve(JSON.parse(embedded.textContent))
+    : fetch(`/api/launch/${launchId}/full`).then(r => {
+        if (r.status === 429) {
+          document.getElementById('launch-detail').innerHTML = `
+            <div class="fleet-item">
+              <h3>Error</h3>
+              <p class="error">ratelimit, slow down!</p>
+            </div>
+          `;
+          return Promise.reject('ratelimit');
+        }
+        return r.ok ? r.json() : Promise.reject(r.status);
+      });
+  loaded
+    .then(({ launch, missions }) => {
       document.getElementById('launch-detail').innerHTML = `
         <div class="fleet-item">
           <h3>Launch ${launch.launchDate} at ${launch.launchTime}</h3>
@@ -57,12 +62,11 @@ if (!launchId) {
         </div>
         <div id="missions-section" style="margin-top: 2rem;">
           <h3>Missions</h3>
-          <div id="missions-list">Loading missions...</div>
+          <div id="missions-list"></div>
         </div>
       `;
       
-      // Load missions for this launch
-      loadMissions();
+      renderMissions(missions);
     })
     .catch(() => {
       document.getElementById('launch-detail').innerHTML = `
@@ -75,15 +79,8 @@ if (!launchId) {
     });
 }
 
-async function loadMissions() {
+function renderMissions(missions) {
   try {
-    const response = await fetch(`/api/missions/${launchId}`);
-    if (response.status === 429) {
-      document.getElementById('missions-list').innerHTML = '<p>ratelimit, slow down!</p>';
-      return;
-    }
-    const missions = await response.json();
-
     const missionsList = document.getElementById('missions-list');
 
     if (missions.length === 0) {
@@ -108,7 +105,7 @@ async function loadMissions() {
       missionsList.innerHTML += `<a href="/missions/reporter" class="mission-link">Add Another Mission</a>`;
     }
   } catch (error) {
-    console.error('Error loading missions:', error);
+    console.error('Error rendering missions:', error);
     document.getElementById('missions-list').innerHTML = '<p>Error loading missions.</p>';
   }
 }
@@ -0,0 +1,6 @@
+"""RocketTracker server package."""
+
+from src.config import load_env
+
+# Before any submodule reads its settings from the environment
+load_env()
@@ -0,0 +1,295 @@
+"""
+Server-wide admission control.
+
+The per-IP rate limits do nothing when a surge comes from many addresses at
+once; requests then pile up on the MongoDB pool until all of them time out.
+Instead, the number of requests in flight is capped by a limit that follows
+request latency: it grows while latency stays near its baseline and shrinks
+as soon as queueing shows up.
+
+Requests over the limit wait briefly in a queue per priority. Writes are
+woken first, then reads; full-collection scans never queue and may only
+take a share of the limit. Whatever cannot get a slot in time is answered
+with a fast 503 and ``Retry-After`` instead of waiting indefinitely.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from urllib.parse import parse_qs
+
+from loguru import logger
+
+from src.metrics import CallbackMetric, Counter, Histogram, registry
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", "64"))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "8"))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "512"))
+# Requests that may wait for a slot, per priority
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "128"))
+# Seconds a queued request waits for a slot before it is shed
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "1.0"))
+# Fraction of the limit full-collection scans may use between them
+ADMISSION_SCAN_SHARE = float(os.getenv("ADMISSION_SCAN_SHARE", "0.25"))
+RETRY_AFTER = os.getenv("ADMISSION_RETRY_AFTER", "2")
+
+WRITE, READ, SCAN = "write", "read", "scan"
+# Order in which queued requests are woken
+QUEUED_PRIORITIES = (WRITE, READ)
+
+# Long-lived or trivially cheap, so never counted against the limit
+EXEMPT_PATHS = frozenset({"/metrics", "/api/stream"})
+EXEMPT_PREFIXES = ("/assets/", "/styles/", "/img/", "/scripts/")
+
+BUSY_BODY = b'{"detail":"Server is busy, please retry shortly"}'
+
+shed_requests = registry.register(
+    Counter(
+        "rocketracker_admission_shed_total",
+        "Requests answered with 503 because no slot was free.",
+        ("priority", "reason"),
+    )
+)
+queue_wait = registry.register(
+    Histogram(
+        "rocketracker_admission_queue_wait_seconds",
+        "Time admitted requests spent waiting for a slot.",
+        ("priority",),
+    )
+)
+
+
+def classify(scope) -> Optional[str]:
+    """Return a request's priority, or None if it bypasses admission."""
+    path = scope["path"]
+    if path in EXEMPT_PATHS or path.startswith(EXEMPT_PREFIXES):
+        return None
+    if scope["method"] not in ("GET", "HEAD"):
+        return WRITE
+    if path == "/api/getlaunches":
+        params = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        # Without a page size this streams the whole collection
+        if "limit" not in params and "after" not in params:
+            return SCAN
+    return READ
+
+
+class AdaptiveLimit:
+    """Concurrency limit following request latency (a gradient limiter).
+
+    A fast moving average of latency is compared with a slow baseline. While
+    they agree the limit grows by about its square root per update, as long
+    as the limit is actually being used; once recent latency passes
+    ``tolerance`` times the baseline the limit shrinks in proportion.
+    """
+
+    def __init__(
+        self,
+        initial: int = 64,
+        minimum: int = 8,
+        maximum: int = 512,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.recent: Optional[float] = None
+        self.baseline: Optional[float] = None
+
+    def update(self, latency: float, in_flight: int):
+        """Feed one request's latency and the concurrency it ran at."""
+        if self.recent is None:
+            self.recent = self.baseline = latency
+        self.recent += self.smoothing * (latency - self.recent)
+        self.baseline += 0.01 * (latency - self.baseline)
+        # Once load eases, let a baseline inflated by a long surge come down
+        if self.baseline > 2 * self.recent:
+            self.baseline *= 0.95
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline / self.recent))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        # A mostly idle server says nothing about whether it could take more
+        if target > self.limit and in_flight < self.limit / 2:
+            return
+        limit = self.limit * (1 - self.smoothing) + target * self.smoothing
+        self.limit = max(self.minimum, min(self.maximum, limit))
+
+
+class AdmissionController:
+    """Hands out slots under the adaptive limit, queueing by priority."""
+
+    def __init__(
+        self,
+        limit: AdaptiveLimit,
+        queue_size: int = 128,
+        queue_timeout: float = 1.0,
+        scan_share: float = 0.25,
+    ):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.scan_share = scan_share
+        self.in_flight = 0
+        self.scans = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {
+            priority: deque() for priority in QUEUED_PRIORITIES
+        }
+
+    def queued(self) -> int:
+        """Requests currently waiting for a slot."""
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _has_room(self, priority: str) -> bool:
+        if self.in_flight >= int(self.limit.limit):
+            return False
+        if priority == SCAN:
+            return self.scans < max(1, int(self.limit.limit * self.scan_share))
+        return True
+
+    def _take(self, priority: str):
+        self.in_flight += 1
+        if priority == SCAN:
+            self.scans += 1
+
+    def _queued_ahead(self, priority: str) -> bool:
+        if priority == SCAN:
+            return self.queued() > 0
+        ahead = QUEUED_PRIORITIES[: QUEUED_PRIORITIES.index(priority) + 1]
+        return any(self._waiters[p] for p in ahead)
+
+    async def acquire(self, priority: str) -> bool:
+        """Take a slot, waiting in the priority's queue if need be.
+
+        Returns False if the request should be shed.
+        """
+        if not self._queued_ahead(priority) and self._has_room(priority):
+            self._take(priority)
+            return True
+        if priority == SCAN:
+            shed_requests.inc(priority, "busy")
+            return False
+        waiters = self._waiters[priority]
+        if len(waiters) >= self.queue_size:
+            shed_requests.inc(priority, "queue_full")
+            return False
+
+        start = time.perf_counter()
+        slot = asyncio.get_running_loop().create_future()
+        waiters.append(slot)
+        try:
+            await asyncio.wait({slot}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # The client went away; hand back a slot granted meanwhile
+            if slot.done() and not slot.cancelled():
+                self.release(priority)
+            else:
+                waiters.remove(slot)
+            raise
+        if slot.done():
+            queue_wait.observe(time.perf_counter() - start, priority)
+            return True
+        waiters.remove(slot)
+        slot.cancel()
+        shed_requests.inc(priority, "timeout")
+        return False
+
+    def release(self, priority: str, latency: Optional[float] = None):
+        """Return a slot, feeding its latency to the limit, and wake waiters."""
+        if latency is not None:
+            self.limit.update(latency, self.in_flight)
+        self.in_flight -= 1
+        if priority == SCAN:
+            self.scans -= 1
+        for queued in QUEUED_PRIORITIES:
+            waiters = self._waiters[queued]
+            while waiters and self._has_room(queued):
+                self._take(queued)
+                waiters.popleft().set_result(None)
+
+
+admission = AdmissionController(
+    AdaptiveLimit(ADMISSION_INITIAL_LIMIT, ADMISSION_MIN_LIMIT, ADMISSION_MAX_LIMIT),
+    queue_size=ADMISSION_QUEUE_SIZE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    scan_share=ADMISSION_SCAN_SHARE,
+)
+
+
+class AdmissionMiddleware:
+    """Runs each HTTP request under an admission slot, or answers 503."""
+
+    def __init__(self, asgi_app, controller: AdmissionController = admission):
+        self.app = asgi_app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        priority = classify(scope) if scope["type"] == "http" else None
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(priority):
+            logger.warning(f"Shedding {priority} request {scope['path']}")
+            await self._busy(send)
+            return
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            await self.app(scope, receive, send)
+            failed = False
+        finally:
+            # Scans run as long as the collection is big; failures say little
+            latency = None
+            if priority != SCAN and not failed:
+                latency = time.perf_counter() - start
+            self.controller.release(priority, latency)
+
+    @staticmethod
+    async def _busy(send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(BUSY_BODY)).encode("latin-1")),
+                    (b"retry-after", RETRY_AFTER.encode("latin-1")),
+                    (b"cache-control", b"no-store"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": BUSY_BODY})
+
+
+registry.register(
+    CallbackMetric(
+        "rocketracker_admission_limit",
+        "Current adaptive limit on requests in flight.",
+        "gauge",
+        lambda: int(admission.limit.limit),
+    )
+)
+registry.register(
+    CallbackMetric(
+        "rocketracker_admission_in_flight",
+        "Requests currently holding an admission slot.",
+        "gauge",
+        lambda: admission.in_flight,
+    )
+)
+registry.register(
+    CallbackMetric(
+        "rocketracker_admission_queued",
+        "Requests waiting for an admission slot.",
+        "gauge",
+        admission.queued,
+    )
+)
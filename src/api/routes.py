@@ -5,28 +5,57 @@ Provides API endpoints for launch reports, news posts, and mission reports.
 Handles CRUD operations for flight data, news, and mission tracking.
 """
 
+import asyncio
+import hashlib
+import json
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel, field_validator
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from loguru import logger
+from typing import AsyncIterator, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError, field_validator
+from ..cache import collection_versions, query_cache
+from ..events import WATCHED, broadcaster
+from ..idempotency import MAX_KEY_LENGTH, Duplicate, IdempotencyConflict
+from ..logconfig import sampled_logger as logger
+from ..ratelimit import limiter
+from ..feeds import parse_timestamp
+from ..search import DEFAULT_RESULTS, MAX_RESULTS, search_index
+from ..singleflight import response_flights
+from ..snapshot import circuit_breaker
+from ..responses import BSONJSONResponse, dumps, http_date, is_not_modified
 from ..database import (
     save,
-    get_all_launches,
+    save_many_launches,
+    save_many_missions,
+    get_launches_page,
+    stream_launches,
     get_specific_launch,
     get_missions_by_ship,
     get_missions_by_booster,
     save_news_post,
-    get_all_news_posts,
+    get_news_page,
+    get_newest_news_post,
     get_specific_news_post,
     save_mission,
     get_missions_by_launch,
+    get_launch_with_missions,
+    get_fleet_summary,
+    query_launches,
+    LaunchQuery,
+    DEFAULT_PAGE_SIZE,
 )  # noqa: E0402
 
 api_router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+
+# Upper bound on documents accepted by a single bulk request
+MAX_BULK_ITEMS = 1000
+# and on its body, checked before it is read: a generous 4 KiB per item
+MAX_BULK_BYTES = MAX_BULK_ITEMS * 4096
+
+# Seconds between keep-alive comments on an idle event stream
+STREAM_KEEPALIVE = 15.0
+# Milliseconds an EventSource waits before reconnecting
+STREAM_RETRY_MS = 5000
 
 
 class LaunchReport(BaseModel):
@@ -147,57 +176,523 @@ class MissionReport(BaseModel):
                 raise ValueError(f"{field_name} is required for {category} missions")
 
 
+# Fields each read endpoint may be asked to return via ?fields=
+LAUNCH_FIELDS = frozenset(LaunchReport.model_fields) | {"_id", "timestamp", "launchAt"}
+NEWS_FIELDS = frozenset(NewsPost.model_fields) | {"_id", "timestamp"}
+MISSION_FIELDS = frozenset(MissionReport.model_fields) | {"_id", "timestamp"}
+
+
+def _parse_fields(fields: Optional[str], allowed: frozenset):
+    """Turn a comma-separated fields parameter into a projection field list.
+
+    Returns None when no fields were requested. Unknown fields are a 400.
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(sorted(allowed))}",
+        )
+    # Sorted tuple so equivalent requests share a cache entry
+    return tuple(sorted(requested))
+
+
+def _idempotency_key(request: Request) -> Optional[str]:
+    """Read the optional Idempotency-Key header of a submission."""
+    key = request.headers.get("idempotency-key")
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters",
+        )
+    return key
+
+
+def _submitted(result, message: str):
+    """The response to a submission, replayed as-is for a duplicate."""
+    content = {"message": message, "id": str(result.inserted_id)}
+    if isinstance(result, Duplicate):
+        return JSONResponse(content, headers={"Idempotent-Replayed": "true"})
+    return content
+
+
+def _idempotency_conflict(e: IdempotencyConflict) -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail=f"Idempotency-Key {e} was already used for a different submission",
+    )
+
+
+def _version_headers(*collection_names: str) -> dict:
+    """Caching headers for a response built from the given collections.
+
+    The ETag comes from the collections' write counters, so it can be checked
+    before running any query.
+    """
+    headers = {"Cache-Control": "no-cache"}
+    etag = collection_versions.etag(*collection_names)
+    # Snapshot reads can be older than the counters say, so leave them untagged
+    if etag is not None and not circuit_breaker.open:
+        headers["ETag"] = etag
+    return headers
+
+
+def _not_modified(request: Request, headers: dict) -> bool:
+    return "ETag" in headers and is_not_modified(request, headers["ETag"])
+
+
+async def _shared_json(request: Request, headers: dict, load) -> Response:
+    """Respond with ``await load()`` as JSON, built once per burst.
+
+    Identical requests arriving while one is being answered wait for it and
+    get the same body, instead of each running the query and serialising.
+    """
+
+    async def render() -> bytes:
+        return BSONJSONResponse(await load()).body
+
+    if circuit_breaker.open:
+        # Snapshot reads are cheap, and each response must be marked stale
+        body = await render()
+    else:
+        # The ETag moves on every write, so requests after one never share
+        key = f"{request.url.path}?{request.url.query}|{headers.get('ETag')}"
+        body = await response_flights.do(key, render)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 # Handle launch report submissions
 @api_router.post("/report/launch")  # await because db operation
 @limiter.limit("5/minute")  # rate limit to 5 per minute per IP
 async def submit_launch_report(report: LaunchReport, request: Request):
-    """Submit a launch report."""
+    """Submit a launch report.
+
+    Retries with the same ``Idempotency-Key`` header, or of an identical
+    report, get the original response back instead of a second copy.
+    """
+    key = _idempotency_key(request)
     report_data = report.dict()
     report_data["timestamp"] = datetime.now().isoformat()
-    await save(report_data)  # save to db, uses await however not here, in db module
-    logger.info("Launch report submitted successfully")
-    return {"message": "Launch report submitted successfully"}
+    try:
+        result = await save(report_data, key)
+    except IdempotencyConflict as e:
+        raise _idempotency_conflict(e) from e
+    if not result:
+        raise HTTPException(status_code=500, detail="Failed to save launch report")
+    logger.info("Launch report submitted successfully with id: {}", result.inserted_id)
+    return _submitted(result, "Launch report submitted successfully")
+
+
+async def _json_array_stream(docs: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Encode documents as a JSON array, one element per chunk."""
+    first = True
+    yield b"["
+    try:
+        async for doc in docs:
+            yield dumps(doc) if first else b"," + dumps(doc)
+            first = False
+    except Exception as e:
+        # Headers are already sent, so abort the connection: closing the array
+        # would hand the client a truncated list that looks complete
+        logger.error(f"Error while streaming launches: {e}")
+        raise
+    yield b"]"
+
+
+async def _ndjson_stream(docs: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Encode documents as newline-delimited JSON."""
+    try:
+        async for doc in docs:
+            yield dumps(doc) + b"\n"
+    except Exception as e:
+        # Abort the connection rather than end the body as if complete
+        logger.error(f"Error while streaming launches: {e}")
+        raise
+
+
+async def _read_bulk_items(request: Request) -> list:
+    """Parse a bulk request body given as a JSON array or as NDJSON."""
+    too_large = HTTPException(
+        status_code=413, detail=f"At most {MAX_BULK_BYTES} bytes per request"
+    )
+    try:
+        declared = int(request.headers.get("content-length", 0))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length") from e
+    if declared > MAX_BULK_BYTES:
+        raise too_large
+    # Chunked bodies carry no length, so count while reading as well
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_BULK_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    body = b"".join(chunks)
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}") from e
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=400, detail="Body must be a JSON array or NDJSON"
+        )
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request"
+        )
+    return items
+
+
+def _validate_bulk(model, items: list):
+    """Validate every item against a model in one pass.
+
+    Returns (results, valid): results has one entry per item, pre-filled for
+    invalid ones, and valid is a list of (index, data) for items that passed.
+    """
+    results = [None] * len(items)
+    valid = []
+    timestamp = datetime.now().isoformat()
+    for index, item in enumerate(items):
+        try:
+            data = model.model_validate(item).dict()
+        except ValidationError as e:
+            errors = [
+                {"loc": list(err["loc"]), "msg": err["msg"]} for err in e.errors()
+            ]
+            results[index] = {"index": index, "status": "invalid", "errors": errors}
+            continue
+        data["timestamp"] = timestamp
+        valid.append((index, data))
+    return results, valid
+
+
+async def _bulk_submit(model, items: list, save_many) -> dict:
+    """Validate and save a batch, returning a per-item result summary."""
+    results, valid = _validate_bulk(model, items)
+    if valid:
+        saved = await save_many([data for _index, data in valid])
+        if saved is None:
+            raise HTTPException(status_code=500, detail="Failed to save batch")
+        for (index, _data), outcome in zip(valid, saved):
+            if outcome.pop("duplicate", False):
+                results[index] = {"index": index, "status": "duplicate", **outcome}
+            elif "id" in outcome:
+                results[index] = {"index": index, "status": "inserted", **outcome}
+            else:
+                results[index] = {"index": index, "status": "failed", **outcome}
+    inserted = sum(1 for result in results if result["status"] == "inserted")
+    duplicates = sum(1 for result in results if result["status"] == "duplicate")
+    return {
+        "inserted": inserted,
+        "duplicates": duplicates,
+        "rejected": len(results) - inserted - duplicates,
+        "results": results,
+    }
+
+
+@api_router.post("/report/launch/bulk")
+@limiter.limit("5/minute")
+async def submit_launch_reports_bulk(request: Request):
+    """Submit many launch reports as a JSON array or NDJSON."""
+    items = await _read_bulk_items(request)
+    summary = await _bulk_submit(LaunchReport, items, save_many_launches)
+    logger.info(
+        "Bulk launch submission: {} inserted, {} rejected",
+        summary["inserted"],
+        summary["rejected"],
+    )
+    return summary
 
 
 @api_router.get("/getlaunches")
 @limiter.limit("45/minute")
-async def get_launches(request: Request):
-    """Get all launch reports"""
+async def get_launches(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    after: Optional[str] = None,
+    sort: Literal["_id", "launchDate"] = "_id",
+    format: Literal["json", "ndjson"] = "json",  # pylint: disable=redefined-builtin
+    fields: Optional[str] = None,
+):
+    """Get launch reports.
+
+    With ``limit`` or ``after`` this returns one keyset page as
+    ``{"launches": [...], "next": <cursor>}``. Otherwise the whole collection
+    is streamed as a JSON array (or NDJSON with ``format=ndjson``).
+    ``fields`` is a comma-separated list of fields to return.
+    """
+    projection = _parse_fields(fields, LAUNCH_FIELDS)
+    headers = _version_headers("launch_reports")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    if limit is not None or after is not None:
+
+        async def load_page():
+            launches, next_cursor = await get_launches_page(
+                limit=limit or DEFAULT_PAGE_SIZE,
+                after=after,
+                sort=sort,
+                fields=projection,
+            )
+            logger.info("Retrieved page of {} launches", len(launches))
+            return {"launches": launches, "next": next_cursor}
+
+        try:
+            return await _shared_json(request, headers, load_page)
+        except Exception as e:
+            logger.error(f"Error retrieving launches: {e}")
+            raise HTTPException(status_code=500, detail=str(e)) from e
+
+    logger.info("Streaming all launches")
+    launches = await stream_launches(sort=sort, fields=projection)
+    if format == "ndjson":
+        return StreamingResponse(
+            _ndjson_stream(launches),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )
+    return StreamingResponse(
+        _json_array_stream(launches),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@api_router.get("/launches/query")
+@limiter.limit("45/minute")
+async def get_launches_query(
+    request: Request,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    site: Optional[str] = None,
+    booster: Optional[int] = Query(None, ge=0),
+    ship: Optional[int] = Query(None, ge=0),
+    min_booster_flights: Optional[int] = Query(None, ge=0),
+    min_ship_flights: Optional[int] = Query(None, ge=0),
+    sort: Literal["launchAt", "-launchAt"] = "-launchAt",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    fields: Optional[str] = None,
+):
+    """Get launch reports matching filters, e.g. one site's launches in 2026.
+
+    ``start`` (inclusive) and ``end`` (exclusive) bound the launch date and
+    time, ``site`` matches launchSite, and the ``min_*_flights`` parameters
+    are lower bounds on the flight counts. Results are ordered by launch
+    time, newest first unless ``sort=launchAt``.
+    """
+    projection = _parse_fields(fields, LAUNCH_FIELDS)
+    launch_query = LaunchQuery(
+        start=start,
+        end=end,
+        launch_site=site,
+        booster=booster,
+        ship=ship,
+        min_booster_flights=min_booster_flights,
+        min_ship_flights=min_ship_flights,
+        descending=sort == "-launchAt",
+        limit=limit,
+    )
+    # Compared after LaunchQuery converts both bounds to naive UTC
+    if start is not None and end is not None and launch_query.start >= launch_query.end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    headers = _version_headers("launch_reports")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    async def load_launches():
+        launches = await query_launches(launch_query, projection)
+        logger.info("Launch query returned {} launches", len(launches))
+        return {"launches": launches}
+
+    return await _shared_json(request, headers, load_launches)
+
+
+@api_router.get("/fleet")
+@limiter.limit("45/minute")
+async def get_fleet(request: Request):
+    """Get the precomputed per-vehicle summary for every booster and ship."""
+    # The summary is rebuilt from launch reports before their counter moves
+    headers = _version_headers("launch_reports")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
     try:
-        launches = await get_all_launches()
-        # Convert ObjectId to string for JSON serialization
-        for launch in launches:
-            launch["_id"] = str(launch["_id"])
-        logger.info("Retrieved all launches")
-        return launches  # Return array directly
+        return await _shared_json(request, headers, get_fleet_summary)
     except Exception as e:
-        logger.error(f"Error retrieving launches: {e}")
+        logger.error(f"Error retrieving fleet summary: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@api_router.get("/cache/stats")
+@limiter.limit("30/minute")
+async def get_cache_stats(request: Request):
+    """Get hit/miss counters for the database query cache."""
+    return query_cache.stats()
+
+
+async def _disconnected(request: Request):
+    """Return once the client has gone away."""
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _event_stream(request: Request, types: set) -> AsyncIterator[bytes]:
+    queue = broadcaster.subscribe()
+    # Ends the stream as soon as the client leaves, not at the next write
+    disconnected = asyncio.ensure_future(_disconnected(request))
+    try:
+        yield f"retry: {STREAM_RETRY_MS}\n\n".encode()
+        while True:
+            received = asyncio.ensure_future(queue.get())
+            await asyncio.wait(
+                {received, disconnected},
+                timeout=STREAM_KEEPALIVE,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected.done():
+                received.cancel()
+                return
+            if not received.done():
+                received.cancel()
+                # Keeps proxies from closing an idle connection
+                yield b": keepalive\n\n"
+                continue
+            event = received.result()
+            if event is None:
+                return  # the server is shutting down
+            if event["type"] in types:
+                yield b"event: %s\ndata: %s\n\n" % (
+                    event["type"].encode(),
+                    dumps(event),
+                )
+    finally:
+        disconnected.cancel()
+        broadcaster.unsubscribe(queue)
+
+
+@api_router.get("/stream")
+@limiter.limit("10/minute")
+async def stream_events(request: Request, types: Optional[str] = None):
+    """Server-sent events for new and changed launches, missions and news.
+
+    Every subscriber shares the worker's single change feed. ``types`` is an
+    optional comma-separated filter such as ``launch,news``.
+    """
+    known = {event_type for event_type, _ in WATCHED.values()}
+    wanted = known
+    if types:
+        wanted = {value.strip() for value in types.split(",") if value.strip()}
+        unknown = wanted - known
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"unknown event types: {', '.join(sorted(unknown))}",
+            )
+    return StreamingResponse(
+        _event_stream(request, wanted),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@api_router.get("/search")
+@limiter.limit("60/minute")
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[
+        Literal["news", "launch"]
+    ] = None,  # pylint: disable=redefined-builtin
+    limit: int = Query(DEFAULT_RESULTS, ge=1, le=MAX_RESULTS),
+):
+    """Search news posts and launch reports from the in-memory index.
+
+    Every word must match, either exactly or as the start of a word in a
+    post's title, author or content, or a launch's site or vehicle numbers
+    (``B14``/``S35`` work too). Results are ranked best first.
+    """
+    if not search_index.enabled:
+        raise HTTPException(status_code=404, detail="Search is disabled")
+    if not search_index.ready:
+        raise HTTPException(status_code=503, detail="Search index is still building")
+    results = search_index.search(q, doc_type=type, limit=limit)
+    return BSONJSONResponse({"query": q, "results": results})
+
+
 # code of doom an dispair
 @api_router.get("/getlaunches/{launch_id}")
 @limiter.limit("30/minute")
 async def get_id_specific_launch(launch_id: str, request: Request):
     """Get a specific launch by ID."""
+    headers = _version_headers("launch_reports")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    async def load_launch():
+        launch = await get_specific_launch(launch_id)  # call your service/repo
+        if launch:
+            logger.info("Retrieved specific launch {}", launch_id)
+        return launch
+
     try:
-        launches = await get_specific_launch(launch_id)  # call your service/repo
-        if launches:
-            logger.info(f"Retrieved specific launch {launch_id}")
-        return launches
+        return await _shared_json(request, headers, load_launch)
     except Exception as e:
         logger.error(f"Error retrieving specific launch {launch_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@api_router.get("/launch/{launch_id}/full")
+@limiter.limit("30/minute")
+async def get_full_launch(launch_id: str, request: Request):
+    """Get a launch together with its missions in a single request."""
+    headers = _version_headers("launch_reports", "missions")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    async def load_full():
+        try:
+            full = await get_launch_with_missions(launch_id)
+        except Exception as e:
+            logger.error(f"Error retrieving full launch {launch_id}: {e}")
+            raise HTTPException(status_code=500, detail=str(e)) from e
+        if full is None:
+            raise HTTPException(status_code=404, detail="Launch not found")
+        logger.info(
+            "Retrieved launch {} with {} missions", launch_id, len(full["missions"])
+        )
+        return full
+
+    return await _shared_json(request, headers, load_full)
+
+
 @api_router.get("/mission/ship/{ship_id}")
 @limiter.limit("30/minute")
-async def get_missions_by_ship_id(ship_id: str, request: Request):
+async def get_missions_by_ship_id(
+    ship_id: str, request: Request, fields: Optional[str] = None
+):
     """Get all missions completed by a specific ship using its assigned number"""
-    try:
-        missions = await get_missions_by_ship(ship_id)
-        logger.info(f"Retrieved missions for ship {ship_id}")
+    projection = _parse_fields(fields, LAUNCH_FIELDS)
+    headers = _version_headers("launch_reports")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    async def load_missions():
+        missions = await get_missions_by_ship(ship_id, projection)
+        logger.info("Retrieved missions for ship {}", ship_id)
         return missions
+
+    try:
+        return await _shared_json(request, headers, load_missions)
     except Exception as e:
         logger.error(f"Error retrieving missions for ship {ship_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -205,12 +700,22 @@ async def get_missions_by_ship_id(ship_id: str, request: Request):
 
 @api_router.get("/mission/booster/{booster_id}")
 @limiter.limit("30/minute")
-async def get_missions_by_booster_id(booster_id: str, request: Request):
+async def get_missions_by_booster_id(
+    booster_id: str, request: Request, fields: Optional[str] = None
+):
     """Get all missions completed by a specific booster using its assigned number"""
-    try:
-        missions = await get_missions_by_booster(booster_id)
-        logger.info(f"Retrieved missions for booster {booster_id}")
+    projection = _parse_fields(fields, LAUNCH_FIELDS)
+    headers = _version_headers("launch_reports")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    async def load_missions():
+        missions = await get_missions_by_booster(booster_id, projection)
+        logger.info("Retrieved missions for booster {}", booster_id)
         return missions
+
+    try:
+        return await _shared_json(request, headers, load_missions)
     except Exception as e:
         logger.error(f"Error retrieving missions for booster {booster_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -220,20 +725,20 @@ async def get_missions_by_booster_id(booster_id: str, request: Request):
 @api_router.post("/news/post")
 @limiter.limit("5/minute")
 async def submit_news_post(post: NewsPost, request: Request):
-    """Submit a new news post"""
+    """Submit a new news post, deduplicating retries like launch reports."""
+    key = _idempotency_key(request)
     try:
         post_data = post.dict()
         post_data["timestamp"] = datetime.now().isoformat()
-        result = await save_news_post(post_data)
+        result = await save_news_post(post_data, key)
         if result:
             logger.info(
-                f"News post submitted successfully with id: {result.inserted_id}"
+                "News post submitted successfully with id: {}", result.inserted_id
             )
-            return {
-                "message": "News post submitted successfully",
-                "id": str(result.inserted_id),
-            }
+            return _submitted(result, "News post submitted successfully")
         raise HTTPException(status_code=500, detail="Failed to save news post")
+    except IdempotencyConflict as e:
+        raise _idempotency_conflict(e) from e
     except Exception as e:
         logger.error(f"Error submitting news post: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -241,12 +746,39 @@ async def submit_news_post(post: NewsPost, request: Request):
 
 @api_router.get("/news")
 @limiter.limit("20/minute")
-async def get_news_posts(request: Request):
-    """Get all news posts"""
+async def get_news_posts(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    before: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """Get one page of news posts, newest first.
+
+    Returns ``{"posts": [...], "next": <cursor>}``; pass ``next`` as
+    ``before`` for older posts. Responses carry an ETag and Last-Modified
+    derived from the newest post, so unchanged pages come back as 304.
+    """
+    projection = _parse_fields(fields, NEWS_FIELDS)
     try:
-        posts = await get_all_news_posts()
-        logger.info("Retrieved all news posts")
-        return posts
+        newest = await get_newest_news_post()
+        headers = {"Cache-Control": "no-cache"}
+        last_modified = None
+        marker = "empty"
+        if newest:
+            last_modified = parse_timestamp(newest.get("timestamp"))
+            marker = f"{newest['_id']}:{newest.get('timestamp')}"
+            headers["Last-Modified"] = http_date(last_modified)
+        # Different pages and projections are different representations
+        variant = f"{marker}|{limit}|{before}|{projection}"
+        headers["ETag"] = f'"{hashlib.sha256(variant.encode()).hexdigest()[:32]}"'
+        if is_not_modified(request, headers["ETag"], last_modified):
+            return Response(status_code=304, headers=headers)
+
+        posts, next_cursor = await get_news_page(
+            limit=limit, before=before, fields=projection
+        )
+        logger.info("Retrieved page of {} news posts", len(posts))
+        return BSONJSONResponse({"posts": posts, "next": next_cursor}, headers=headers)
     except Exception as e:
         logger.error(f"Error retrieving news posts: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -256,11 +788,14 @@ async def get_news_posts(request: Request):
 @limiter.limit("30/minute")
 async def get_news_post(post_id: str, request: Request):
     """Get a specific news post by ID"""
+    headers = _version_headers("news_posts")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
     try:
         post = await get_specific_news_post(post_id)
         if post:
-            logger.info(f"Retrieved specific news post {post_id}")
-            return post
+            logger.info("Retrieved specific news post {}", post_id)
+            return BSONJSONResponse(post, headers=headers)
         raise HTTPException(status_code=404, detail="News post not found")
     except Exception as e:
         logger.error(f"Error retrieving specific news post {post_id}: {e}")
@@ -271,31 +806,57 @@ async def get_news_post(post_id: str, request: Request):
 @api_router.post("/missions")
 @limiter.limit("5/minute")
 async def submit_mission(mission: MissionReport, request: Request):
-    """Submit a new mission report"""
+    """Submit a new mission report, deduplicating retries like launch reports."""
+    key = _idempotency_key(request)
     try:
         mission_data = mission.dict()
         mission_data["timestamp"] = datetime.now().isoformat()
-        result = await save_mission(mission_data)
+        result = await save_mission(mission_data, key)
         if result:
-            logger.info(f"Mission submitted successfully with id: {result.inserted_id}")
-            return {
-                "message": "Mission submitted successfully",
-                "id": str(result.inserted_id),
-            }
+            logger.info(
+                "Mission submitted successfully with id: {}", result.inserted_id
+            )
+            return _submitted(result, "Mission submitted successfully")
         raise HTTPException(status_code=500, detail="Failed to save mission")
+    except IdempotencyConflict as e:
+        raise _idempotency_conflict(e) from e
     except Exception as e:
         logger.error(f"Error submitting mission: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@api_router.post("/missions/bulk")
+@limiter.limit("5/minute")
+async def submit_missions_bulk(request: Request):
+    """Submit many mission reports as a JSON array or NDJSON."""
+    items = await _read_bulk_items(request)
+    summary = await _bulk_submit(MissionReport, items, save_many_missions)
+    logger.info(
+        "Bulk mission submission: {} inserted, {} rejected",
+        summary["inserted"],
+        summary["rejected"],
+    )
+    return summary
+
+
 @api_router.get("/missions/{launch_id}")
 @limiter.limit("30/minute")
-async def get_missions_for_launch(launch_id: str, request: Request):
+async def get_missions_for_launch(
+    launch_id: str, request: Request, fields: Optional[str] = None
+):
     """Get all missions for a specific launch, for refueling missions. like Mars or HLS"""
-    try:
-        missions = await get_missions_by_launch(launch_id)
-        logger.info(f"Retrieved missions for launch {launch_id}")
+    projection = _parse_fields(fields, MISSION_FIELDS)
+    headers = _version_headers("missions")
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    async def load_missions():
+        missions = await get_missions_by_launch(launch_id, projection)
+        logger.info("Retrieved missions for launch {}", launch_id)
         return missions
+
+    try:
+        return await _shared_json(request, headers, load_missions)
     except Exception as e:
         logger.error(f"Error retrieving missions for launch {launch_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -0,0 +1,219 @@
+"""
+Content-hashed, precompressed static assets.
+
+``python -m src.cli build-assets`` copies styles/, scripts/ and img/ into
+build/assets/ under names that include a hash of their contents, with gzip
+and brotli variants of text files and a WebP variant (downscaled to
+MAX_IMAGE_WIDTH) of each image, and writes a manifest mapping every
+original URL to its hashed one.
+
+At startup the server loads that manifest into memory: views are served
+with their references rewritten to the hashed URLs, and /assets/ serves the
+files with ``Cache-Control: immutable``, so repeat visits load no static
+bytes at all. Without a build the original /styles, /scripts and /img URLs
+are served unchanged.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import re
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from loguru import logger
+
+from src.responses import accepted_encodings, is_not_modified
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed to build WebP variants
+    Image = None
+
+# Images first, so CSS and JS that refer to them get the hashed names
+ASSET_DIRS = ("img", "styles", "scripts")
+BUILD_DIR = Path("build/assets")
+MANIFEST_NAME = "manifest.json"
+URL_PREFIX = "/assets/"
+TEXT_SUFFIXES = {".css", ".js", ".svg", ".json"}
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+MAX_IMAGE_WIDTH = 1280
+WEBP_QUALITY = 80
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# A quoted or url()-wrapped reference to a file in one of ASSET_DIRS
+_REFERENCE = re.compile(
+    r"""(?P<open>["'(])/?(?P<path>(?:img|styles|scripts)/[^"')\s?#]+)"""
+)
+
+
+def rewrite(text: str, manifest: Dict[str, str]) -> str:
+    """Replace references to built assets with their hashed URLs."""
+
+    def replace(match):
+        hashed = manifest.get("/" + match.group("path"))
+        if hashed is None:
+            return match.group(0)
+        return match.group("open") + hashed
+
+    return _REFERENCE.sub(replace, text)
+
+
+def _webp(body: bytes) -> Optional[bytes]:
+    """A WebP copy of an image, at most MAX_IMAGE_WIDTH wide, or None."""
+    if Image is None:
+        return None
+    with Image.open(io.BytesIO(body)) as image:
+        if image.width > MAX_IMAGE_WIDTH:
+            height = round(image.height * MAX_IMAGE_WIDTH / image.width)
+            image = image.resize((MAX_IMAGE_WIDTH, height), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, "WEBP", quality=WEBP_QUALITY, method=6)
+    return output.getvalue()
+
+
+def build(root: Path = Path("."), output: Path = BUILD_DIR) -> Dict[str, str]:
+    """Write hashed copies and variants of every asset, and the manifest.
+
+    Returns the manifest, original URL -> hashed URL.
+    """
+    if Image is None:
+        logger.warning("Pillow is not installed, skipping WebP variants")
+    if output.exists():
+        shutil.rmtree(output)
+    manifest: Dict[str, str] = {}
+    for directory in ASSET_DIRS:
+        for path in sorted((root / directory).rglob("*")):
+            if not path.is_file():
+                continue
+            relative = path.relative_to(root)
+            body = path.read_bytes()
+            suffix = path.suffix.lower()
+            if suffix in TEXT_SUFFIXES:
+                body = rewrite(body.decode("utf-8"), manifest).encode("utf-8")
+
+            digest = hashlib.sha256(body).hexdigest()[:12]
+            hashed = relative.with_name(f"{path.stem}.{digest}{path.suffix}")
+            target = output / hashed
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(body)
+            if suffix in TEXT_SUFFIXES:
+                target.with_name(target.name + ".gz").write_bytes(
+                    gzip.compress(body, compresslevel=9, mtime=0)
+                )
+                if brotli:
+                    target.with_name(target.name + ".br").write_bytes(
+                        brotli.compress(body)
+                    )
+            elif suffix in IMAGE_SUFFIXES:
+                webp = _webp(body)
+                if webp is not None:
+                    target.with_name(target.name + ".webp").write_bytes(webp)
+            manifest["/" + relative.as_posix()] = URL_PREFIX + hashed.as_posix()
+
+    (output / MANIFEST_NAME).write_text(
+        json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
+    )
+    logger.info(f"Built {len(manifest)} assets into {output}")
+    return manifest
+
+
+@dataclass
+class Asset:
+    """A built asset and its precomputed variants."""
+
+    body: bytes
+    media_type: str
+    etag: str
+    gzip_body: Optional[bytes] = None
+    br_body: Optional[bytes] = None
+    webp_body: Optional[bytes] = None
+
+
+class AssetStore:
+    """Serves the output of build() from memory."""
+
+    def __init__(self, directory: Path = BUILD_DIR):
+        self.directory = directory
+        self.manifest: Dict[str, str] = {}
+        self._assets: Dict[str, Asset] = {}
+
+    def load(self) -> bool:
+        """Read the manifest and every built file. False if there is no build."""
+        manifest_path = self.directory / MANIFEST_NAME
+        if not manifest_path.exists():
+            logger.info("No asset build found, serving unhashed static files")
+            return False
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        assets = {}
+        for hashed_url in manifest.values():
+            name = hashed_url[len(URL_PREFIX) :]
+            path = self.directory / name
+
+            def variant(extension, path=path):
+                candidate = path.with_name(path.name + extension)
+                return candidate.read_bytes() if candidate.exists() else None
+
+            body = path.read_bytes()
+            webp = variant(".webp")
+            assets[name] = Asset(
+                body=body,
+                media_type=mimetypes.guess_type(path.name)[0]
+                or "application/octet-stream",
+                etag=path.stem.rsplit(".", 1)[-1],
+                gzip_body=variant(".gz"),
+                br_body=variant(".br"),
+                # Only worth sending when it is actually smaller
+                webp_body=webp if webp and len(webp) < len(body) else None,
+            )
+        self.manifest, self._assets = manifest, assets
+        logger.info(f"Loaded {len(assets)} hashed assets into memory")
+        return True
+
+    def rewrite_view(self, body: bytes) -> bytes:
+        """Point a view's asset references at the hashed files."""
+        if not self.manifest:
+            return body
+        return rewrite(body.decode("utf-8"), self.manifest).encode("utf-8")
+
+    def response(self, request: Request, name: str) -> Response:
+        """Serve one hashed asset, picking the best variant the client takes."""
+        asset = self._assets.get(name)
+        if asset is None:
+            return Response(status_code=404)
+
+        headers = {"Cache-Control": IMMUTABLE, "ETag": f'"{asset.etag}"'}
+        body, media_type = asset.body, asset.media_type
+        if asset.webp_body is not None:
+            headers["Vary"] = "Accept"
+            if "image/webp" in request.headers.get("accept", ""):
+                body, media_type = asset.webp_body, "image/webp"
+                headers["ETag"] = f'"{asset.etag}-webp"'
+        elif asset.gzip_body is not None:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request)
+            if asset.br_body is not None and "br" in accepted:
+                body, headers["Content-Encoding"] = asset.br_body, "br"
+            elif "gzip" in accepted:
+                body, headers["Content-Encoding"] = asset.gzip_body, "gzip"
+            if "Content-Encoding" in headers:
+                headers["ETag"] = f'"{asset.etag}-{headers["Content-Encoding"]}"'
+
+        if is_not_modified(request, headers["ETag"]):
+            headers.pop("Content-Encoding", None)
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, headers=headers, media_type=media_type)
+
+
+asset_store = AssetStore()
@@ -0,0 +1,256 @@
+"""
+Read-through cache for database queries.
+
+Read functions in the database layer are wrapped with ``query_cache.cached``
+and the save paths call ``query_cache.invalidate`` for exactly the entries
+their write affects. The default backend is an in-process LRU with a TTL;
+a shared backend (Redis, memcached, ...) can be plugged in with
+``query_cache.set_backend`` as long as it implements ``CacheBackend``.
+Concurrent misses for the same key share a single query.
+
+The save paths also bump shared per-collection write counters, mirrored
+here by ``collection_versions``, which API responses turn into ETags so an
+unchanged poll is answered without running the query at all.
+"""
+
+import functools
+import inspect
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from src.singleflight import SingleFlight
+
+_MISSING = object()
+
+
+class CacheBackend:
+    """Interface for cache storage. All methods are coroutines."""
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for a key."""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float):
+        """Store a value for ttl seconds."""
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with prefix, returning how many went."""
+        raise NotImplementedError
+
+    async def clear(self):
+        """Drop every entry."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return 0
+
+
+class MemoryLRUBackend(CacheBackend):
+    """In-process LRU cache with per-entry expiry and a max entry count."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete_prefix(self, prefix: str) -> int:
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    async def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Uncached:
+    """Wraps a return value that must not be cached, e.g. an error fallback.
+
+    ``on_use`` runs in the context of every caller that receives the value,
+    including callers that joined another caller's query.
+    """
+
+    def __init__(self, value: Any, on_use: Optional[Callable[[], None]] = None):
+        self.value = value
+        self.on_use = on_use
+
+    def unwrap(self) -> Any:
+        """Return the value, running ``on_use`` for the current caller."""
+        if self.on_use is not None:
+            self.on_use()
+        return self.value
+
+
+def no_cache(value: Any, on_use: Optional[Callable[[], None]] = None) -> Uncached:
+    """Return value from a cached function without storing it."""
+    return Uncached(value, on_use)
+
+
+class QueryCache:
+    """Namespaced read-through cache with hit/miss counters."""
+
+    def __init__(self, backend: CacheBackend, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.flights = SingleFlight()
+
+    def set_backend(self, backend: CacheBackend):
+        """Swap the storage backend, e.g. for one shared between workers."""
+        self.backend = backend
+        logger.info(f"Query cache backend set to {type(backend).__name__}")
+
+    @staticmethod
+    def _key(namespace: str, scope: str, args: tuple, kwargs: dict) -> str:
+        parts = [repr(arg) for arg in args]
+        parts += [f"{name}={value!r}" for name, value in sorted(kwargs.items())]
+        return f"{namespace}:{scope}|{','.join(parts)}"
+
+    def cached(
+        self, namespace: str, scope: Optional[Callable[..., Any]] = None
+    ) -> Callable:
+        """Decorate an async read function so its results are cached.
+
+        ``scope`` maps the function's first argument to the value that save
+        paths pass to ``invalidate``, so a write only drops the entries it
+        affects. Cached values are shared between callers and must not be
+        mutated.
+        """
+
+        def decorator(func):
+            signature = inspect.signature(func)
+            first_param = next(iter(signature.parameters), None)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key_scope = ""
+                if scope and first_param:
+                    bound = signature.bind(*args, **kwargs).arguments
+                    key_scope = str(scope(bound.get(first_param)))
+                key = self._key(namespace, key_scope, args, kwargs)
+                if self.enabled:
+                    found, value = await self.backend.get(key)
+                    if found:
+                        self.hits += 1
+                        return value
+
+                async def load():
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    self.misses += 1
+                    result = await func(*args, **kwargs)
+                    if isinstance(result, Uncached):
+                        return result
+                    # Not if a write invalidated the key while the query ran
+                    if self.flights.is_current(key):
+                        await self.backend.set(key, result, self.ttl)
+                    return result
+
+                result = await self.flights.do(key, load)
+                return result.unwrap() if isinstance(result, Uncached) else result
+
+            return wrapper
+
+        return decorator
+
+    async def invalidate(self, namespace: str, scope: Any = _MISSING):
+        """Drop cached entries for a namespace, or only one scope within it."""
+        prefix = f"{namespace}:" if scope is _MISSING else f"{namespace}:{scope}|"
+        self.flights.forget(prefix)
+        self.invalidations += await self.backend.delete_prefix(prefix)
+
+    async def clear(self):
+        """Drop every cached entry."""
+        self.flights.forget()
+        await self.backend.clear()
+
+    def stats(self) -> dict:
+        """Return counters describing how well the cache is doing."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.flights.merged,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": getattr(self.backend, "evictions", 0),
+        }
+
+
+query_cache = QueryCache(
+    MemoryLRUBackend(max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024"))),
+    ttl=float(os.getenv("CACHE_TTL_SECONDS", "30")),
+)
+query_cache.enabled = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+
+
+class CollectionVersions:
+    """This worker's copy of the shared write counters, for cheap ETags.
+
+    The counters live in MongoDB, so every worker (and every restart) hands
+    out the same tag for the same data. The database layer records values
+    here after its own writes and when it polls for other workers' writes.
+    Tags also roll over every ``max_age`` seconds of wall-clock time, so a
+    write made outside the app is picked up once the cached reads expire.
+    """
+
+    def __init__(self, max_age: float = 30.0):
+        self.max_age = max_age
+        # Until the counters are first read, tags could collide with old ones
+        self.loaded = False
+        self._versions: Dict[str, int] = {}
+
+    def get(self, collection_name: str) -> int:
+        """The last counter value seen for a collection."""
+        return self._versions.get(collection_name, 0)
+
+    def observe(self, collection_name: str, version: int):
+        """Record a counter value. Call it after invalidating cached reads."""
+        if version > self.get(collection_name):
+            self._versions[collection_name] = version
+
+    def etag(self, *collection_names: str) -> Optional[str]:
+        """A strong ETag that changes whenever any of the collections does.
+
+        None until the counters have been loaded.
+        """
+        if not self.loaded:
+            return None
+        versions = "-".join(str(self.get(name)) for name in collection_names)
+        window = int(time.time() // self.max_age)
+        return f'"{window}-{versions}"'
+
+
+collection_versions = CollectionVersions(max_age=max(query_cache.ttl, 1.0))
@@ -0,0 +1,88 @@
+"""
+Maintenance commands for RocketTracker.
+
+Run with ``python -m src.cli <command>`` from the project root.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from src import assets, database, indexes
+
+
+async def rebuild_fleet(_args) -> int:
+    """Backfill the fleet summary collection from every launch report."""
+    count = await database.rebuild_fleet_summary()
+    print(f"Rebuilt fleet summary for {count} vehicles")
+    return 0
+
+
+async def backfill_launch_at(_args) -> int:
+    """Add the sortable launchAt field to launch reports that lack it."""
+    count = await database.backfill_launch_at()
+    print(f"Set launchAt on {count} launch reports")
+    return 0
+
+
+async def check_indexes(_args) -> int:
+    """Apply the index spec, then fail if any query shape scans a collection."""
+    await indexes.ensure_indexes(database.db)
+    failed = 0
+    for result in await indexes.verify_query_plans(database.db):
+        status = "ok" if result["ok"] else "COLLECTION SCAN"
+        print(f"{result['name']:<24} {status:<16} {' > '.join(result['stages'])}")
+        failed += not result["ok"]
+    if failed:
+        print(f"{failed} query shape(s) would scan a whole collection")
+        return 1
+    return 0
+
+
+async def build_assets(_args) -> int:
+    """Write content-hashed, precompressed copies of the static files."""
+    manifest = assets.build()
+    print(f"Built {len(manifest)} assets into {assets.BUILD_DIR}")
+    return 0
+
+
+async def _run(func, args, needs_db: bool) -> int:
+    if not needs_db:
+        return await func(args)
+    database.connect()
+    try:
+        return await func(args)
+    finally:
+        database.close()
+
+
+# name -> (function, help text, whether it needs MongoDB)
+COMMANDS = {
+    "rebuild-fleet": (rebuild_fleet, "Rebuild the per-vehicle fleet summary", True),
+    "backfill-launch-at": (
+        backfill_launch_at,
+        "Add launchAt to launch reports saved without it",
+        True,
+    ),
+    "check-indexes": (check_indexes, "Verify every query shape uses an index", True),
+    "build-assets": (
+        build_assets,
+        "Build hashed, precompressed static assets",
+        False,
+    ),
+}
+
+
+def main(argv=None) -> int:
+    """Parse the command line and run the selected command."""
+    parser = argparse.ArgumentParser(prog="python -m src.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_func, help_text, _needs_db) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    args = parser.parse_args(argv)
+    func, _help, needs_db = COMMANDS[args.command]
+    return asyncio.run(_run(func, args, needs_db))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
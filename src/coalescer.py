@@ -0,0 +1,98 @@
+"""
+Write coalescing for single-document inserts.
+
+Inserts that arrive within a few milliseconds of each other are grouped into
+one unordered ``insert_many`` round trip. Each caller still gets its own
+``InsertOneResult`` (or its own exception), so ``insert`` is a drop-in
+replacement for ``collection.insert_one``.
+"""
+
+import asyncio
+from typing import Callable, List, Optional, Set, Tuple
+
+from loguru import logger
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+from pymongo.results import InsertOneResult
+
+
+def write_error_from_details(error: dict) -> WriteError:
+    """Turn one entry of a BulkWriteError's writeErrors into an exception."""
+    if error.get("code") == 11000:
+        return DuplicateKeyError(error.get("errmsg"), error.get("code"), error)
+    return WriteError(error.get("errmsg"), error.get("code"), error)
+
+
+class WriteCoalescer:
+    """Batches inserts for one collection into unordered insert_many calls."""
+
+    def __init__(
+        self,
+        get_collection: Callable,
+        max_batch: int = 100,
+        max_delay: float = 0.005,
+    ):
+        # A callable rather than the collection itself, so the client can be
+        # swapped (reconnects, tests) without rebuilding the coalescer
+        self.get_collection = get_collection
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.documents = 0
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references, or the loop may collect a write mid-flight
+        self._writes: Set[asyncio.Task] = set()
+
+    async def insert(self, document: dict) -> InsertOneResult:
+        """Queue a document for insertion and wait for its batch to be written."""
+        if self.max_delay <= 0:
+            return await self.get_collection().insert_one(document)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((document, future))
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_delay, self._schedule_flush
+            )
+        return await future
+
+    def _schedule_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            write = asyncio.get_running_loop().create_task(self._write(batch))
+            self._writes.add(write)
+            write.add_done_callback(self._writes.discard)
+
+    async def flush(self):
+        """Write everything that is queued or being written, e.g. on shutdown."""
+        self._schedule_flush()
+        if self._writes:
+            await asyncio.gather(*self._writes)
+
+    async def _write(self, batch: List[Tuple[dict, asyncio.Future]]):
+        documents = [document for document, _future in batch]
+        failed = {}
+        try:
+            await self.get_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = write_error_from_details(error)
+        except Exception as e:  # pylint: disable=broad-except
+            # Whole batch failed (network, auth, ...): every caller sees it
+            logger.error(f"Coalesced insert of {len(batch)} documents failed: {e}")
+            failed = {index: e for index in range(len(batch))}
+
+        self.batches += 1
+        self.documents += len(batch)
+        for index, (document, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(InsertOneResult(document["_id"], True))
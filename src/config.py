@@ -0,0 +1,25 @@
+"""
+Environment loading for RocketTracker.
+
+``.env`` in the project root is read exactly once per process, when the
+``src`` package is first imported, so every module sees the same settings
+no matter which one is imported first. Real environment variables win over
+values in the file.
+"""
+
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ENV_PATH = Path(__file__).parent.parent / ".env"
+
+_loaded = False
+
+
+def load_env() -> bool:
+    """Load ENV_PATH into os.environ once. Returns whether a file was read."""
+    global _loaded  # pylint: disable=global-statement
+    if _loaded:
+        return False
+    _loaded = True
+    return load_dotenv(dotenv_path=ENV_PATH)
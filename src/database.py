@@ -6,23 +6,192 @@ save and retrieve launch reports, news posts, and mission data.
 
 import os
 import asyncio
-from pathlib import Path
+import functools
+import inspect
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
-from dotenv import load_dotenv
-from loguru import logger
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, UpdateOne
 from pymongo.errors import PyMongoError, ServerSelectionTimeoutError
+from src.cache import no_cache, query_cache
+from src.coalescer import WriteCoalescer
+from src.dedup import check_duplicate, insert_many_unique, insert_unique, record_key
+from src.feeds import FEED_SIZE, news_feed
+from src.idempotency import HASH_FIELD, KEY_FIELD, Duplicate, recent_submissions
+from src.logconfig import sampled_logger as logger
+from src.metrics import mongo_listeners
+from src.search import search_index
+from src.snapshot import COLLECTIONS as SNAPSHOT_COLLECTIONS
+from src.snapshot import circuit_breaker, mark_served, serve_from_snapshot
+from src.versions import VersionCounters
 
-# Load environment variables from parent directory
-env_path = Path(__file__).parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
+# Connection settings. The client itself is created by connect(), which the
+# app's lifespan calls on startup, so importing this module opens nothing.
+MONGODB_URI = os.getenv("MONGODB_URI")
+MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+# Connections kept open (and opened by warm_pool() before traffic arrives)
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(
+    os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")
+)
+# How often the driver probes servers, which also decides how soon the circuit
+# breaker (see src/snapshot.py) notices an outage and a recovery
+MONGO_HEARTBEAT_FREQUENCY_MS = int(os.getenv("MONGO_HEARTBEAT_FREQUENCY_MS", "10000"))
+# 0 means no socket timeout
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0"))
+# Wire compression, e.g. "zstd,snappy,zlib"; zstd and snappy need extra packages
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
 
-# Initialize the MongoDB client
-client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
-db = client[os.getenv("MONGODB_DB_NAME")]
-collection = db.launch_reports
-news_collection = db.news_posts
-missions_collection = db.missions
+client: Optional[AsyncIOMotorClient] = None
+db = None
+collection = None
+news_collection = None
+missions_collection = None
+fleet_collection = None
+versions_collection = None
+
+# Single inserts arriving within WRITE_COALESCE_MS of each other share a round
+# trip. Set it to 0 to send every insert on its own.
+_coalesce_delay = float(os.getenv("WRITE_COALESCE_MS", "5")) / 1000
+launch_writer = WriteCoalescer(lambda: collection, max_delay=_coalesce_delay)
+mission_writer = WriteCoalescer(lambda: missions_collection, max_delay=_coalesce_delay)
+# Shared write counters behind API ETags
+version_counters = VersionCounters(lambda: versions_collection)
+
+# Keyset pagination settings for launch listings
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 200
+LAUNCH_SORT_FIELDS = ("_id", "launchDate")
+
+# Bookkeeping fields left out of documents returned to clients
+INTERNAL_FIELDS = {HASH_FIELD: 0, KEY_FIELD: 0}
+
+
+def _projection(fields: Optional[Sequence[str]]):
+    """Build a MongoDB projection that returns only the given fields."""
+    if not fields:
+        return INTERNAL_FIELDS
+    return {field: 1 for field in fields}
+
+
+def _snapshot_fallback(func):
+    """Answer a read from the local snapshot while MongoDB is unreachable.
+
+    Goes under ``query_cache.cached``, so entries cached before the outage
+    are still served and snapshot results are never cached.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if circuit_breaker.open:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            result = await serve_from_snapshot(func.__name__, *bound.arguments.values())
+            # Requests that joined this read are marked stale too
+            return no_cache(result, on_use=mark_served)
+        return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def _unavailable(what: str) -> bool:
+    """True if MongoDB is known to be down, so a write would only hang."""
+    if circuit_breaker.open:
+        logger.warning(f"MongoDB unreachable, not saving {what}")
+        return True
+    return False
+
+
+async def dump_collections() -> AsyncIterator[Tuple[str, List[dict]]]:
+    """Every document the snapshot covers, one (collection, batch) at a time."""
+    for name in SNAPSHOT_COLLECTIONS:
+        cursor = db[name].find({}, INTERNAL_FIELDS).batch_size(STREAM_BATCH_SIZE)
+        while batch := await cursor.to_list(length=STREAM_BATCH_SIZE):
+            yield name, batch
+
+
+def _number_scope(number):
+    """Normalise a vehicle number so "012" and 12 share a cache scope."""
+    try:
+        return int(number)
+    except (TypeError, ValueError):
+        return number
+
+
+def connect() -> AsyncIOMotorClient:
+    """Create the MongoDB client and collection handles if not done yet."""
+    # pylint: disable=global-statement
+    global client, db, collection, news_collection, missions_collection
+    global fleet_collection, versions_collection
+    if client is not None:
+        return client
+
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS or None,
+        "heartbeatFrequencyMS": MONGO_HEARTBEAT_FREQUENCY_MS,
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    client = AsyncIOMotorClient(
+        MONGODB_URI, event_listeners=[*mongo_listeners(), circuit_breaker], **options
+    )
+    db = client[MONGODB_DB_NAME]
+    collection = db.launch_reports
+    news_collection = db.news_posts
+    missions_collection = db.missions
+    fleet_collection = db.fleet_summary
+    versions_collection = db.collection_versions
+    return client
+
+
+def close():
+    """Close the MongoDB client and its pooled connections."""
+    # pylint: disable=global-statement
+    global client, db, collection, news_collection, missions_collection
+    global fleet_collection, versions_collection
+    if client is None:
+        return
+    client.close()
+    client = db = None
+    collection = news_collection = missions_collection = fleet_collection = None
+    versions_collection = None
+    logger.info("Closed MongoDB connections")
+
+
+async def warm_pool(connections: int = MONGO_MIN_POOL_SIZE):
+    """Open pooled connections now so the first requests do not pay for it.
+
+    Concurrent pings each check out their own connection, which fills the
+    pool up to ``connections`` instead of waiting for the driver's
+    background maintenance to reach minPoolSize.
+    """
+    if connections <= 0:
+        return
+    started = asyncio.get_running_loop().time()
+    try:
+        await asyncio.gather(
+            *(client.admin.command("ping") for _ in range(connections))
+        )
+    except PyMongoError as e:
+        logger.warning(f"Could not warm the MongoDB connection pool: {e}")
+        return
+    elapsed = asyncio.get_running_loop().time() - started
+    logger.info(
+        "Opened {} MongoDB connections in {:.0f}ms", connections, elapsed * 1000
+    )
 
 
 # Test connection to MongoDB
@@ -41,70 +210,503 @@ async def test_motor_connection():
         return False
 
 
-async def save(launch_report):
-    """Save a launch report to MongoDB"""
+# Vehicle types tracked in the fleet summary, mapped to their launch report fields
+FLEET_VEHICLES = {
+    "booster": ("boosterNumber", "boosterFlightCount"),
+    "ship": ("shipNumber", "shipFlightCount"),
+}
+
+
+def _fleet_entries(launch_report):
+    """Yield (key, type, number, flight count, site) for each vehicle flown."""
+    for vehicle_type, (number_field, count_field) in FLEET_VEHICLES.items():
+        number = launch_report.get(number_field)
+        if not number:
+            continue
+        yield (
+            f"{vehicle_type}:{number}",
+            vehicle_type,
+            number,
+            launch_report.get(count_field) or 0,
+            launch_report.get("launchSite"),
+        )
+
+
+def _fleet_updates(launch_report):
+    """Build the fleet summary upserts for a single launch report."""
+    updates = []
+    for key, vehicle_type, number, flight_count, site in _fleet_entries(launch_report):
+        update = {
+            "$setOnInsert": {"type": vehicle_type, "id": number},
+            "$max": {"flightCount": flight_count},
+            "$inc": {"missionCount": 1},
+        }
+        if site:
+            update["$addToSet"] = {"launchSites": site}
+        updates.append(UpdateOne({"_id": key}, update, upsert=True))
+    return updates
+
+
+def launch_at(launch_report) -> Optional[datetime]:
+    """Combine launchDate and launchTime into one sortable datetime.
+
+    Reports don't carry a timezone, so the value is stored as given (MongoDB
+    treats it as UTC). None if the strings can't be parsed.
+    """
     try:
-        result = await collection.insert_one(launch_report)
-        logger.info(f"Saved report with id: {result.inserted_id}")
-        return result
+        return datetime.fromisoformat(
+            f"{launch_report.get('launchDate')}T{launch_report.get('launchTime')}"
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def _stamp_launch_at(launch_report):
+    when = launch_at(launch_report)
+    if when is not None:
+        launch_report["launchAt"] = when
+
+
+async def backfill_launch_at() -> int:
+    """Set launchAt on launch reports saved before it existed.
+
+    Returns the number of reports updated.
+    """
+    updates = []
+    updated = 0
+    cursor = collection.find(
+        {"launchAt": {"$exists": False}}, {"launchDate": 1, "launchTime": 1}
+    ).batch_size(STREAM_BATCH_SIZE)
+    async for launch in cursor:
+        when = launch_at(launch)
+        if when is None:
+            logger.warning(f"Cannot parse launch date/time of report {launch['_id']}")
+            continue
+        updates.append(UpdateOne({"_id": launch["_id"]}, {"$set": {"launchAt": when}}))
+        if len(updates) >= STREAM_BATCH_SIZE:
+            updated += (
+                await collection.bulk_write(updates, ordered=False)
+            ).modified_count
+            updates = []
+    if updates:
+        updated += (await collection.bulk_write(updates, ordered=False)).modified_count
+    await query_cache.invalidate("launches")
+    await version_counters.bump("launch_reports")
+    logger.info("Backfilled launchAt on {} launch reports", updated)
+    return updated
+
+
+async def update_fleet_summary(*launch_reports):
+    """Fold newly saved launch reports into the fleet summary collection."""
+    updates = [update for report in launch_reports for update in _fleet_updates(report)]
+    if not updates:
+        return
+    try:
+        await fleet_collection.bulk_write(updates, ordered=False)
+    except PyMongoError as e:
+        # The launch is already saved; rebuild_fleet_summary() can repair this
+        logger.error(f"Database error updating fleet summary: {e}")
+
+
+async def save(launch_report, idempotency_key: Optional[str] = None):
+    """Save a launch report to MongoDB.
+
+    Returns the insert result, a Duplicate if the report was already stored,
+    or None on error.
+    """
+    _stamp_launch_at(launch_report)
+    duplicate = check_duplicate("launch_reports", launch_report, idempotency_key)
+    if duplicate is not None:
+        return await record_key(collection, duplicate)
+    if _unavailable("launch report"):
+        return None
+    try:
+        result = await insert_unique(collection, launch_report, launch_writer.insert)
     except PyMongoError as e:
         logger.error(f"Database error saving report: {e}")
         return None
+    if isinstance(result, Duplicate):
+        return result
+    logger.info("Saved report with id: {}", result.inserted_id)
+    recent_submissions.remember("launch_reports", launch_report)
+    await update_fleet_summary(launch_report)
+    await invalidate_launch_caches(launch_report)
+    await version_counters.bump("launch_reports")
+    search_index.add("launch", launch_report)
+    return result
+
+
+async def invalidate_launch_caches(*launch_reports):
+    """Drop cached reads that new launch reports make stale."""
+    await query_cache.invalidate("launches")
+    await query_cache.invalidate("fleet")
+    for scope in {_number_scope(r.get("shipNumber")) for r in launch_reports}:
+        await query_cache.invalidate("ship", scope)
+    for scope in {_number_scope(r.get("boosterNumber")) for r in launch_reports}:
+        await query_cache.invalidate("booster", scope)
+
+
+async def invalidate_for_change(collection_name: str, doc_id, document=None):
+    """Drop cached reads affected by a change seen on the change feed.
 
+    The feed also reports writes made by other workers, whose save paths
+    could not invalidate this worker's cache or update its search index.
+    Without the document (deletes) every namespace the collection feeds is
+    dropped.
+    """
+    # Another worker's submission, remembered so retries here are caught too
+    if document:
+        recent_submissions.remember(collection_name, document)
+    else:
+        recent_submissions.forget(collection_name, doc_id)
+    if collection_name == "launch_reports":
+        await query_cache.invalidate("launch", str(doc_id))
+        if document:
+            await invalidate_launch_caches(document)
+            search_index.add("launch", document)
+        else:
+            for namespace in ("launches", "fleet", "ship", "booster"):
+                await query_cache.invalidate(namespace)
+            search_index.remove("launch", doc_id)
+    elif collection_name == "missions":
+        if document:
+            await query_cache.invalidate("missions", document.get("launch_id"))
+        else:
+            await query_cache.invalidate("missions")
+    elif collection_name == "news_posts":
+        await query_cache.invalidate("news")
+        await query_cache.invalidate("news_post", str(doc_id))
+        await refresh_news_feed()
+        if document:
+            search_index.add("news", document)
+        else:
+            search_index.remove("news", doc_id)
 
-async def get_all_launches():
-    """Retrieve all launch reports"""
+
+async def save_many_launches(launch_reports):
+    """Save a batch of launch reports in one unordered round trip.
+
+    Returns a per-report list of {"id": ...} or {"error": ...} dicts, or None
+    if the whole batch could not be written.
+    """
+    if not launch_reports:
+        return []
+    if _unavailable(f"{len(launch_reports)} launch reports"):
+        return None
+    for report in launch_reports:
+        _stamp_launch_at(report)
     try:
-        cursor = collection.find({})
-        launches = await cursor.to_list(length=None)
-        logger.info("Retrieved all launches")
-        return launches
+        results = await insert_many_unique(collection, launch_reports)
     except PyMongoError as e:
-        logger.error(f"Database error retrieving launches: {e}")
-        return []
+        logger.error(f"Database error saving {len(launch_reports)} reports: {e}")
+        return None
+    saved = [
+        report
+        for report, result in zip(launch_reports, results)
+        if "id" in result and not result.get("duplicate")
+    ]
+    logger.info("Saved {} of {} launch reports", len(saved), len(launch_reports))
+    if saved:
+        await update_fleet_summary(*saved)
+        await invalidate_launch_caches(*saved)
+        await version_counters.bump("launch_reports")
+        for report in saved:
+            search_index.add("launch", report)
+    return results
+
+
+@query_cache.cached("fleet")
+@_snapshot_fallback
+async def get_fleet_summary():
+    """Retrieve the per-vehicle fleet summary, highest flight count first."""
+    fleet = {"boosters": [], "ships": []}
+    try:
+        cursor = fleet_collection.find({}, {"_id": 0}).sort("flightCount", -1)
+        async for vehicle in cursor:
+            fleet[f"{vehicle.pop('type')}s"].append(vehicle)
+    except PyMongoError as e:
+        logger.error(f"Database error retrieving fleet summary: {e}")
+        return no_cache(fleet)
+    return fleet
+
+
+async def rebuild_fleet_summary():
+    """Recompute the fleet summary from every launch report.
+
+    Used to backfill the summary for launches saved before it existed, or to
+    repair it after a failed incremental update. Returns the vehicle count.
+    """
+    summaries = {}
+    async for launch in collection.find({}).batch_size(STREAM_BATCH_SIZE):
+        for key, vehicle_type, number, flight_count, site in _fleet_entries(launch):
+            summary = summaries.setdefault(
+                key,
+                {
+                    "type": vehicle_type,
+                    "id": number,
+                    "flightCount": 0,
+                    "missionCount": 0,
+                    "launchSites": [],
+                },
+            )
+            summary["flightCount"] = max(summary["flightCount"], flight_count)
+            summary["missionCount"] += 1
+            if site and site not in summary["launchSites"]:
+                summary["launchSites"].append(site)
+
+    await fleet_collection.delete_many({"_id": {"$nin": list(summaries)}})
+    for key, summary in summaries.items():
+        await fleet_collection.replace_one({"_id": key}, summary, upsert=True)
+    await query_cache.invalidate("fleet")
+    await version_counters.bump("launch_reports")
+    logger.info("Rebuilt fleet summary for {} vehicles", len(summaries))
+    return len(summaries)
+
+
+async def _launch_keyset_filter(after: Optional[str], sort: str):
+    """Build the query filter that resumes a listing after the given launch id.
+
+    Returns None when the cursor is not a valid ObjectId.
+    """
+    if not after:
+        return {}
+    try:
+        after_oid = ObjectId(after)
+    except (InvalidId, TypeError):
+        logger.warning(f"Invalid pagination cursor: {after}")
+        return None
 
+    if sort == "_id":
+        return {"_id": {"$gt": after_oid}}
 
+    # Sorting by launchDate uses (launchDate, _id) as the key so ties are stable
+    anchor = await collection.find_one({"_id": after_oid}, {sort: 1})
+    if anchor is None:
+        logger.warning(f"Pagination cursor does not exist: {after}")
+        return None
+    value = anchor.get(sort)
+    return {
+        "$or": [
+            {sort: {"$gt": value}},
+            {sort: value, "_id": {"$gt": after_oid}},
+        ]
+    }
+
+
+@query_cache.cached("launches")
+@_snapshot_fallback
+async def get_launches_page(
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    sort: str = "_id",
+    fields: Optional[Sequence[str]] = None,
+):
+    """Retrieve one page of launch reports using keyset pagination.
+
+    Returns a tuple of (launches, next_cursor). next_cursor is the id to pass
+    as ``after`` for the following page, or None when there are no more.
+    ``fields`` limits the returned fields; ``_id`` is always included.
+    """
+    if sort not in LAUNCH_SORT_FIELDS:
+        raise ValueError(f"sort must be one of: {', '.join(LAUNCH_SORT_FIELDS)}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        query = await _launch_keyset_filter(after, sort)
+        if query is None:
+            return [], None
+        sort_spec = [("_id", 1)] if sort == "_id" else [(sort, 1), ("_id", 1)]
+        # Fetch one extra document to know whether another page exists
+        cursor = (
+            collection.find(query, _projection(fields)).sort(sort_spec).limit(limit + 1)
+        )
+        launches = await cursor.to_list(length=limit + 1)
+    except PyMongoError as e:
+        logger.error(f"Database error retrieving launch page: {e}")
+        return no_cache(([], None))
+
+    next_cursor = None
+    if len(launches) > limit:
+        launches = launches[:limit]
+        next_cursor = str(launches[-1]["_id"])
+    return launches, next_cursor
+
+
+@dataclass(frozen=True)
+class LaunchQuery:
+    """Filters, order and size of a /api/launches/query request.
+
+    Frozen, so it can be part of a query cache key.
+    """
+
+    start: Optional[datetime] = None  # inclusive
+    end: Optional[datetime] = None  # exclusive
+    launch_site: Optional[str] = None
+    booster: Optional[int] = None
+    ship: Optional[int] = None
+    min_booster_flights: Optional[int] = None
+    min_ship_flights: Optional[int] = None
+    descending: bool = True
+    limit: int = DEFAULT_PAGE_SIZE
+
+    def __post_init__(self):
+        # Stored datetimes are naive UTC, and mixing aware and naive bounds
+        # would make them incomparable
+        for name in ("start", "end"):
+            bound = getattr(self, name)
+            if bound is not None and bound.tzinfo is not None:
+                naive = bound.astimezone(timezone.utc).replace(tzinfo=None)
+                object.__setattr__(self, name, naive)
+
+    def matches(self, document: dict) -> bool:
+        """Whether a document passes filter(), for reads from the snapshot."""
+        for field, condition in self.filter().items():
+            value = document.get(field)
+            if not isinstance(condition, dict):
+                if value != condition:
+                    return False
+                continue
+            if value is None:
+                return False
+            for operator, bound in condition.items():
+                if operator == "$gte" and not value >= bound:
+                    return False
+                if operator == "$lt" and not value < bound:
+                    return False
+        return True
+
+    def filter(self) -> dict:
+        """The MongoDB filter for these conditions."""
+        query = {}
+        for field, value in (
+            ("launchSite", self.launch_site),
+            ("boosterNumber", self.booster),
+            ("shipNumber", self.ship),
+        ):
+            if value is not None:
+                query[field] = value
+        for field, minimum in (
+            ("boosterFlightCount", self.min_booster_flights),
+            ("shipFlightCount", self.min_ship_flights),
+        ):
+            if minimum is not None:
+                query[field] = {"$gte": minimum}
+        launch_range = {}
+        if self.start is not None:
+            launch_range["$gte"] = self.start
+        if self.end is not None:
+            launch_range["$lt"] = self.end
+        if launch_range:
+            query["launchAt"] = launch_range
+        return query
+
+    def sort(self) -> list:
+        """Sort by launch time, with _id breaking ties."""
+        direction = DESCENDING if self.descending else ASCENDING
+        return [("launchAt", direction), ("_id", direction)]
+
+
+@query_cache.cached("launches")
+@_snapshot_fallback
+async def query_launches(
+    launch_query: LaunchQuery, fields: Optional[Sequence[str]] = None
+):
+    """Retrieve the launch reports matching a LaunchQuery.
+
+    Filtering, sorting and the limit all run in MongoDB on the launchAt
+    compound indexes, so a selective query only reads what it returns.
+    """
+    try:
+        cursor = (
+            collection.find(launch_query.filter(), _projection(fields))
+            .sort(launch_query.sort())
+            .limit(max(1, min(launch_query.limit, MAX_PAGE_SIZE)))
+        )
+        return await cursor.to_list(length=None)
+    except PyMongoError as e:
+        logger.error(f"Database error querying launches: {e}")
+        return no_cache([])
+
+
+async def stream_launches(
+    sort: str = "_id",
+    batch_size: int = STREAM_BATCH_SIZE,
+    fields: Optional[Sequence[str]] = None,
+) -> AsyncIterator[dict]:
+    """Return an iterator over every launch report, as Motor batches arrive.
+
+    Only one batch is held in memory at once, so this is safe to use for
+    collections of any size. While MongoDB is unreachable the launches come
+    from the snapshot, decided here rather than on first iteration so the
+    response headers can say so.
+    """
+    if sort not in LAUNCH_SORT_FIELDS:
+        raise ValueError(f"sort must be one of: {', '.join(LAUNCH_SORT_FIELDS)}")
+    if circuit_breaker.open:
+        return _iterate(await serve_from_snapshot("stream_launches", sort, fields))
+    return _stream_launches(sort, batch_size, fields)
+
+
+async def _iterate(documents) -> AsyncIterator[dict]:
+    for document in documents:
+        yield document
+
+
+async def _stream_launches(sort, batch_size, fields) -> AsyncIterator[dict]:
+    sort_spec = [("_id", 1)] if sort == "_id" else [(sort, 1), ("_id", 1)]
+    cursor = (
+        collection.find({}, _projection(fields)).sort(sort_spec).batch_size(batch_size)
+    )
+    try:
+        async for launch in cursor:
+            yield launch
+    finally:
+        await cursor.close()
+
+
+@query_cache.cached("launch", scope=str)
+@_snapshot_fallback
 async def get_specific_launch(launch_id: str):
     """Retrieve a specific launch by id string."""
     try:
         oid = ObjectId(launch_id)
-        logger.info(f"Retrieving launch with id: {launch_id}")
-    except (TypeError, ValueError):  # invalid ObjectId format
+        logger.info("Retrieving launch with id: {}", launch_id)
+    except (InvalidId, TypeError):  # invalid ObjectId format
         logger.warning(f"Invalid ObjectId format: {launch_id}")
         return None
 
-    launch = await collection.find_one({"_id": oid})
-    if launch:
-        launch["_id"] = str(launch["_id"])  # convert for JSON serialization
-    return launch
+    return await collection.find_one({"_id": oid}, INTERNAL_FIELDS)
 
 
-async def get_missions_by_ship(ship_number: str):
+@query_cache.cached("ship", scope=_number_scope)
+@_snapshot_fallback
+async def get_missions_by_ship(
+    ship_number: str, fields: Optional[Sequence[str]] = None
+):
     """Retrieve all missions completed by a specific ship"""
     try:
         ship_number_int = int(ship_number)
-        cursor = collection.find({"shipNumber": ship_number_int})
-        missions = await cursor.to_list(length=None)
-        for mission in missions:
-            mission["_id"] = str(mission["_id"])
-        return missions
+        cursor = collection.find({"shipNumber": ship_number_int}, _projection(fields))
+        return await cursor.to_list(length=None)
     except ValueError:
         logger.warning(f"Invalid ship number format: {ship_number}")
         return []
     except PyMongoError as e:
         logger.error(f"Database error retrieving missions for ship {ship_number}: {e}")
-        return []
+        return no_cache([])
 
 
-async def get_missions_by_booster(booster_number: str):
+@query_cache.cached("booster", scope=_number_scope)
+@_snapshot_fallback
+async def get_missions_by_booster(
+    booster_number: str, fields: Optional[Sequence[str]] = None
+):
     """Retrieve all missions completed by a specific booster"""
     try:
         booster_number_int = int(booster_number)
-        cursor = collection.find({"boosterNumber": booster_number_int})
-        missions = await cursor.to_list(length=None)
-        for mission in missions:
-            mission["_id"] = str(mission["_id"])
-        return missions
+        cursor = collection.find(
+            {"boosterNumber": booster_number_int}, _projection(fields)
+        )
+        return await cursor.to_list(length=None)
     except ValueError:
         logger.warning(f"Invalid booster number format: {booster_number}")
         return []
@@ -112,33 +714,133 @@ async def get_missions_by_booster(booster_number: str):
         logger.error(
             f"Database error retrieving missions for booster {booster_number}: {e}"
         )
-        return []
+        return no_cache([])
+
 
+async def save_news_post(news_post, idempotency_key: Optional[str] = None):
+    """Save a news post to MongoDB.
 
-async def save_news_post(news_post):
-    """Save a news post to MongoDB"""
+    Returns the insert result, a Duplicate if the post was already stored,
+    or None on error.
+    """
+    duplicate = check_duplicate("news_posts", news_post, idempotency_key)
+    if duplicate is not None:
+        return await record_key(news_collection, duplicate)
+    if _unavailable("news post"):
+        return None
     try:
-        result = await news_collection.insert_one(news_post)
-        logger.info(f"Saved news post with id: {result.inserted_id}")
-        return result
+        result = await insert_unique(
+            news_collection, news_post, news_collection.insert_one
+        )
     except PyMongoError as e:
         logger.error(f"Database error saving news post: {e}")
         return None
+    if isinstance(result, Duplicate):
+        return result
+    logger.info("Saved news post with id: {}", result.inserted_id)
+    recent_submissions.remember("news_posts", news_post)
+    await query_cache.invalidate("news")
+    await version_counters.bump("news_posts")
+    await refresh_news_feed()
+    search_index.add("news", news_post)
+    return result
+
+
+# Newest first, with _id breaking ties between posts with equal timestamps
+NEWS_SORT = [("timestamp", DESCENDING), ("_id", DESCENDING)]
+
 
+@query_cache.cached("news")
+@_snapshot_fallback
+async def get_news_page(
+    limit: int = DEFAULT_PAGE_SIZE,
+    before: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+):
+    """Retrieve one page of news posts, newest first, using keyset pagination.
 
-async def get_all_news_posts():
-    """Retrieve all news posts, sorted by newest first"""
+    Returns a tuple of (posts, next_cursor) like get_launches_page(); pass
+    next_cursor as ``before`` to get the following (older) page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = {}
     try:
-        cursor = news_collection.find({}).sort("timestamp", -1)
-        posts = await cursor.to_list(length=None)
-        for post in posts:
-            post["_id"] = str(post["_id"])
-        return posts
+        if before:
+            try:
+                before_oid = ObjectId(before)
+            except (InvalidId, TypeError):
+                logger.warning(f"Invalid news pagination cursor: {before}")
+                return [], None
+            anchor = await news_collection.find_one(
+                {"_id": before_oid}, {"timestamp": 1}
+            )
+            if anchor is None:
+                logger.warning(f"News pagination cursor does not exist: {before}")
+                return [], None
+            timestamp = anchor.get("timestamp")
+            query = {
+                "$or": [
+                    {"timestamp": {"$lt": timestamp}},
+                    {"timestamp": timestamp, "_id": {"$lt": before_oid}},
+                ]
+            }
+        cursor = (
+            news_collection.find(query, _projection(fields))
+            .sort(NEWS_SORT)
+            .limit(limit + 1)
+        )
+        posts = await cursor.to_list(length=limit + 1)
     except PyMongoError as e:
-        logger.error(f"Database error retrieving news posts: {e}")
-        return []
+        logger.error(f"Database error retrieving news page: {e}")
+        return no_cache(([], None))
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = str(posts[-1]["_id"])
+    return posts, next_cursor
+
+
+@query_cache.cached("news")
+@_snapshot_fallback
+async def get_newest_news_post():
+    """Return the _id and timestamp of the newest post, or None.
+
+    Used as the validator for conditional GETs on the news listing.
+    """
+    try:
+        return await news_collection.find_one(
+            {}, {"_id": 1, "timestamp": 1}, sort=NEWS_SORT
+        )
+    except PyMongoError as e:
+        logger.error(f"Database error retrieving newest news post: {e}")
+        return no_cache(None)
+
+
+async def refresh_news_feed():
+    """Re-render the Atom feed from the newest posts.
+
+    On a database error the previous rendering is kept.
+    """
+    try:
+        cursor = news_collection.find({}).sort(NEWS_SORT).limit(FEED_SIZE)
+        posts = await cursor.to_list(length=FEED_SIZE)
+    except PyMongoError as e:
+        logger.error(f"Database error rendering news feed: {e}")
+        return news_feed.current
+    logger.info("Rendered news feed with {} posts", len(posts))
+    return news_feed.update(posts)
 
 
+async def get_news_feed():
+    """Return the rendered Atom feed, rendering it on first use."""
+    if news_feed.current is None:
+        await refresh_news_feed()
+    return news_feed.current
+
+
+@query_cache.cached("news_post", scope=str)
+@_snapshot_fallback
 async def get_specific_news_post(post_id: str):
     """Retrieve a specific news post by id string"""
     try:
@@ -147,32 +849,84 @@ async def get_specific_news_post(post_id: str):
         logger.warning(f"Invalid ObjectId for news post: {post_id}")
         return None
 
-    post = await news_collection.find_one({"_id": oid})
-    if post:
-        post["_id"] = str(post["_id"])
-    return post
+    return await news_collection.find_one({"_id": oid}, INTERNAL_FIELDS)
+
 
+async def save_mission(mission_data, idempotency_key: Optional[str] = None):
+    """Save a mission report to MongoDB.
 
-async def save_mission(mission_data):
-    """Save a mission report to MongoDB"""
+    Returns the insert result, a Duplicate if the mission was already stored,
+    or None on error.
+    """
+    duplicate = check_duplicate("missions", mission_data, idempotency_key)
+    if duplicate is not None:
+        return await record_key(missions_collection, duplicate)
+    if _unavailable("mission"):
+        return None
     try:
-        result = await missions_collection.insert_one(mission_data)
-        logger.info(f"Saved mission with id: {result.inserted_id}")
-        return result
+        result = await insert_unique(
+            missions_collection, mission_data, mission_writer.insert
+        )
     except PyMongoError as e:
         logger.error(f"Database error saving mission: {e}")
         return None
+    if isinstance(result, Duplicate):
+        return result
+    logger.info("Saved mission with id: {}", result.inserted_id)
+    recent_submissions.remember("missions", mission_data)
+    await query_cache.invalidate("missions", mission_data.get("launch_id"))
+    await version_counters.bump("missions")
+    return result
+
 
+async def save_many_missions(missions):
+    """Save a batch of mission reports in one unordered round trip.
 
-async def get_missions_by_launch(launch_id: str):
+    Returns a per-mission list of {"id": ...} or {"error": ...} dicts, or None
+    if the whole batch could not be written.
+    """
+    if not missions:
+        return []
+    if _unavailable(f"{len(missions)} missions"):
+        return None
+    try:
+        results = await insert_many_unique(missions_collection, missions)
+    except PyMongoError as e:
+        logger.error(f"Database error saving {len(missions)} missions: {e}")
+        return None
+    saved = [
+        mission
+        for mission, result in zip(missions, results)
+        if "id" in result and not result.get("duplicate")
+    ]
+    logger.info("Saved {} of {} missions", len(saved), len(missions))
+    if saved:
+        for launch_id in {mission.get("launch_id") for mission in saved}:
+            await query_cache.invalidate("missions", launch_id)
+        await version_counters.bump("missions")
+    return results
+
+
+@query_cache.cached("missions", scope=str)
+@_snapshot_fallback
+async def get_missions_by_launch(
+    launch_id: str, fields: Optional[Sequence[str]] = None
+):
     """Retrieve all missions for a specific launch"""
     try:
-        cursor = missions_collection.find({"launch_id": launch_id})
-        logger.info(f"Retrieving missions for launch id: {launch_id}")
-        missions = await cursor.to_list(length=None)
-        for mission in missions:
-            mission["_id"] = str(mission["_id"])
-        return missions
+        cursor = missions_collection.find({"launch_id": launch_id}, _projection(fields))
+        logger.info("Retrieving missions for launch id: {}", launch_id)
+        return await cursor.to_list(length=None)
     except PyMongoError as e:
         logger.error(f"Database error retrieving missions for launch {launch_id}: {e}")
-        return []
+        return no_cache([])
+
+
+async def get_launch_with_missions(launch_id: str):
+    """Retrieve a launch and its missions together, or None if it doesn't exist."""
+    launch, missions = await asyncio.gather(
+        get_specific_launch(launch_id), get_missions_by_launch(launch_id)
+    )
+    if not launch:
+        return None
+    return {"launch": launch, "missions": missions}
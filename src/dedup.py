@@ -0,0 +1,180 @@
+"""
+Storing submissions at most once.
+
+The MongoDB side of src/idempotency.py: documents are stamped with their
+content hash and Idempotency-Key, checked against the recent submissions,
+and inserted so that a copy rejected by the unique indexes is answered with
+the stored one. Stored copies older than IDEMPOTENCY_TTL give way.
+"""
+
+from typing import Optional
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from src.idempotency import (
+    HASH_FIELD,
+    KEY_FIELD,
+    Duplicate,
+    IdempotencyConflict,
+    content_hash,
+    duplicate_submissions,
+    expired,
+    recent_submissions,
+)
+from src.logconfig import sampled_logger as logger
+from src.snapshot import circuit_breaker
+
+
+def check_duplicate(
+    collection_name: str, document: dict, idempotency_key: Optional[str] = None
+) -> Optional[Duplicate]:
+    """Stamp a document for deduplication and check the recent submissions.
+
+    Raises IdempotencyConflict if the key was already used for other content.
+    """
+    document[HASH_FIELD] = content_hash(document)
+    if idempotency_key:
+        document[KEY_FIELD] = idempotency_key
+    duplicate = recent_submissions.check(collection_name, document)
+    if duplicate is not None:
+        duplicate_submissions.inc(collection_name, "memory")
+        logger.info("Duplicate {} submission of {}", collection_name, duplicate[0])
+    return duplicate
+
+
+async def record_key(target, duplicate: Duplicate) -> Duplicate:
+    """Store the Idempotency-Key of a content match on the stored copy.
+
+    Otherwise the key could later be used for other content without a
+    conflict. The recent submissions already know it on this worker.
+    """
+    if not duplicate.new_key or circuit_breaker.open:
+        return duplicate
+    try:
+        # A copy stored with a key of its own keeps it
+        await target.update_one(
+            {"_id": duplicate.inserted_id, KEY_FIELD: {"$exists": False}},
+            {"$set": {KEY_FIELD: duplicate.new_key}},
+        )
+    except PyMongoError as e:
+        logger.warning(f"Could not record idempotency key in {target.name}: {e}")
+    return duplicate
+
+
+async def release_expired(target, existing: dict) -> bool:
+    """Free the hash and key of a stored copy too old to count as a duplicate.
+
+    Returns False if the copy still counts.
+    """
+    if not expired(existing["_id"]):
+        return False
+    await target.update_one(
+        {"_id": existing["_id"]}, {"$unset": {HASH_FIELD: "", KEY_FIELD: ""}}
+    )
+    recent_submissions.forget(target.name, existing["_id"])
+    logger.info("Released expired {} submission {}", target.name, existing["_id"])
+    return True
+
+
+async def find_duplicate(target, document: dict) -> Optional[Duplicate]:
+    """Find the stored copy of a document whose insert hit a unique index.
+
+    Returns None if no stored copy counts any more, so the insert can be
+    retried. Raises IdempotencyConflict if the key was already used for
+    other content.
+    """
+    if document.get(KEY_FIELD):
+        existing = await target.find_one(
+            {KEY_FIELD: document[KEY_FIELD]}, {HASH_FIELD: 1, KEY_FIELD: 1}
+        )
+        if existing and not await release_expired(target, existing):
+            if existing.get(HASH_FIELD) != document[HASH_FIELD]:
+                raise IdempotencyConflict(document[KEY_FIELD])
+            recent_submissions.remember(target.name, existing)
+            duplicate_submissions.inc(target.name, "database")
+            return Duplicate(existing["_id"])
+    existing = await target.find_one(
+        {HASH_FIELD: document[HASH_FIELD]}, {HASH_FIELD: 1}
+    )
+    if not existing or await release_expired(target, existing):
+        return None
+    key = document.get(KEY_FIELD)
+    recent_submissions.remember(target.name, {**existing, KEY_FIELD: key})
+    duplicate_submissions.inc(target.name, "database")
+    return await record_key(target, Duplicate(existing["_id"], new_key=key))
+
+
+async def insert_unique(target, document: dict, insert):
+    """Insert a stamped document, or return the Duplicate it is a copy of.
+
+    ``insert`` is the insert_one-like call to use. If the stored copy was
+    too old to count, the insert is tried again once it has been released.
+    """
+    for _attempt in range(2):
+        try:
+            return await insert(document)
+        except DuplicateKeyError:
+            duplicate = await find_duplicate(target, document)
+            if duplicate is not None:
+                return duplicate
+    return await insert(document)
+
+
+async def insert_many_unique(target, documents):
+    """Insert documents without stopping at the first failure.
+
+    Returns one dict per document: {"id": <inserted id>} or {"error": <reason>}.
+    Documents that were already stored get {"id": <stored id>, "duplicate":
+    True}; the recent submissions answer most of those without a round trip.
+    """
+    results = [None] * len(documents)
+    fresh = []
+    for index, document in enumerate(documents):
+        duplicate = check_duplicate(target.name, document)
+        if duplicate is not None:
+            results[index] = {"id": str(duplicate.inserted_id), "duplicate": True}
+        else:
+            fresh.append(index)
+    if not fresh:
+        return results
+
+    failed = {}
+    try:
+        await target.insert_many([documents[i] for i in fresh], ordered=False)
+    except BulkWriteError as e:
+        failed = {fresh[err["index"]]: err for err in e.details.get("writeErrors", [])}
+    for index in fresh:
+        if index not in failed:
+            results[index] = {"id": str(documents[index]["_id"])}
+            recent_submissions.remember(target.name, documents[index])
+        else:
+            results[index] = {"error": failed[index].get("errmsg", "write failed")}
+
+    # Duplicates within the batch, or stored by another worker: one lookup
+    rejected = {}
+    for index, err in failed.items():
+        if err.get("code") == 11000:
+            rejected.setdefault(documents[index][HASH_FIELD], []).append(index)
+    if not rejected:
+        return results
+    released = []
+    try:
+        cursor = target.find({HASH_FIELD: {"$in": list(rejected)}}, {HASH_FIELD: 1})
+        for existing in await cursor.to_list(length=None):
+            indexes = rejected[existing[HASH_FIELD]]
+            if await release_expired(target, existing):
+                released.extend(indexes)
+                continue
+            for index in indexes:
+                results[index] = {"id": str(existing["_id"]), "duplicate": True}
+                duplicate_submissions.inc(target.name, "database")
+    except PyMongoError as e:
+        logger.error(f"Database error looking up duplicates in {target.name}: {e}")
+    if released:
+        # Copies too old to count gave way, so these go in after all
+        retried = await insert_many_unique(
+            target, [documents[index] for index in released]
+        )
+        for index, result in zip(released, retried):
+            results[index] = result
+    return results
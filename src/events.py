@@ -0,0 +1,216 @@
+"""
+Live change feed for launches, missions and news.
+
+One background task per worker watches the launch_reports, missions and
+news_posts collections (a MongoDB change stream, or polling by ``_id`` when
+the server does not support change streams) and fans small deltas out to
+every subscriber. Thousands of SSE clients therefore cost one Mongo cursor.
+"""
+
+import asyncio
+from typing import Optional, Set
+
+from loguru import logger
+from pymongo.errors import OperationFailure, PyMongoError
+
+from src import database
+from src.metrics import CallbackMetric, registry
+from src.tasks import cancel
+
+# Collection name -> (event type, fields copied into the delta)
+WATCHED = {
+    # Everything a launch card shows, so viewers can update without a fetch
+    "launch_reports": (
+        "launch",
+        (
+            "boosterNumber",
+            "boosterFlightCount",
+            "shipNumber",
+            "shipFlightCount",
+            "launchSite",
+            "launchDate",
+            "launchTime",
+            "livestream",
+        ),
+    ),
+    "missions": ("mission", ("launch_id", "mission_category")),
+    "news_posts": ("news", ("title", "author", "timestamp")),
+}
+
+POLL_INTERVAL = 2.0
+RETRY_DELAY = 5.0
+SUBSCRIBER_QUEUE_SIZE = 100
+# Server error code for "$changeStream is only supported on replica sets"
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+
+class Broadcaster:
+    """Fans events out to subscriber queues without ever blocking."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.published = 0
+        self.closed = False
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a new subscriber and return its queue.
+
+        Once closed, the queue only holds the end-of-stream marker, None.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.closed:
+            queue.put_nowait(None)
+        else:
+            self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Forget a subscriber."""
+        self.subscribers.discard(queue)
+
+    def publish(self, event: dict):
+        """Queue an event for every subscriber.
+
+        A subscriber that has fallen behind loses its oldest event rather
+        than slowing everyone else down.
+        """
+        self.published += 1
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def close(self):
+        """End every subscription, e.g. on shutdown."""
+        self.closed = True
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        self.subscribers.clear()
+
+
+def make_event(collection_name: str, operation: str, document_id, document=None):
+    """Build the compact delta sent to subscribers."""
+    event_type, fields = WATCHED[collection_name]
+    event = {"type": event_type, "op": operation, "id": str(document_id)}
+    if document:
+        event["data"] = {field: document.get(field) for field in fields}
+    return event
+
+
+class ChangeFeed:
+    """Background watcher that turns collection changes into events."""
+
+    def __init__(self, target: Broadcaster):
+        self.broadcaster = target
+        self.mode = "stopped"
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start watching in the background. Safe to call more than once."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop watching and wait for the task to finish."""
+        await cancel(self._task)
+        self._task = None
+        self.mode = "stopped"
+
+    async def _handle(self, collection_name: str, operation: str, doc_id, document):
+        # Local caches may hold data written by another worker, drop it
+        await database.invalidate_for_change(collection_name, doc_id, document)
+        self.broadcaster.publish(
+            make_event(collection_name, operation, doc_id, document)
+        )
+
+    async def _run(self):
+        resume_token = None
+        while True:
+            try:
+                self.mode = "change_stream"
+                resume_token = await self._watch(resume_token)
+            except OperationFailure as e:
+                if e.code != CHANGE_STREAMS_UNSUPPORTED:
+                    logger.error(f"Change stream failed, restarting: {e}")
+                    resume_token = None
+                else:
+                    # Standalone servers have no change streams; poll instead
+                    logger.warning("Change streams unavailable, polling instead")
+                    self.mode = "polling"
+                    try:
+                        await self._poll()
+                    except PyMongoError as poll_error:
+                        logger.error(f"Change feed polling failed: {poll_error}")
+            except PyMongoError as e:
+                logger.error(f"Change feed interrupted: {e}")
+            await asyncio.sleep(RETRY_DELAY)
+
+    async def _watch(self, resume_token):
+        pipeline = [
+            {
+                "$match": {
+                    "ns.coll": {"$in": list(WATCHED)},
+                    "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+                }
+            }
+        ]
+        async with database.db.watch(
+            pipeline, resume_after=resume_token, full_document="updateLookup"
+        ) as stream:
+            logger.info("Watching collections with a change stream")
+            async for change in stream:
+                resume_token = stream.resume_token
+                await self._handle(
+                    change["ns"]["coll"],
+                    change["operationType"],
+                    change["documentKey"]["_id"],
+                    change.get("fullDocument"),
+                )
+        return resume_token
+
+    async def _poll(self):
+        """Fallback: look for documents with a newer _id than last seen."""
+        last_ids = {}
+        for collection_name in WATCHED:
+            newest = await database.db[collection_name].find_one(
+                {}, {"_id": 1}, sort=[("_id", -1)]
+            )
+            last_ids[collection_name] = newest["_id"] if newest else None
+        logger.info(f"Polling collections every {POLL_INTERVAL}s")
+
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            for collection_name, last_id in last_ids.items():
+                query = {"_id": {"$gt": last_id}} if last_id else {}
+                cursor = (
+                    database.db[collection_name].find(query).sort("_id", 1).limit(100)
+                )
+                async for document in cursor:
+                    last_ids[collection_name] = document["_id"]
+                    await self._handle(
+                        collection_name, "insert", document["_id"], document
+                    )
+
+
+broadcaster = Broadcaster()
+change_feed = ChangeFeed(broadcaster)
+
+registry.register(
+    CallbackMetric(
+        "rocketracker_stream_subscribers",
+        "Clients connected to the live event stream.",
+        "gauge",
+        lambda: len(broadcaster.subscribers),
+    )
+)
+registry.register(
+    CallbackMetric(
+        "rocketracker_stream_events_total",
+        "Events published to the live event stream.",
+        "counter",
+        lambda: broadcaster.published,
+    )
+)
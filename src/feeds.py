@@ -0,0 +1,126 @@
+"""
+Pre-rendered Atom feed of the latest news posts.
+
+The feed is rendered (and gzipped) only when the news changes, so serving
+/news/feed.xml is a dictionary lookup plus a conditional-GET check.
+"""
+
+import gzip
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from src.responses import accepted_encodings, http_date, is_not_modified
+
+# Number of posts included in the feed
+FEED_SIZE = 20
+# Absolute site URL used for feed links, e.g. https://rocketracker.example
+SITE_URL = os.getenv("SITE_URL", "").rstrip("/")
+FEED_TITLE = "RocketRacker News"
+
+
+@dataclass
+class RenderedFeed:
+    """A rendered feed with its compressed form and validators."""
+
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    updated: datetime
+
+
+def parse_timestamp(value) -> datetime:
+    """Read a post timestamp (ISO string, naive values are local time)."""
+    if isinstance(value, datetime):
+        when = value
+    else:
+        try:
+            when = datetime.fromisoformat(str(value))
+        except ValueError:
+            when = datetime.fromtimestamp(0)
+    return when.astimezone(timezone.utc)
+
+
+def render_atom(posts: list) -> bytes:
+    """Render posts (newest first) as an Atom 1.0 document."""
+    if posts:
+        updated = parse_timestamp(posts[0].get("timestamp"))
+    else:
+        updated = datetime.fromtimestamp(0, timezone.utc)
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{FEED_TITLE}</title>",
+        "  <id>urn:rocketracker:news</id>",
+        f"  <updated>{updated.isoformat(timespec='seconds')}</updated>",
+        f"  <link rel=\"alternate\" href={quoteattr(SITE_URL + '/news')}/>",
+        f"  <link rel=\"self\" href={quoteattr(SITE_URL + '/news/feed.xml')}/>",
+    ]
+    for post in posts:
+        published = parse_timestamp(post.get("timestamp")).isoformat(timespec="seconds")
+        lines += [
+            "  <entry>",
+            f"    <id>urn:rocketracker:news:{post['_id']}</id>",
+            f"    <title>{escape(post.get('title', ''))}</title>",
+            f"    <author><name>{escape(post.get('author', ''))}</name></author>",
+            f"    <published>{published}</published>",
+            f"    <updated>{published}</updated>",
+            f"    <link rel=\"alternate\" href={quoteattr(SITE_URL + '/news')}/>",
+            f"    <content type=\"text\">{escape(post.get('content', ''))}</content>",
+            "  </entry>",
+        ]
+    lines.append("</feed>")
+    return "\n".join(lines).encode("utf-8")
+
+
+class NewsFeed:
+    """Holds the current rendering of the news feed."""
+
+    def __init__(self):
+        self.current: Optional[RenderedFeed] = None
+
+    def update(self, posts: list) -> RenderedFeed:
+        """Render the given newest-first posts and make them current."""
+        body = render_atom(posts)
+        self.current = RenderedFeed(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            updated=parse_timestamp(posts[0].get("timestamp")) if posts else None,
+        )
+        return self.current
+
+    def response(self, request: Request) -> Response:
+        """Serve the current feed, answering 304 when the client has it."""
+        feed = self.current
+        headers = {
+            "ETag": feed.etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache",
+        }
+        if feed.updated is not None:
+            headers["Last-Modified"] = http_date(feed.updated)
+
+        body = feed.body
+        if "gzip" in accepted_encodings(request):
+            body = feed.gzip_body
+            headers["Content-Encoding"] = "gzip"
+            # Each encoding is its own representation, so tag it separately
+            headers["ETag"] = feed.etag[:-1] + '-gzip"'
+        if is_not_modified(request, headers["ETag"], feed.updated):
+            headers.pop("Content-Encoding", None)
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=body,
+            headers=headers,
+            media_type="application/atom+xml; charset=utf-8",
+        )
+
+
+news_feed = NewsFeed()
@@ -0,0 +1,155 @@
+"""
+Duplicate detection for submissions.
+
+Every submitted document is stored with a hash of its content and, when the
+client sent one, its ``Idempotency-Key``. Partial unique indexes on both make
+MongoDB reject a second copy, even one sent to another worker, and a bounded
+in-memory map of recently stored keys and hashes catches most retries
+without a round trip. Either way the caller gets the id of the stored copy
+back, so a retry can be answered with the original response.
+
+Content only counts as a duplicate for IDEMPOTENCY_TTL seconds. A stored
+copy that is older (by its ObjectId timestamp) gives up its content hash
+when the index rejects a new one, and the new one is inserted.
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional, Tuple
+
+import orjson
+from bson import ObjectId
+
+from src.metrics import Counter, registry
+
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+MAX_KEY_LENGTH = 255
+
+HASH_FIELD = "contentHash"
+KEY_FIELD = "idempotencyKey"
+# Set by the server, so they differ between retries of the same submission
+VOLATILE_FIELDS = frozenset({"_id", "timestamp", HASH_FIELD, KEY_FIELD})
+
+duplicate_submissions = registry.register(
+    Counter(
+        "rocketracker_duplicate_submissions_total",
+        "Submissions answered with an already stored document.",
+        ("collection", "source"),
+    )
+)
+
+
+class Duplicate(NamedTuple):
+    """Returned instead of an insert result when the document already exists."""
+
+    inserted_id: Any
+    # Matched by content, with an Idempotency-Key not yet recorded for it
+    new_key: Optional[str] = None
+
+
+class IdempotencyConflict(Exception):
+    """An Idempotency-Key was reused for a different submission."""
+
+
+def content_hash(document: dict) -> str:
+    """Hash of a document's submitted fields, independent of key order."""
+    content = {k: v for k, v in document.items() if k not in VOLATILE_FIELDS}
+    encoded = orjson.dumps(content, default=str, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def created_at(doc_id) -> float:
+    """When a document was stored, from its ObjectId; now if that is unknown."""
+    if isinstance(doc_id, ObjectId):
+        return doc_id.generation_time.timestamp()
+    return time.time()
+
+
+def expired(doc_id, ttl: float = IDEMPOTENCY_TTL) -> bool:
+    """Whether a stored document is too old to count as a duplicate."""
+    return time.time() - created_at(doc_id) > ttl
+
+
+class RecentSubmissions:
+    """Bounded LRU of recently stored keys and content hashes.
+
+    Entries map (collection, kind, value) to (expires at, content hash, id).
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 86400):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, str, Any]]" = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _set(self, key: Tuple[str, str, str], digest: str, doc_id):
+        # Counted from when the document was stored, like the database check
+        self._entries[key] = (created_at(doc_id) + self.ttl, digest, doc_id)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get(self, key: Tuple[str, str, str]) -> Optional[Tuple[float, str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def remember(self, collection_name: str, document: dict):
+        """Record a stored document that carries a content hash."""
+        digest = document.get(HASH_FIELD)
+        if not digest:
+            return
+        self._set((collection_name, "hash", digest), digest, document["_id"])
+        if document.get(KEY_FIELD):
+            key = (collection_name, "key", document[KEY_FIELD])
+            self._set(key, digest, document["_id"])
+
+    def forget(self, collection_name: str, doc_id):
+        """Drop every entry pointing at a deleted document."""
+        stale = [
+            key
+            for key, (_expires, _digest, entry_id) in self._entries.items()
+            if key[0] == collection_name and entry_id == doc_id
+        ]
+        for key in stale:
+            del self._entries[key]
+
+    def check(self, collection_name: str, document: dict) -> Optional[Duplicate]:
+        """Return the stored copy of a hashed document, if one is known.
+
+        Raises IdempotencyConflict if its key was used for other content.
+        """
+        digest = document[HASH_FIELD]
+        if document.get(KEY_FIELD):
+            entry = self._get((collection_name, "key", document[KEY_FIELD]))
+            if entry is not None:
+                if entry[1] != digest:
+                    raise IdempotencyConflict(document[KEY_FIELD])
+                return Duplicate(entry[2])
+        entry = self._get((collection_name, "hash", digest))
+        if entry is None:
+            return None
+        key = document.get(KEY_FIELD)
+        if key:
+            # From now on the key must conflict with other content
+            self._set((collection_name, "key", key), digest, entry[2])
+        return Duplicate(entry[2], new_key=key or None)
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+
+recent_submissions = RecentSubmissions(IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL)
@@ -0,0 +1,234 @@
+"""
+MongoDB indexes and the query shapes they serve.
+
+``INDEXES`` is applied on startup; ``QUERY_SHAPES`` lists every query the
+database layer issues, so ``verify_query_plans`` (and ``python -m src.cli
+check-indexes``) can flag one that would scan a whole collection.
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from src.idempotency import HASH_FIELD, KEY_FIELD
+from src.logconfig import sampled_logger as logger
+
+# Indexes every collection should have, applied idempotently on startup
+INDEXES = {
+    "launch_reports": [
+        IndexModel(
+            [("launchDate", ASCENDING), ("_id", ASCENDING)], name="launchDate_1__id_1"
+        ),
+        # Equality field first, then the launchAt sort (which also serves date
+        # ranges), so filtered queries read only the entries they return.
+        # The vehicle ones also serve plain shipNumber/boosterNumber lookups.
+        IndexModel(
+            [("launchAt", ASCENDING), ("_id", ASCENDING)], name="launchAt_1__id_1"
+        ),
+        IndexModel(
+            [("launchSite", ASCENDING), ("launchAt", ASCENDING), ("_id", ASCENDING)],
+            name="launchSite_1_launchAt_1__id_1",
+        ),
+        IndexModel(
+            [("boosterNumber", ASCENDING), ("launchAt", ASCENDING), ("_id", ASCENDING)],
+            name="boosterNumber_1_launchAt_1__id_1",
+        ),
+        IndexModel(
+            [("shipNumber", ASCENDING), ("launchAt", ASCENDING), ("_id", ASCENDING)],
+            name="shipNumber_1_launchAt_1__id_1",
+        ),
+    ],
+    "news_posts": [
+        IndexModel(
+            [("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="timestamp_-1__id_-1",
+        )
+    ],
+    "missions": [IndexModel([("launch_id", ASCENDING)], name="launch_id_1")],
+    "fleet_summary": [IndexModel([("flightCount", DESCENDING)], name="flightCount_-1")],
+}
+
+# Collections whose documents are stamped with a content hash (and an
+# Idempotency-Key when given) that must be unique. Partial, so documents
+# stored before deduplication existed don't collide on a missing field.
+DEDUPLICATED = ("launch_reports", "news_posts", "missions")
+for _collection_name in DEDUPLICATED:
+    INDEXES[_collection_name] += [
+        IndexModel(
+            [(field, ASCENDING)],
+            name=f"{field}_1",
+            unique=True,
+            partialFilterExpression={field: {"$exists": True}},
+        )
+        for field in (HASH_FIELD, KEY_FIELD)
+    ]
+
+# Every query shape src/database.py issues, used by verify_query_plans().
+# full_read marks queries that return the whole collection on purpose.
+_SAMPLE_ID = ObjectId("000000000000000000000000")
+QUERY_SHAPES = [
+    {
+        "name": "launches_all",
+        "collection": "launch_reports",
+        "filter": {},
+        "full_read": True,
+    },
+    {
+        "name": "launches_stream",
+        "collection": "launch_reports",
+        "filter": {},
+        "sort": [("_id", ASCENDING)],
+        "full_read": True,
+    },
+    {
+        "name": "launches_page_by_id",
+        "collection": "launch_reports",
+        "filter": {"_id": {"$gt": _SAMPLE_ID}},
+        "sort": [("_id", ASCENDING)],
+    },
+    {
+        "name": "launches_page_by_date",
+        "collection": "launch_reports",
+        "filter": {
+            "$or": [
+                {"launchDate": {"$gt": "2026-01-01"}},
+                {"launchDate": "2026-01-01", "_id": {"$gt": _SAMPLE_ID}},
+            ]
+        },
+        "sort": [("launchDate", ASCENDING), ("_id", ASCENDING)],
+    },
+    {
+        "name": "launch_by_id",
+        "collection": "launch_reports",
+        "filter": {"_id": _SAMPLE_ID},
+    },
+    {
+        "name": "launches_by_ship",
+        "collection": "launch_reports",
+        "filter": {"shipNumber": 1},
+    },
+    {
+        "name": "launches_by_booster",
+        "collection": "launch_reports",
+        "filter": {"boosterNumber": 1},
+    },
+    {
+        "name": "launches_query_by_date",
+        "collection": "launch_reports",
+        "filter": {"launchAt": {"$gte": datetime(2026, 1, 1)}},
+        "sort": [("launchAt", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "name": "launches_query_by_site",
+        "collection": "launch_reports",
+        "filter": {
+            "launchSite": "Starbase",
+            "launchAt": {"$gte": datetime(2026, 1, 1), "$lt": datetime(2027, 1, 1)},
+        },
+        "sort": [("launchAt", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "name": "launches_query_by_booster",
+        "collection": "launch_reports",
+        "filter": {"boosterNumber": 1, "boosterFlightCount": {"$gte": 2}},
+        "sort": [("launchAt", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "name": "launches_query_by_ship",
+        "collection": "launch_reports",
+        "filter": {"shipNumber": 1},
+        "sort": [("launchAt", ASCENDING), ("_id", ASCENDING)],
+    },
+    {
+        "name": "news_newest_first",
+        "collection": "news_posts",
+        "filter": {},
+        "sort": [("timestamp", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "name": "news_page",
+        "collection": "news_posts",
+        "filter": {
+            "$or": [
+                {"timestamp": {"$lt": "2026-01-01T00:00:00"}},
+                {"timestamp": "2026-01-01T00:00:00", "_id": {"$lt": _SAMPLE_ID}},
+            ]
+        },
+        "sort": [("timestamp", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "name": "news_by_id",
+        "collection": "news_posts",
+        "filter": {"_id": _SAMPLE_ID},
+    },
+    {
+        "name": "missions_by_launch",
+        "collection": "missions",
+        "filter": {"launch_id": str(_SAMPLE_ID)},
+    },
+    {
+        "name": "fleet_by_flight_count",
+        "collection": "fleet_summary",
+        "filter": {},
+        "sort": [("flightCount", DESCENDING)],
+    },
+]
+# Lookups of the stored copy after an insert is rejected as a duplicate
+QUERY_SHAPES += [
+    {
+        "name": f"{collection_name}_by_{field}",
+        "collection": collection_name,
+        "filter": {field: "0" * 64},
+    }
+    for collection_name in DEDUPLICATED
+    for field in (HASH_FIELD, KEY_FIELD)
+]
+
+
+async def ensure_indexes(db):
+    """Create every index in INDEXES. Safe to run on every startup."""
+    for collection_name, indexes in INDEXES.items():
+        try:
+            names = await db[collection_name].create_indexes(indexes)
+            logger.info("Ensured indexes on {}: {}", collection_name, ", ".join(names))
+        except PyMongoError as e:
+            logger.error(f"Could not create indexes on {collection_name}: {e}")
+
+
+def _plan_stages(plan):
+    """Collect every stage name in an explain() plan tree."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def verify_query_plans(db):
+    """Explain every query shape and report the stages of its winning plan.
+
+    Returns a list of dicts with name, stages and ok. A shape is not ok when
+    it would scan the whole collection without being marked full_read.
+    """
+    results = []
+    for shape in QUERY_SHAPES:
+        cursor = db[shape["collection"]].find(shape["filter"])
+        if shape.get("sort"):
+            cursor = cursor.sort(shape["sort"])
+        explained = await cursor.explain()
+        stages = _plan_stages(explained.get("queryPlanner", {}).get("winningPlan"))
+        results.append(
+            {
+                "name": shape["name"],
+                "stages": stages,
+                "ok": shape.get("full_read", False) or "COLLSCAN" not in stages,
+            }
+        )
+    return results
@@ -0,0 +1,310 @@
+"""
+Logging setup for RocketTracker.
+
+With LOG_MODE=batched (the default) every record gets the current request's
+correlation ID, hot-path INFO records are sampled and rate-capped, and the
+file sink only queues a small dict: a background thread serialises records
+to JSON lines and writes them in batches, so the event loop never waits on
+disk. WARNING and above are never dropped. LOG_MODE=sync keeps the plain
+text file sink written inline.
+"""
+
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import orjson
+from loguru import logger
+
+from src.metrics import CallbackMetric, registry
+
+LOG_MODE = os.getenv("LOG_MODE", "batched").lower()
+LOG_DIR = Path(os.getenv("LOG_DIR", "logs"))
+# Fraction of INFO-and-below records kept, and a hard cap per second on top
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_INFO_PER_SECOND = int(os.getenv("LOG_INFO_PER_SECOND", "200"))
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_INTERVAL = 0.5
+LOG_ROTATION_BYTES = 10 * 1024 * 1024
+LOG_RETENTION = timedelta(days=10)
+
+# Records at this level and above are never sampled away
+ALWAYS_KEEP_LEVEL = logger.level("WARNING").no
+DEBUG_LEVEL = logger.level("DEBUG").no
+INFO_LEVEL = logger.level("INFO").no
+
+REQUEST_ID_HEADER = "x-request-id"
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class Sampler:
+    """Decides which low-severity records are kept.
+
+    Runs once per record (as a loguru patcher), so every sink agrees.
+    """
+
+    def __init__(self, rate: float, per_second: int):
+        self.rate = rate
+        self.per_second = per_second
+        self.dropped = 0
+        self._window = 0
+        self._count = 0
+
+    def keep(self, level_no: int) -> bool:
+        """Return whether a record at this level should be written."""
+        if level_no >= ALWAYS_KEEP_LEVEL:
+            return True
+        if self.rate < 1.0 and random.random() >= self.rate:
+            self.dropped += 1
+            return False
+        window = int(time.monotonic())
+        if window != self._window:
+            self._window, self._count = window, 0
+        self._count += 1
+        if self.per_second and self._count > self.per_second:
+            self.dropped += 1
+            return False
+        return True
+
+    def patch(self, record):
+        """loguru patcher: attach the correlation ID and sampling decision."""
+        record["extra"].setdefault("request_id", request_id.get())
+        # Records from SampledLogger were decided before they were formatted
+        if "keep" not in record["extra"]:
+            record["extra"]["keep"] = self.keep(record["level"].no)
+
+
+def _sampled(record) -> bool:
+    return record["extra"].get("keep", True)
+
+
+class SampledLogger:
+    """Stand-in for loguru's ``logger`` in modules with hot-path logging.
+
+    loguru formats a message before any patcher runs, so INFO and DEBUG
+    records are sampled here instead: one that is dropped is never
+    formatted. Use the lazy form, ``logger.info("... {}", value)``.
+    Everything else is passed to loguru as is.
+    """
+
+    def __getattr__(self, name):
+        return getattr(logger, name)
+
+    def debug(self, message: str, *args, **kwargs):
+        """Log at DEBUG, unless the sampler drops it."""
+        self._log("DEBUG", DEBUG_LEVEL, message, args, kwargs)
+
+    def info(self, message: str, *args, **kwargs):
+        """Log at INFO, unless the sampler drops it."""
+        self._log("INFO", INFO_LEVEL, message, args, kwargs)
+
+    @staticmethod
+    def _log(level: str, level_no: int, message: str, args, kwargs):
+        target = logger
+        # Sampling only happens with the batched sinks installed
+        if batched_sink is not None:
+            if not sampler.keep(level_no):
+                return
+            target = logger.bind(keep=True)
+        # depth=2 attributes the record to the caller, not this class
+        target.opt(depth=2).log(level, message, *args, **kwargs)
+
+
+class BatchedJSONSink:
+    """loguru sink that hands records to a writer thread.
+
+    ``write`` only builds a small dict and queues it. The thread serialises
+    and appends whole batches, rotating the file by size and removing files
+    older than the retention period.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        rotation_bytes: int = LOG_ROTATION_BYTES,
+        retention: timedelta = LOG_RETENTION,
+    ):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotation_bytes = rotation_bytes
+        self.retention = retention
+        self.written = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file = None
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, message):
+        """Queue one record; called by loguru on the logging thread."""
+        record = message.record
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            "request_id": record["extra"].get("request_id"),
+            "logger": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+        }
+        if record["exception"] is not None:
+            # loguru appends the formatted traceback to the message
+            entry["exception"] = str(message).rstrip("\n")
+        self._queue.put(entry)
+
+    def stop(self):
+        """Write everything still queued and stop the thread."""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def pending(self) -> int:
+        """Records queued but not yet written."""
+        return self._queue.qsize()
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        # One file per process, workers started together must not share one
+        path = self.directory / f"app_{stamp}_{os.getpid()}.jsonl"
+        self._file = open(path, "ab")  # pylint: disable=consider-using-with
+        cutoff = time.time() - self.retention.total_seconds()
+        for old in self.directory.glob("app_*"):
+            try:
+                if old.stat().st_mtime < cutoff:
+                    old.unlink()
+            except OSError:
+                pass
+
+    def _flush(self, batch: list):
+        if self._file is None or self._file.tell() >= self.rotation_bytes:
+            if self._file is not None:
+                self._file.close()
+            self._open()
+        self._file.write(b"".join(orjson.dumps(entry) + b"\n" for entry in batch))
+        self._file.flush()
+        self.written += len(batch)
+
+    def _run(self):
+        running = True
+        while running:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get(
+                        timeout=max(deadline - time.monotonic(), 0.001)
+                    )
+                except queue.Empty:
+                    break
+                if entry is None:
+                    running = False
+                    break
+                batch.append(entry)
+            if batch:
+                try:
+                    self._flush(batch)
+                except (OSError, TypeError) as e:
+                    print(
+                        f"Could not write {len(batch)} log records: {e}",
+                        file=sys.stderr,
+                    )
+
+
+sampler = Sampler(LOG_SAMPLE_RATE, LOG_INFO_PER_SECOND)
+batched_sink: Optional[BatchedJSONSink] = None
+_configured = False
+sampled_logger = SampledLogger()
+
+
+def configure_logging():
+    """Install the sinks for LOG_MODE. Later calls do nothing."""
+    global batched_sink, _configured  # pylint: disable=global-statement
+    if _configured:
+        return
+    _configured = True
+    if LOG_MODE != "batched":
+        logger.add(
+            LOG_DIR / f"app_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log",
+            rotation="10 MB",
+            retention="10 days",
+            level="INFO",
+            format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+        )
+        return
+
+    logger.remove()
+    logger.configure(patcher=sampler.patch)
+    # enqueue hands console output to loguru's own writer thread
+    logger.add(sys.stderr, level="INFO", filter=_sampled, enqueue=True)
+    batched_sink = BatchedJSONSink(LOG_DIR)
+    logger.add(batched_sink, level="INFO", filter=_sampled, format="{message}")
+
+    registry.register(
+        CallbackMetric(
+            "rocketracker_log_records_dropped_total",
+            "Log records dropped by sampling or the per-second cap.",
+            "counter",
+            lambda: sampler.dropped,
+        )
+    )
+    registry.register(
+        CallbackMetric(
+            "rocketracker_log_queue_depth",
+            "Log records waiting for the background writer.",
+            "gauge",
+            batched_sink.pending,
+        )
+    )
+
+
+def stop_logging():
+    """Write the records still queued for the batched sink; call it last."""
+    if batched_sink is not None:
+        batched_sink.stop()
+
+
+class CorrelationIdMiddleware:
+    """Gives every request an ID, taken from X-Request-ID when supplied.
+
+    The ID is attached to every log record written while handling the
+    request and echoed back in the X-Request-ID response header.
+    """
+
+    def __init__(self, asgi_app):
+        self.app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        supplied = dict(scope["headers"]).get(REQUEST_ID_HEADER.encode())
+        value = supplied.decode("latin-1")[:64] if supplied else uuid.uuid4().hex
+        token = request_id.set(value)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode(), value.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
@@ -0,0 +1,507 @@
+"""
+Prometheus metrics for RocketTracker.
+
+A small in-process registry (counters, gauges and histograms) rendered in
+the Prometheus text exposition format, plus pymongo event listeners that
+time every MongoDB command and connection-pool checkout.
+
+Each worker keeps its own registry, but a scrape reaches only one of them.
+With METRICS_DIR set, every worker publishes its values there every few
+seconds and ``/metrics`` adds up all of them, so counters and histograms
+cover the whole server. Gauges only count workers that published recently.
+"""
+
+import asyncio
+import bisect
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from loguru import logger
+from pymongo import monitoring
+
+from src.cache import query_cache
+from src.singleflight import response_flights
+from src.tasks import cancel
+
+# Buckets in seconds, from sub-millisecond cache hits to multi-second scans
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Directory shared by the worker processes; unset with a single process
+METRICS_DIR = os.getenv("METRICS_DIR")
+# Seconds between publishing this worker's values
+METRICS_INTERVAL = float(os.getenv("METRICS_INTERVAL", "5"))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class: a named metric family with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        # pymongo listeners fire on Motor's executor threads
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        """The HELP and TYPE lines for this family."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def state(self) -> list:
+        """This process's values, in a form that can be written as JSON."""
+        raise NotImplementedError
+
+    def samples(self, others: Sequence[list] = ()) -> List[str]:
+        """The sample lines for this family, adding in other processes' states."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        """Add amount to the counter for these label values."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def state(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def samples(self, others=()):
+        totals: Dict[Tuple[str, ...], float] = {}
+        for state in (self.state(), *others):
+            for labels, value in state:
+                totals[tuple(labels)] = totals.get(tuple(labels), 0) + value
+        return [
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in totals.items()
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label set."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        """Subtract amount from the gauge for these label values."""
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        """Set the gauge for these label values."""
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Cumulative bucketed observations per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        """Record one observation for these label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager that observes the duration of its block."""
+        return _Timer(self, labels)
+
+    def state(self):
+        with self._lock:
+            return [
+                [list(labels), list(s[0]), s[1], s[2]]
+                for labels, s in self._values.items()
+            ]
+
+    def samples(self, others=()):
+        totals: Dict[Tuple[str, ...], list] = {}
+        for state in (self.state(), *others):
+            for labels, counts, total, count in state:
+                merged = totals.setdefault(
+                    tuple(labels), [[0] * (len(self.buckets) + 1), 0.0, 0]
+                )
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+                merged[2] += count
+        lines = []
+        for labels, (counts, total, count) in totals.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = _labels(self.label_names, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_str = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_str} {_number(total)}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class CallbackMetric(Metric):
+    """Metric whose value is read from a function at scrape time."""
+
+    def __init__(self, name, documentation, kind: str, func: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self.func = func
+
+    def state(self):
+        return [[[], self.func()]]
+
+    def samples(self, others=()):
+        value = self.func() + sum(value for state in others for _, value in state)
+        return [f"{self.name} {_number(value)}"]
+
+
+class Registry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric family and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def state(self) -> Dict[str, list]:
+        """This process's values of every family, by name."""
+        return {metric.name: metric.state() for metric in self._metrics}
+
+    def render(self, others: Sequence[Tuple[Dict[str, list], bool]] = ()) -> str:
+        """Render every family in the Prometheus text format.
+
+        ``others`` holds other processes' states, each with whether that
+        process is still running; gauges of stopped ones are left out.
+        """
+        lines = []
+        for metric in self._metrics:
+            states = [
+                state[metric.name]
+                for state, running in others
+                if metric.name in state and (running or metric.kind != "gauge")
+            ]
+            lines.extend(metric.header())
+            lines.extend(metric.samples(states))
+        return "\n".join(lines) + "\n"
+
+
+class SharedMetrics:
+    """Publishes this worker's registry to a directory shared by all workers.
+
+    Each worker writes ``<pid>.json`` every ``interval`` seconds. Files of
+    workers that exited stay, so totals do not drop when one is replaced.
+    """
+
+    def __init__(
+        self,
+        target: Registry,
+        directory: Optional[str] = METRICS_DIR,
+        interval: float = METRICS_INTERVAL,
+    ):
+        self.target = target
+        self.directory = Path(directory) if directory else None
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> Path:
+        """This worker's file."""
+        return self.directory / f"{os.getpid()}.json"
+
+    def start(self):
+        """Start publishing, if a directory is configured."""
+        if self.directory is not None and (self._task is None or self._task.done()):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop publishing, writing the final values first."""
+        if self._task is None:
+            return
+        await cancel(self._task)
+        self._task = None
+        await asyncio.to_thread(self._publish)
+
+    def _publish(self):
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_bytes(orjson.dumps(self.target.state()))
+        os.replace(temporary, self.path)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self._publish)
+            except OSError as e:
+                logger.error(f"Could not publish metrics to {self.directory}: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _others(self) -> List[Tuple[Dict[str, list], bool]]:
+        others = []
+        for path in self.directory.glob("*.json"):
+            if path == self.path:
+                continue
+            try:
+                running = time.time() - path.stat().st_mtime < 3 * self.interval
+                others.append((orjson.loads(path.read_bytes()), running))
+            except (OSError, orjson.JSONDecodeError):
+                continue  # replaced or removed while being read
+        return others
+
+    def render(self) -> str:
+        """Render the metrics of every worker. Blocking, run in a thread."""
+        if self.directory is None:
+            return self.target.render()
+        return self.target.render(self._others())
+
+
+registry = Registry()
+shared_metrics = SharedMetrics(registry)
+
+http_requests = registry.register(
+    Counter(
+        "rocketracker_http_requests_total",
+        "HTTP requests by route and status code.",
+        ("method", "route", "status"),
+    )
+)
+http_latency = registry.register(
+    Histogram(
+        "rocketracker_http_request_duration_seconds",
+        "Time from receiving a request to sending the response headers.",
+        ("method", "route"),
+    )
+)
+http_in_flight = registry.register(
+    Gauge(
+        "rocketracker_http_requests_in_flight",
+        "Requests currently being handled.",
+    )
+)
+ratelimit_latency = registry.register(
+    Histogram(
+        "rocketracker_ratelimit_check_duration_seconds",
+        "Time spent checking rate limits for a request.",
+    )
+)
+serialization_latency = registry.register(
+    Histogram(
+        "rocketracker_serialization_duration_seconds",
+        "Time spent encoding JSON response bodies.",
+    )
+)
+mongo_command_latency = registry.register(
+    Histogram(
+        "rocketracker_mongodb_command_duration_seconds",
+        "MongoDB command round trip time.",
+        ("collection", "command"),
+    )
+)
+mongo_command_failures = registry.register(
+    Counter(
+        "rocketracker_mongodb_command_failures_total",
+        "MongoDB commands that returned an error.",
+        ("collection", "command"),
+    )
+)
+mongo_checkout_wait = registry.register(
+    Histogram(
+        "rocketracker_mongodb_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled MongoDB connection.",
+    )
+)
+mongo_checkout_failures = registry.register(
+    Counter(
+        "rocketracker_mongodb_pool_checkout_failures_total",
+        "Connection checkouts that failed or timed out.",
+        ("reason",),
+    )
+)
+
+registry.register(
+    CallbackMetric(
+        "rocketracker_query_cache_hits_total",
+        "Database reads answered from the query cache.",
+        "counter",
+        lambda: query_cache.hits,
+    )
+)
+registry.register(
+    CallbackMetric(
+        "rocketracker_query_cache_misses_total",
+        "Database reads that had to query MongoDB.",
+        "counter",
+        lambda: query_cache.misses,
+    )
+)
+registry.register(
+    CallbackMetric(
+        "rocketracker_query_coalesced_total",
+        "Database reads that joined an identical query already in flight.",
+        "counter",
+        lambda: query_cache.flights.merged,
+    )
+)
+registry.register(
+    CallbackMetric(
+        "rocketracker_response_coalesced_total",
+        "API responses shared with an identical request already in flight.",
+        "counter",
+        lambda: response_flights.merged,
+    )
+)
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Records the duration of every MongoDB command by collection."""
+
+    def __init__(self):
+        self._pending: Dict[Tuple, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event) -> Tuple:
+        return (event.request_id, event.connection_id, event.operation_id)
+
+    def started(self, event):
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""  # database-level commands such as ping
+        with self._lock:
+            self._pending[self._key(event)] = (collection, event.command_name)
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            labels = self._pending.pop(self._key(event), None)
+        if labels is None:
+            return
+        mongo_command_latency.observe(event.duration_micros / 1_000_000, *labels)
+        if failed:
+            mongo_command_failures.inc(*labels)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+
+class PoolTimer(monitoring.ConnectionPoolListener):
+    """Records how long requests wait to check a connection out of the pool."""
+
+    def connection_checked_out(self, event):
+        if event.duration is not None:
+            mongo_checkout_wait.observe(event.duration)
+
+    def connection_check_out_failed(self, event):
+        if event.duration is not None:
+            mongo_checkout_wait.observe(event.duration)
+        mongo_checkout_failures.inc(str(event.reason))
+
+    # The remaining pool events are not needed for these metrics
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+def mongo_listeners() -> list:
+    """Listeners to pass as event_listeners when creating the Mongo client."""
+    return [CommandTimer(), PoolTimer()]
@@ -0,0 +1,150 @@
+"""
+Rate limiting shared by the API and HTML routers.
+
+Counters live in the storage named by RATELIMIT_STORAGE_URI. The default
+``memory://`` is only correct with a single worker; with several workers use
+a store they all see, such as the file-backed ``sqlite:///path/to/file.db``
+defined here, or ``redis://`` / ``mongodb://`` if one is available.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import Storage
+from loguru import logger
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from src.metrics import Counter, ratelimit_latency, registry
+
+# Seconds an increment waits for another worker's write lock. Checks run on
+# the event loop, so this must stay tiny
+RATELIMIT_BUSY_TIMEOUT = float(os.getenv("RATELIMIT_BUSY_TIMEOUT", "0.005"))
+# Increments between sweeps of expired counters, whose keys may never return
+RATELIMIT_PURGE_EVERY = int(os.getenv("RATELIMIT_PURGE_EVERY", "1000"))
+
+ratelimit_busy = registry.register(
+    Counter(
+        "rocketracker_ratelimit_busy_total",
+        "Rate-limit increments let through because the store was locked.",
+    )
+)
+
+
+class SQLiteStorage(Storage):
+    """Fixed-window counters in a local SQLite file, shared across processes.
+
+    Counters are throwaway, so the database runs in WAL mode without fsync;
+    an increment is a single small local transaction. If another worker
+    holds the write lock for longer than ``RATELIMIT_BUSY_TIMEOUT`` the
+    increment fails open: the request is let through uncounted rather than
+    stalling the event loop.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri.split("://", 1)[1] or "ratelimit.db"
+        self._lock = threading.Lock()
+        self._increments = 0
+        # Workers start together, so setting the file up may wait its turn
+        self._conn = sqlite3.connect(
+            self.path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            "key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+        busy_ms = max(1, int(RATELIMIT_BUSY_TIMEOUT * 1000))
+        self._conn.execute(f"PRAGMA busy_timeout = {busy_ms}")
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as e:
+                # Busy: counting this one request is not worth the wait
+                ratelimit_busy.inc()
+                logger.debug(f"Rate-limit store busy, not counting {key}: {e}")
+                return 0
+            try:
+                self._conn.execute(
+                    "DELETE FROM counters WHERE key = ? AND expires_at <= ?",
+                    (key, now),
+                )
+                self._conn.execute(
+                    "INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+                    (key, amount, now + expiry),
+                )
+                (value,) = self._conn.execute(
+                    "SELECT value FROM counters WHERE key = ?", (key,)
+                ).fetchone()
+                self._increments += 1
+                if self._increments % RATELIMIT_PURGE_EVERY == 0:
+                    self._conn.execute(
+                        "DELETE FROM counters WHERE expires_at <= ?", (now,)
+                    )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+        return value
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM counters WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM counters WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self) -> bool:
+        try:
+            with self._lock:
+                self._conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM counters").rowcount
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+
+
+class TimedLimiter(Limiter):
+    """Limiter that records how long each rate-limit check takes."""
+
+    def _check_request_limit(self, request, endpoint_func, in_middleware=True):
+        with ratelimit_latency.time():
+            return super()._check_request_limit(request, endpoint_func, in_middleware)
+
+
+RATELIMIT_ENABLED = os.getenv("RATELIMIT", "true").lower() == "true"
+
+limiter = TimedLimiter(
+    key_func=get_remote_address,
+    storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://"),
+    enabled=RATELIMIT_ENABLED,
+)
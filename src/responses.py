@@ -0,0 +1,86 @@
+"""
+Fast JSON responses for documents straight out of MongoDB.
+
+``BSONJSONResponse`` serialises with orjson and understands ObjectId, so read
+paths can hand back raw documents without rewriting ``_id`` first and without
+FastAPI's generic ``jsonable_encoder`` walking the payload again. Routes opt in
+by returning an instance of it.
+
+``is_not_modified`` implements the conditional GET checks shared by the
+routes that send validators, and ``accepted_encodings`` the content
+negotiation shared by everything that serves precompressed bodies.
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from src.metrics import serialization_latency
+
+
+def _default(obj: Any) -> Any:
+    """Encode the BSON types orjson does not know about."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialise content (which may contain ObjectIds) to JSON bytes."""
+    return orjson.dumps(content, default=_default)
+
+
+class BSONJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, with native ObjectId support."""
+
+    def render(self, content: Any) -> bytes:
+        with serialization_latency.time():
+            return dumps(content)
+
+
+def accepted_encodings(request: Request) -> set:
+    """Return the content codings the client accepts (ignoring q=0)."""
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(coding.lower())
+    return accepted
+
+
+def http_date(when: datetime) -> str:
+    """Format a datetime for Last-Modified. Naive values are local time."""
+    return format_datetime(when.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """Check a request's conditional headers against a representation.
+
+    If-None-Match wins over If-Modified-Since, as RFC 9110 requires.
+    """
+    header = request.headers.get("if-none-match")
+    if header:
+        if header.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return etag in candidates
+
+    since = request.headers.get("if-modified-since")
+    if since and last_modified is not None:
+        try:
+            since_time = parsedate_to_datetime(since)
+        except (TypeError, ValueError):
+            return False
+        if since_time.tzinfo is None:
+            since_time = since_time.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second precision
+        modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+        return modified <= since_time
+    return False
@@ -0,0 +1,272 @@
+"""
+In-memory full-text search over news posts and launch reports.
+
+An inverted index maps each token to the documents containing it, with a
+per-field weight. A sorted vocabulary gives prefix matching with a binary
+search, so a query never touches MongoDB. The index is loaded from MongoDB
+once at startup by ``keep_building_search_index`` and then kept current by
+the save paths and the change feed.
+"""
+
+import asyncio
+import bisect
+import heapq
+import math
+import os
+import re
+from operator import itemgetter
+from typing import Dict, List, Optional, Set, Tuple
+
+from pymongo.errors import PyMongoError
+
+from src.logconfig import sampled_logger as logger
+from src.metrics import CallbackMetric, registry
+from src.snapshot import circuit_breaker
+
+SEARCH_ENABLED = os.getenv("SEARCH_ENABLED", "true").lower() == "true"
+DEFAULT_RESULTS = 20
+MAX_RESULTS = 100
+# A token that only starts with a query term counts for less than a full match
+PREFIX_FACTOR = 0.5
+MIN_PREFIX_LENGTH = 2
+# Seconds between attempts to build the index while MongoDB is down
+SEARCH_RETRY_INTERVAL = float(os.getenv("SEARCH_RETRY_INTERVAL", "5"))
+BUILD_BATCH_SIZE = 200
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Document type -> {field: weight}
+FIELD_WEIGHTS = {
+    "news": {"title": 3.0, "author": 2.0, "content": 1.0},
+    "launch": {"launchSite": 2.0, "boosterNumber": 3.0, "shipNumber": 3.0},
+}
+# Document type -> fields copied into each result
+SUMMARY_FIELDS = {
+    "news": ("title", "author", "timestamp"),
+    "launch": (
+        "launchSite",
+        "launchDate",
+        "launchTime",
+        "boosterNumber",
+        "shipNumber",
+    ),
+}
+# Vehicle fields are also indexed under their usual names, e.g. B14 and S35
+VEHICLE_PREFIXES = {"boosterNumber": "b", "shipNumber": "s"}
+
+DocKey = Tuple[str, str]
+
+
+def tokenize(text) -> List[str]:
+    """Lowercase alphanumeric tokens of a value."""
+    if text is None:
+        return []
+    return _TOKEN.findall(str(text).lower())
+
+
+def _document_terms(doc_type: str, document: dict) -> Dict[str, float]:
+    """Weighted terms for one document; a term keeps its best field weight."""
+    terms: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS[doc_type].items():
+        value = document.get(field)
+        tokens = tokenize(value)
+        if field in VEHICLE_PREFIXES and tokens:
+            tokens.append(VEHICLE_PREFIXES[field] + tokens[0])
+        for token in tokens:
+            terms[token] = max(terms.get(token, 0.0), weight)
+    return terms
+
+
+class SearchIndex:
+    """Inverted index with weighted fields and prefix matching.
+
+    Postings group documents by (type, field weight), so every document in
+    a group scores the same for a term and scoring works on whole sets.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.postings: Dict[str, Dict[Tuple[str, float], Set[DocKey]]] = {}
+        self.documents: Dict[DocKey, dict] = {}
+        self._frequency: Dict[str, int] = {}
+        self._terms: Dict[DocKey, Tuple[Tuple[str, float], ...]] = {}
+        self._vocabulary: List[str] = []
+        # Until the initial build finishes the vocabulary is left unsorted
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, doc_type: str, document: dict):
+        """Index (or re-index) a document that has an ``_id``."""
+        if not self.enabled:
+            return
+        key = (doc_type, str(document["_id"]))
+        if key in self._terms:
+            self.remove(*key)
+        terms = _document_terms(doc_type, document)
+        for term, weight in terms.items():
+            groups = self.postings.get(term)
+            if groups is None:
+                groups = self.postings[term] = {}
+                self._frequency[term] = 0
+                if self.ready:
+                    bisect.insort(self._vocabulary, term)
+                else:
+                    self._vocabulary.append(term)
+            groups.setdefault((doc_type, weight), set()).add(key)
+            self._frequency[term] += 1
+        self._terms[key] = tuple(terms.items())
+        summary = {field: document.get(field) for field in SUMMARY_FIELDS[doc_type]}
+        self.documents[key] = {"type": doc_type, "id": key[1], **summary}
+
+    def remove(self, doc_type: str, doc_id: str):
+        """Forget a document. Unknown ids are ignored."""
+        key = (doc_type, str(doc_id))
+        for term, weight in self._terms.pop(key, ()):
+            groups = self.postings[term]
+            group = groups[(doc_type, weight)]
+            group.discard(key)
+            if not group:
+                del groups[(doc_type, weight)]
+            self._frequency[term] -= 1
+            if not groups:
+                del self.postings[term]
+                del self._frequency[term]
+                if self.ready:
+                    del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+                else:
+                    self._vocabulary.remove(term)
+        self.documents.pop(key, None)
+
+    def clear(self):
+        """Drop everything, e.g. before a rebuild."""
+        self.postings.clear()
+        self.documents.clear()
+        self._frequency.clear()
+        self._terms.clear()
+        self._vocabulary.clear()
+        self.ready = False
+
+    def mark_ready(self):
+        """Finish the initial build: sort the vocabulary once and go live."""
+        self._vocabulary.sort()
+        self.ready = True
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """The indexed terms a query token matches, with their match factor."""
+        matches = [(token, 1.0)] if token in self.postings else []
+        if len(token) < MIN_PREFIX_LENGTH:
+            return matches
+        vocabulary = self._vocabulary
+        index = bisect.bisect_right(vocabulary, token)
+        while index < len(vocabulary) and vocabulary[index].startswith(token):
+            matches.append((vocabulary[index], PREFIX_FACTOR))
+            index += 1
+        return matches
+
+    def _token_scores(self, token: str, doc_type: Optional[str]) -> Dict[DocKey, float]:
+        """Best score of every document matching one query token."""
+        total = max(len(self.documents), 1)
+        groups = []
+        for term, factor in self._expand(token):
+            idf = math.log(1 + total / self._frequency[term])
+            for (group_type, weight), keys in self.postings[term].items():
+                if doc_type is None or group_type == doc_type:
+                    groups.append((weight * idf * factor, keys))
+        # Lowest first, so a document keeps the best score of any group
+        groups.sort(key=lambda group: group[0])
+        scores: Dict[DocKey, float] = {}
+        for score, keys in groups:
+            scores.update(dict.fromkeys(keys, score))
+        return scores
+
+    def search(
+        self,
+        query: str,
+        doc_type: Optional[str] = None,
+        limit: int = DEFAULT_RESULTS,
+    ) -> List[dict]:
+        """Rank documents matching every query token, best first.
+
+        Each token matches exactly or as a prefix of an indexed term. Scores
+        add up field weight times inverse document frequency per token.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        scores: Optional[Dict[DocKey, float]] = None
+        for token in tokens:
+            token_scores = self._token_scores(token, doc_type)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    key: scores[key] + token_scores[key]
+                    for key in scores.keys() & token_scores.keys()
+                }
+            if not scores:
+                return []
+
+        # Many documents tie, so rank whole score levels rather than every key.
+        # Within a level ObjectIds grow over time, so newest documents win.
+        ranked = []
+        for level in sorted(set(scores.values()), reverse=True):
+            tied = [key for key, score in scores.items() if score == level]
+            for key in heapq.nlargest(limit - len(ranked), tied, key=itemgetter(1)):
+                ranked.append({**self.documents[key], "score": round(level, 4)})
+            if len(ranked) >= limit:
+                break
+        return ranked
+
+
+def indexed_fields(doc_type: str) -> Tuple[str, ...]:
+    """Fields to load from MongoDB to index and summarise a document."""
+    return (
+        "_id",
+        *dict.fromkeys([*FIELD_WEIGHTS[doc_type], *SUMMARY_FIELDS[doc_type]]),
+    )
+
+
+search_index = SearchIndex(enabled=SEARCH_ENABLED)
+
+registry.register(
+    CallbackMetric(
+        "rocketracker_search_documents",
+        "Documents in the in-memory search index.",
+        "gauge",
+        lambda: len(search_index),
+    )
+)
+
+
+async def build_search_index(sources: Dict[str, object]) -> bool:
+    """Load every document of each (doc type -> collection) into the index.
+
+    Writes that land while this runs are indexed by their save paths too;
+    indexing the same document twice just replaces it. Returns False if
+    MongoDB failed part way.
+    """
+    if not search_index.enabled:
+        return True
+    search_index.clear()
+    try:
+        for doc_type, target in sources.items():
+            projection = {field: 1 for field in indexed_fields(doc_type)}
+            cursor = target.find({}, projection).batch_size(BUILD_BATCH_SIZE)
+            async for document in cursor:
+                search_index.add(doc_type, document)
+    except PyMongoError as e:
+        logger.error(f"Database error building search index: {e}")
+        return False
+    search_index.mark_ready()
+    logger.info("Built search index with {} documents", len(search_index))
+    return True
+
+
+async def keep_building_search_index(sources: Dict[str, object]):
+    """Build the search index, retrying until MongoDB lets it finish."""
+    while True:
+        if not circuit_breaker.open and await build_search_index(sources):
+            return
+        await asyncio.sleep(SEARCH_RETRY_INTERVAL)
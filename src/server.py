@@ -1,67 +1,204 @@
 """This module handles API routes."""
 
-import os
-from datetime import datetime
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
 
-from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
 from fastapi import Request
 from fastapi.exceptions import HTTPException
+from fastapi.responses import PlainTextResponse
 from slowapi.errors import RateLimitExceeded
 from loguru import logger
-from src.database import test_motor_connection
-from src.api.routes import api_router, limiter
+from src import database
+from src.admission import ADMISSION_ENABLED, AdmissionMiddleware
+from src.assets import asset_store
+from src.api.routes import api_router
+from src.events import broadcaster, change_feed
+from src.indexes import ensure_indexes
+from src.logconfig import CorrelationIdMiddleware, configure_logging, stop_logging
+from src.metrics import http_in_flight, http_latency, http_requests, shared_metrics
+from src.ratelimit import RATELIMIT_ENABLED, limiter
+from src.search import keep_building_search_index
+from src.snapshot import StalenessMiddleware, snapshotter
+from src.tasks import cancel
 from src.web.routes import html_router
+from src.web.views import views
 
-# Windows is a bitch and doesnt like semicolons in files.
-logger_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-logger.add(
-    f"logs/app_{logger_date}.log",
-    rotation="10 MB",
-    retention="10 days",
-    level="INFO",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
-)  # pylint: disable=C0301
+_PATH_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
 
-app = FastAPI()
-app.state.limiter = limiter
 
+def _route_template(scope) -> str:
+    """Return the full route template (e.g. /api/launch/{launch_id}/full).
 
-@app.on_event("startup")
-async def startup_event():
-    """On server startup, test MongoDB connection, can be used for more stuff."""
-    connected = await test_motor_connection()
-    if not connected:
-        logger.warning("MongoDB connection failed, but continuing startup.")
+    Routes from included routers may only know the path below their prefix,
+    so the prefix is recovered from the concrete request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    params = scope.get("path_params", {})
+    concrete = _PATH_PARAM.sub(lambda m: str(params.get(m.group(1), "")), template)
+    path = scope["path"]
+    if concrete and path.endswith(concrete):
+        return path[: len(path) - len(concrete)] + template
+    return template
 
 
-async def custom_rate_limit_handler(_request: Request, _exc: RateLimitExceeded):
+class MetricsMiddleware:
+    """Records latency, status and in-flight count for every HTTP request.
+
+    Latency is measured to the moment the response headers go out, so
+    streamed bodies do not inflate it.
+    """
+
+    def __init__(self, asgi_app):
+        self.app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                status["elapsed"] = time.perf_counter() - start
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            # Use the route template so /launch/<id> is one series, not one per id
+            path = _route_template(scope)
+            method = scope["method"]
+            elapsed = status.get("elapsed", time.perf_counter() - start)
+            http_latency.observe(elapsed, method, path)
+            http_requests.inc(method, path, str(status["code"]))
+
+
+async def metrics():
+    """Expose request, MongoDB and cache metrics in Prometheus text format."""
+    # Reads the other workers' files when there are several
+    body = await asyncio.to_thread(shared_metrics.render)
+    return PlainTextResponse(
+        body, media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+async def serve_asset(request: Request, name: str):
+    """Serve a content-hashed asset from the build, cached forever."""
+    return asset_store.response(request, name)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Connect and warm up before serving, then shut everything down cleanly."""
+    # Dev mode reloads views from disk, so it skips the (possibly stale) build
+    if not views.reload and asset_store.load():
+        views.transform = asset_store.rewrite_view
+    views.load_all()
+    shared_metrics.start()
+    database.connect()
+    # Shared write counters behind API ETags, kept current even if MongoDB
+    # is down now and comes back later
+    version_watch = asyncio.create_task(database.version_counters.watch())
+    connected = await database.test_motor_connection()
+    if connected:
+        await database.warm_pool()
+        await ensure_indexes(database.db)
+        change_feed.start()
+    else:
+        logger.warning(
+            "MongoDB connection failed, serving reads from the snapshot until it"
+            " is reachable."
+        )
+    # Snapshots are skipped while MongoDB is down, so start it either way
+    snapshotter.start(database.dump_collections)
+    # Large collections take a while to index, so don't hold up startup; if
+    # MongoDB is down this waits for it
+    search_build = asyncio.create_task(
+        keep_building_search_index(
+            {"news": database.news_collection, "launch": database.collection}
+        )
+    )
+    try:
+        yield
+    finally:
+        await cancel(version_watch)
+        await cancel(search_build)
+        await snapshotter.stop()
+        # Ends open /api/stream responses; EventSource clients reconnect later
+        broadcaster.close()
+        await change_feed.stop()
+        # Write any inserts still waiting to be coalesced before closing
+        await database.launch_writer.flush()
+        await database.mission_writer.flush()
+        database.close()
+        await shared_metrics.stop()
+        # Last, so whatever the shutdown itself logged is written too
+        await asyncio.to_thread(stop_logging)
+
+
+async def custom_rate_limit_handler(request: Request, _exc: RateLimitExceeded):
     """Custom handler for rate limit exceeded. Returns HTML page."""
-    with open("views/429.html", "r", encoding="utf-8") as file:
-        content = file.read()
-        return HTMLResponse(content=content, status_code=429)
+    return views.response(request, "429.html", status_code=429)
+
+
+def create_app() -> FastAPI:
+    """Build the application. Nothing connects until the lifespan starts.
+
+    Run it with ``uvicorn src.server:create_app --factory``.
+    """
+    configure_logging()
+    app = FastAPI(lifespan=lifespan)
+    app.state.limiter = limiter
+    app.add_middleware(StalenessMiddleware)
+    # Inside MetricsMiddleware, so shed requests show up as 503s
+    if ADMISSION_ENABLED:
+        app.add_middleware(AdmissionMiddleware)
+    else:
+        logger.info("Admission control is disabled")
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(CorrelationIdMiddleware)
+    app.add_api_route("/metrics", metrics, include_in_schema=False)
+    app.add_api_route("/assets/{name:path}", serve_asset, include_in_schema=False)
+
+    if RATELIMIT_ENABLED:
+        app.add_exception_handler(RateLimitExceeded, custom_rate_limit_handler)
+        logger.info("Rate limiting is enabled")
+    else:
+        logger.info("Rate limiting is disabled")
+    # Serve static files (CSS, JS, images, etc.)
+    app.mount("/styles", StaticFiles(directory="styles"), name="styles")
+    app.mount("/img", StaticFiles(directory="img"), name="img")
+    app.mount("/scripts", StaticFiles(directory="scripts"), name="scripts")
+    app.include_router(api_router, prefix="/api")
+    app.include_router(html_router)
+    return app
+
 
+_app = None
 
-ENV_PATH = ".env"
-load_dotenv(dotenv_path=ENV_PATH)
-logger.info("Loaded environment variables from .env file")
 
-if os.getenv("RATELIMIT", "true").lower() == "true":
-    app.add_exception_handler(RateLimitExceeded, custom_rate_limit_handler)
-    logger.info("Rate limiting is enabled")
-else:
-    logger.info("Rate limiting is disabled")
-# Serve static files (CSS, JS, images, etc.)
-app.mount("/styles", StaticFiles(directory="styles"), name="styles")
-app.mount("/img", StaticFiles(directory="img"), name="img")
-app.mount("/scripts", StaticFiles(directory="scripts"), name="scripts")
-app.include_router(api_router, prefix="/api")
-app.include_router(html_router)
+def __getattr__(name):
+    # Keeps ``src.server:app`` working, building the app on first access
+    global _app  # pylint: disable=global-statement
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-async def custom_404_handler(_request: Request, _exc: HTTPException):
+async def custom_404_handler(request: Request, _exc: HTTPException):
     """Custom handler for 404 errors. Returns a static HTML page."""
-    with open("views/404.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=404)
+    return views.response(request, "404.html", status_code=404)
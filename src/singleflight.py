@@ -0,0 +1,66 @@
+"""
+Coalescing of identical concurrent calls.
+
+When a launch goes live hundreds of clients ask for the same thing within
+the same second. ``SingleFlight.do`` runs the first caller's coroutine and
+hands its result (or exception) to everyone who asks for the same key while
+it is still running, so load grows with distinct requests, not clients.
+
+The query cache coalesces database reads with its own instance, and API
+routes share serialised response bodies through ``response_flights``.
+"""
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """At most one call in flight per key; concurrent callers share it."""
+
+    def __init__(self):
+        self.calls = 0
+        self.merged = 0
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Return ``await func()``, joining an identical call if one is running."""
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            flight = asyncio.ensure_future(func())
+            self._flights[key] = flight
+            flight.add_done_callback(functools.partial(self._landed, key))
+        else:
+            self.merged += 1
+        # Shielded, so a client that disconnects does not cancel everyone else
+        return await asyncio.shield(flight)
+
+    def _landed(self, key: str, flight: asyncio.Future):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            flight.exception()
+
+    def is_current(self, key: str) -> bool:
+        """Whether the running task is still the flight for ``key``.
+
+        False once ``forget`` dropped it, i.e. its result may be stale.
+        """
+        return self._flights.get(key) is asyncio.current_task()
+
+    def forget(self, prefix: str = ""):
+        """Make later callers start a fresh call instead of joining one.
+
+        Used when a write makes results already in flight stale; callers
+        that joined before keep waiting for them.
+        """
+        for key in [key for key in self._flights if key.startswith(prefix)]:
+            del self._flights[key]
+
+
+response_flights = SingleFlight()
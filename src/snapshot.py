@@ -0,0 +1,474 @@
+"""
+Degraded-mode serving while MongoDB is unreachable.
+
+A background task periodically streams the launch, mission, news and fleet
+collections into one compact BSON file; with several workers, a lock file
+makes sure only one of them does. A circuit breaker follows the driver's
+view of the cluster: once no server is readable it opens, reads stop
+waiting on server selection and are answered from the snapshot (decoded
+once, off the event loop), and saves fail immediately. Responses built
+from the snapshot carry an ``X-Snapshot-Age`` header with its age in
+seconds. When the driver's heartbeat finds a server again the breaker
+closes.
+"""
+
+import asyncio
+import os
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import bson
+from bson import Int64, ObjectId
+from bson.errors import BSONError, InvalidId
+from loguru import logger
+from pymongo import monitoring
+
+from src.metrics import CallbackMetric, registry
+from src.tasks import cancel
+
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "true").lower() == "true"
+SNAPSHOT_PATH = Path(os.getenv("SNAPSHOT_PATH", "data/snapshot.bson"))
+# Seconds between snapshots; other workers' recent snapshots count too
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "300"))
+SNAPSHOT_FORMAT = 1
+COLLECTIONS = ("launch_reports", "missions", "news_posts", "fleet_summary")
+STALENESS_HEADER = b"x-snapshot-age"
+
+# Per request holder for the age of snapshot data used to build the response.
+# A mutable dict, so reads made in child tasks (asyncio.gather) still count.
+_served: ContextVar[Optional[dict]] = ContextVar("snapshot_served", default=None)
+
+
+class CircuitBreaker(monitoring.TopologyListener):
+    """Open while the driver knows of no readable MongoDB server.
+
+    The driver's monitors probe the servers in the background (every
+    heartbeatFrequencyMS), so they double as the half-open probe. Called
+    from monitor threads; the state is a single attribute.
+    """
+
+    def __init__(self):
+        self.open = False
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+
+    def opened(self, event):
+        pass
+
+    def closed(self, event):
+        pass
+
+    def description_changed(self, event):
+        description = event.new_description
+        if description.has_readable_server():
+            if self.open:
+                outage = time.monotonic() - self.opened_at
+                logger.info(f"MongoDB reachable again after {outage:.1f}s")
+            self.open, self.opened_at = False, None
+        # A server that was checked and failed, not one not checked yet
+        elif not self.open and any(
+            server.error is not None
+            for server in description.server_descriptions().values()
+        ):
+            self.open, self.opened_at = True, time.monotonic()
+            self.trips += 1
+            logger.warning("MongoDB unreachable, serving reads from the snapshot")
+
+
+def _sort_key(*values):
+    # MongoDB orders missing values first; keep Python from comparing None
+    return tuple((value is not None, value) for value in values)
+
+
+def _project(document: dict, fields) -> dict:
+    if not fields:
+        return document
+    return {k: document[k] for k in ("_id", *fields) if k in document}
+
+
+def _object_id(value) -> Optional[ObjectId]:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _number(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Snapshot:
+    """The snapshot file: writing it, and answering reads from it.
+
+    The file is a header document followed by every document of each
+    collection, in COLLECTIONS order.
+    """
+
+    def __init__(self, path: Path = SNAPSHOT_PATH):
+        self.path = path
+        self.taken_at: Optional[float] = None
+        self.reads = 0
+        self._mtime: Optional[float] = None
+        self._data: Dict[str, List[dict]] = {name: [] for name in COLLECTIONS}
+        self._by_id: Dict[str, Dict[ObjectId, dict]] = {}
+        self._orderings: Dict[tuple, List[dict]] = {}
+        self._loading = asyncio.Lock()
+
+    def age(self) -> Optional[float]:
+        """Seconds since the loaded snapshot was taken, or None."""
+        if self.taken_at is None:
+            return None
+        return time.time() - self.taken_at
+
+    @property
+    def lock_path(self) -> Path:
+        """Held by the process writing the snapshot."""
+        return self.path.with_name(f"{self.path.name}.lock")
+
+    async def write(
+        self, batches: AsyncIterator[Tuple[str, List[dict]]]
+    ) -> Dict[str, int]:
+        """Atomically replace the snapshot file, returning document counts.
+
+        ``batches`` yields (collection, documents) in COLLECTIONS order, so
+        only one batch is in memory at a time. Disk work runs in a thread.
+        """
+        # Fixed-width counts, so the final header overwrites the first in place
+        counts = {name: Int64(0) for name in COLLECTIONS}
+        header = {"format": SNAPSHOT_FORMAT, "takenAt": time.time(), "counts": counts}
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        output = await asyncio.to_thread(open, temporary, "wb")
+        try:
+            await asyncio.to_thread(output.write, bson.encode(header))
+            async for name, documents in batches:
+                counts[name] = Int64(counts[name] + len(documents))
+                encoded = b"".join(bson.encode(document) for document in documents)
+                await asyncio.to_thread(output.write, encoded)
+            output.seek(0)
+            await asyncio.to_thread(output.write, bson.encode(header))
+            output.close()
+            await asyncio.to_thread(os.replace, temporary, self.path)
+        except BaseException:
+            output.close()
+            temporary.unlink(missing_ok=True)
+            raise
+        return counts
+
+    async def refresh(self) -> bool:
+        """Load the file in a thread if it changed. False if none is loaded."""
+        try:
+            changed = self.path.stat().st_mtime != self._mtime
+        except FileNotFoundError:
+            changed = False
+        # A load already running must finish before its data is read
+        if changed or self._loading.locked():
+            async with self._loading:
+                await asyncio.to_thread(self.load)
+        return self.taken_at is not None
+
+    def load(self) -> bool:
+        """(Re)load the file if it changed. Blocking; see ``refresh``."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return self.taken_at is not None
+        if mtime != self._mtime:
+            # Try each version of the file once, even if it turns out broken
+            self._mtime = mtime
+            try:
+                self._read()
+            except (OSError, BSONError, KeyError, StopIteration) as e:
+                # Keep serving whatever was loaded before, if anything
+                logger.error(f"Could not load snapshot {self.path}: {e}")
+        return self.taken_at is not None
+
+    def _read(self):
+        # Datetimes come back naive, as they do from the Motor client
+        with open(self.path, "rb") as source:
+            documents = bson.decode_file_iter(source)
+            header = next(documents)
+            if header.get("format") != SNAPSHOT_FORMAT:
+                raise BSONError(f"unsupported format {header.get('format')}")
+            data = {
+                name: [next(documents) for _ in range(header["counts"][name])]
+                for name in COLLECTIONS
+            }
+        self._data = data
+        self._by_id = {
+            name: {document["_id"]: document for document in data[name]}
+            for name in ("launch_reports", "news_posts")
+        }
+        self._orderings = {}
+        self.taken_at = header["takenAt"]
+        taken = datetime.fromtimestamp(self.taken_at).isoformat(timespec="seconds")
+        logger.info(f"Loaded snapshot taken at {taken}")
+
+    def _ordered(self, name: str, *fields: str, reverse: bool = False) -> List[dict]:
+        # Sorted once per loaded snapshot, so each read is a scan at most
+        key = (name, fields, reverse)
+        if key not in self._orderings:
+            self._orderings[key] = sorted(
+                self._data[name],
+                key=lambda document: _sort_key(*(document.get(f) for f in fields)),
+                reverse=reverse,
+            )
+        return self._orderings[key]
+
+    @staticmethod
+    def _page(documents: List[dict], limit: int, fields):
+        page = [_project(document, fields) for document in documents[: limit + 1]]
+        if len(page) > limit:
+            page = page[:limit]
+            return page, str(page[-1]["_id"])
+        return page, None
+
+    # Reads, with the same arguments and results as their database.py versions
+
+    def get_launches_page(self, limit, after, sort, fields):
+        """One page of launches after the ``after`` cursor, and the next cursor."""
+        launches = self._ordered("launch_reports", sort, "_id")
+        if after:
+            anchor = self._by_id["launch_reports"].get(_object_id(after))
+            if anchor is None:
+                return [], None
+            key = _sort_key(anchor.get(sort), anchor["_id"])
+            launches = [
+                launch
+                for launch in launches
+                if _sort_key(launch.get(sort), launch["_id"]) > key
+            ]
+        return self._page(launches, limit, fields)
+
+    def stream_launches(self, sort, fields) -> List[dict]:
+        """Every launch in ``sort`` order."""
+        launches = self._ordered("launch_reports", sort, "_id")
+        return [_project(launch, fields) for launch in launches]
+
+    def query_launches(self, launch_query, fields):
+        """Launches matching a LaunchQuery, ordered by launch time."""
+        launches = self._ordered(
+            "launch_reports", "launchAt", "_id", reverse=launch_query.descending
+        )
+        matching = [launch for launch in launches if launch_query.matches(launch)]
+        return [_project(launch, fields) for launch in matching[: launch_query.limit]]
+
+    def get_specific_launch(self, launch_id):
+        """The launch with this id string, or None."""
+        return self._by_id["launch_reports"].get(_object_id(launch_id))
+
+    def _launches_by(self, field: str, number, fields):
+        number = _number(number)
+        return [
+            _project(launch, fields)
+            for launch in self._data["launch_reports"]
+            if number is not None and launch.get(field) == number
+        ]
+
+    def get_missions_by_ship(self, ship_number, fields):
+        """Launches flown by this ship."""
+        return self._launches_by("shipNumber", ship_number, fields)
+
+    def get_missions_by_booster(self, booster_number, fields):
+        """Launches flown by this booster."""
+        return self._launches_by("boosterNumber", booster_number, fields)
+
+    def get_missions_by_launch(self, launch_id, fields):
+        """Missions reported for this launch."""
+        return [
+            _project(mission, fields)
+            for mission in self._data["missions"]
+            if mission.get("launch_id") == launch_id
+        ]
+
+    def get_fleet_summary(self):
+        """Boosters and ships, most flown first."""
+        fleet = {"boosters": [], "ships": []}
+        vehicles = sorted(
+            self._data["fleet_summary"],
+            key=lambda vehicle: vehicle.get("flightCount") or 0,
+            reverse=True,
+        )
+        for vehicle in vehicles:
+            vehicle = {k: v for k, v in vehicle.items() if k != "_id"}
+            fleet[f"{vehicle.pop('type')}s"].append(vehicle)
+        return fleet
+
+    def get_news_page(self, limit, before, fields):
+        """One page of news before the ``before`` cursor, and the next cursor."""
+        posts = self._ordered("news_posts", "timestamp", "_id", reverse=True)
+        if before:
+            anchor = self._by_id["news_posts"].get(_object_id(before))
+            if anchor is None:
+                return [], None
+            key = _sort_key(anchor.get("timestamp"), anchor["_id"])
+            posts = [
+                post
+                for post in posts
+                if _sort_key(post.get("timestamp"), post["_id"]) < key
+            ]
+        return self._page(posts, limit, fields)
+
+    def get_newest_news_post(self):
+        """The timestamp of the newest news post, or None."""
+        posts = self._ordered("news_posts", "timestamp", "_id", reverse=True)
+        return _project(posts[0], ("timestamp",)) if posts else None
+
+    def get_specific_news_post(self, post_id):
+        """The news post with this id string, or None."""
+        return self._by_id["news_posts"].get(_object_id(post_id))
+
+
+circuit_breaker = CircuitBreaker()
+snapshot = Snapshot()
+
+
+def mark_served():
+    """Mark the current response as built from the snapshot.
+
+    Called by every request that uses a snapshot read, including those that
+    joined another request's read.
+    """
+    served = _served.get()
+    if served is not None:
+        served["age"] = snapshot.age()
+
+
+async def serve_from_snapshot(read: str, *args):
+    """Answer a read from the snapshot and mark the response as stale.
+
+    Without a snapshot the read finds nothing, which is what it would have
+    returned after timing out, only without the wait.
+    """
+    await snapshot.refresh()
+    snapshot.reads += 1
+    mark_served()
+    return getattr(snapshot, read)(*args)
+
+
+class Snapshotter:
+    """Background task that refreshes the snapshot every SNAPSHOT_INTERVAL."""
+
+    def __init__(self, target: Snapshot, interval: float = SNAPSHOT_INTERVAL):
+        self.target = target
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, dump: Callable[[], AsyncIterator[Tuple[str, List[dict]]]]):
+        """Start snapshotting the collection batches yielded by ``dump``."""
+        if SNAPSHOT_ENABLED and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run(dump))
+
+    async def stop(self):
+        """Stop snapshotting."""
+        await cancel(self._task)
+        self._task = None
+
+    def _recent(self) -> bool:
+        try:
+            age = time.time() - self.target.path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return age < self.interval
+
+    def _claim(self) -> bool:
+        """Take the write lock, unless another process holds it."""
+        lock = self.target.lock_path
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        for _attempt in range(2):
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    # A process that died mid-write leaves its lock behind
+                    if time.time() - lock.stat().st_mtime < self.interval:
+                        return False
+                    lock.unlink()
+                except FileNotFoundError:
+                    pass
+        return False
+
+    async def _run(self, dump):
+        while True:
+            # With several workers, whoever got there first does the work
+            if not circuit_breaker.open and not self._recent() and self._claim():
+                try:
+                    started = time.perf_counter()
+                    counts = await self.target.write(dump())
+                    summary = ", ".join(f"{counts[n]} {n}" for n in COLLECTIONS)
+                    logger.info(
+                        f"Wrote snapshot ({summary}) in "
+                        f"{time.perf_counter() - started:.2f}s"
+                    )
+                except Exception as e:  # pylint: disable=broad-except
+                    logger.error(f"Could not write snapshot: {e}")
+                finally:
+                    self.target.lock_path.unlink(missing_ok=True)
+            await asyncio.sleep(self.interval)
+
+
+snapshotter = Snapshotter(snapshot)
+
+
+class StalenessMiddleware:
+    """Adds X-Snapshot-Age to responses built from snapshot data."""
+
+    def __init__(self, asgi_app):
+        self.app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        served = {}
+        token = _served.set(served)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and "age" in served:
+                age = served["age"]
+                value = "unavailable" if age is None else str(int(age))
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (STALENESS_HEADER, value.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _served.reset(token)
+
+
+registry.register(
+    CallbackMetric(
+        "rocketracker_mongo_circuit_open",
+        "1 while MongoDB is unreachable and reads come from the snapshot.",
+        "gauge",
+        lambda: int(circuit_breaker.open),
+    )
+)
+registry.register(
+    CallbackMetric(
+        "rocketracker_mongo_circuit_trips_total",
+        "Times the MongoDB circuit breaker has opened.",
+        "counter",
+        lambda: circuit_breaker.trips,
+    )
+)
+registry.register(
+    CallbackMetric(
+        "rocketracker_snapshot_reads_total",
+        "Reads answered from the snapshot.",
+        "counter",
+        lambda: snapshot.reads,
+    )
+)
@@ -0,0 +1,17 @@
+"""
+Helpers for the background tasks started in the app's lifespan.
+"""
+
+import asyncio
+from typing import Optional
+
+
+async def cancel(task: Optional[asyncio.Task]):
+    """Cancel a background task, if any, and wait until it has stopped."""
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
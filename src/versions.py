@@ -0,0 +1,87 @@
+"""
+Shared per-collection write counters behind API ETags.
+
+Every save path bumps its collection's counter in MongoDB, and every worker
+polls the counters so a write made elsewhere drops its stale cached reads
+before the new tag is handed out. ``collection_versions`` in src/cache.py
+holds this worker's copy.
+"""
+
+import asyncio
+import os
+from typing import Callable
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from src.cache import CollectionVersions, collection_versions, query_cache
+from src.logconfig import sampled_logger as logger
+from src.snapshot import circuit_breaker
+
+# Seconds between reads of the shared write counters
+VERSION_REFRESH_INTERVAL = float(os.getenv("VERSION_REFRESH_INTERVAL", "1"))
+# Query cache namespaces each collection's documents feed
+CACHE_NAMESPACES = {
+    "launch_reports": ("launch", "launches", "fleet", "ship", "booster"),
+    "missions": ("missions",),
+    "news_posts": ("news", "news_post"),
+}
+
+
+class VersionCounters:
+    """Bumps and polls the counters stored in one MongoDB collection."""
+
+    def __init__(
+        self,
+        get_collection: Callable,
+        versions: CollectionVersions = collection_versions,
+        refresh_interval: float = VERSION_REFRESH_INTERVAL,
+    ):
+        # A callable, like WriteCoalescer's, so the client can be swapped
+        self.get_collection = get_collection
+        self.versions = versions
+        self.refresh_interval = refresh_interval
+
+    async def bump(self, collection_name: str):
+        """Count a write in the shared counter every worker builds ETags from.
+
+        Call it after dropping this worker's cached reads of the collection.
+        """
+        try:
+            counter = await self.get_collection().find_one_and_update(
+                {"_id": collection_name},
+                {"$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except PyMongoError as e:
+            logger.error(f"Database error bumping {collection_name} version: {e}")
+            return
+        # A bigger jump includes other workers' writes, whose stale reads may
+        # still be cached here; the next refresh drops them before catching up
+        if counter["version"] == self.versions.get(collection_name) + 1:
+            self.versions.observe(collection_name, counter["version"])
+
+    async def refresh(self):
+        """Pick up counters bumped by other workers or processes.
+
+        Cached reads of a collection whose counter moved are dropped first, so
+        this worker never tags data older than the version it advertises.
+        """
+        async for counter in self.get_collection().find({}):
+            collection_name = counter["_id"]
+            if counter["version"] > self.versions.get(collection_name):
+                for namespace in CACHE_NAMESPACES.get(collection_name, ()):
+                    await query_cache.invalidate(namespace)
+                self.versions.observe(collection_name, counter["version"])
+        self.versions.loaded = True
+
+    async def watch(self):
+        """Keep the local copy of the counters current. Runs until cancelled."""
+        while True:
+            if not circuit_breaker.open:
+                try:
+                    await self.refresh()
+                except PyMongoError as e:
+                    logger.warning(f"Could not refresh collection versions: {e}")
+            await asyncio.sleep(self.refresh_interval)
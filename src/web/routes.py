@@ -3,13 +3,45 @@
 Web routes for serving HTML pages.
 """
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import HTMLResponse
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from loguru import logger
+from pymongo.errors import PyMongoError
+from ..cache import collection_versions
+from ..database import (
+    get_fleet_summary,
+    get_launch_with_missions,
+    get_missions_by_booster,
+    get_missions_by_ship,
+    get_news_feed,
+)
+from ..feeds import news_feed
+from ..ratelimit import limiter
+from ..snapshot import circuit_breaker
+from .views import views
 
 html_router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+
+
+async def _render(request: Request, name: str, collections: tuple, loader, *args):
+    """Serve a view with its data embedded, or the bare page if that fails.
+
+    Without the data the page's script simply fetches it from the API.
+    Renders are kept until a write to one of ``collections``.
+    """
+
+    async def load():
+        try:
+            return await loader(*args)
+        except PyMongoError as e:
+            logger.error(f"Database error rendering {name}: {e}")
+            return None
+
+    version = collection_versions.etag(*collections)
+    # Snapshot data is not covered by the versions, so it is never kept
+    keep = version is not None and not circuit_breaker.open
+    key = (args, version)
+    return await views.render(request, name, key, load, keep)
 
 
 # Serve index.html
@@ -17,8 +49,7 @@ limiter = Limiter(key_func=get_remote_address)
 @limiter.limit("45/minute")
 async def read_index(request: Request):  # pylint: disable=unused-argument
     """Serve the index page."""
-    with open("views/index.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=200)
+    return views.response(request, "index.html")
 
 
 # Serve reporter.html
@@ -26,8 +57,7 @@ async def read_index(request: Request):  # pylint: disable=unused-argument
 @limiter.limit("45/minute")
 async def read_reporter(request: Request):  # pylint: disable=unused-argument
     """Serve the reporter page."""
-    with open("views/reporter.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=200)
+    return views.response(request, "reporter.html")
 
 
 # Serve viewer page
@@ -35,19 +65,20 @@ async def read_reporter(request: Request):  # pylint: disable=unused-argument
 @limiter.limit("45/minute")
 async def read_viewer(request: Request):  # pylint: disable=unused-argument
     """Serve the viewer page."""
-    with open("views/view.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=200)
+    return views.response(request, "view.html")
 
 
 @html_router.get("/launch/{launch_id}", response_class=HTMLResponse)
 @limiter.limit("45/minute")
-async def launch_page(
-    launch_id: str, request: Request
-):  # pylint: disable=unused-argument
-    """Serve the launch page."""
-    # launch_id is just for routing; JS will extract it from the URL
-    with open("views/launch.html", "r", encoding="utf-8") as f:
-        return HTMLResponse(f.read())
+async def launch_page(launch_id: str, request: Request):
+    """Serve the launch page, with the launch and its missions embedded."""
+    return await _render(
+        request,
+        "launch.html",
+        ("launch_reports", "missions"),
+        get_launch_with_missions,
+        launch_id,
+    )
 
 
 # Serve 404 page
@@ -55,37 +86,39 @@ async def launch_page(
 @limiter.limit("45/minute")
 async def read_404(request: Request):  # pylint: disable=unused-argument
     """Serve the 404 page."""
-    with open("views/404.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=404)
+    return views.response(request, "404.html", status_code=404)
 
 
 # Serve fleet viewer page
 @html_router.get("/fleet", response_class=HTMLResponse)
 @limiter.limit("45/minute")
-async def read_fleet(request: Request):  # pylint: disable=unused-argument
-    """Serve the fleet viewer page."""
-    with open("views/fleet.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=200)
+async def read_fleet(request: Request):
+    """Serve the fleet viewer page, with the fleet summary embedded."""
+    return await _render(request, "fleet.html", ("launch_reports",), get_fleet_summary)
 
 
 # Serve individual booster page
 @html_router.get("/fleet/booster/{booster_id}", response_class=HTMLResponse)
 @limiter.limit("45/minute")
-async def read_booster(
-    booster_id: str, request: Request
-):  # pylint: disable=unused-argument
-    """Serve the individual booster page."""
-    with open("views/booster.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=200)
+async def read_booster(booster_id: str, request: Request):
+    """Serve the individual booster page, with its launches embedded."""
+    return await _render(
+        request,
+        "booster.html",
+        ("launch_reports",),
+        get_missions_by_booster,
+        booster_id,
+    )
 
 
 # Serve individual ship page
 @html_router.get("/fleet/ship/{ship_id}", response_class=HTMLResponse)
 @limiter.limit("45/minute")
-async def read_ship(ship_id: str, request: Request):  # pylint: disable=unused-argument
-    """Serve the individual ship page."""
-    with open("views/ship.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=200)
+async def read_ship(ship_id: str, request: Request):
+    """Serve the individual ship page, with its launches embedded."""
+    return await _render(
+        request, "ship.html", ("launch_reports",), get_missions_by_ship, ship_id
+    )
 
 
 # Serve news page
@@ -93,8 +126,17 @@ async def read_ship(ship_id: str, request: Request):  # pylint: disable=unused-a
 @limiter.limit("45/minute")
 async def read_news(request: Request):  # pylint: disable=unused-argument
     """Serve the news page."""
-    with open("views/news.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=200)
+    return views.response(request, "news.html")
+
+
+# Serve the pre-rendered Atom feed of the latest news
+@html_router.get("/news/feed.xml")
+@limiter.limit("45/minute")
+async def read_news_feed(request: Request):
+    """Serve the news Atom feed."""
+    if await get_news_feed() is None:
+        raise HTTPException(status_code=503, detail="News feed unavailable")
+    return news_feed.response(request)
 
 
 # Serve news reporter page
@@ -102,8 +144,7 @@ async def read_news(request: Request):  # pylint: disable=unused-argument
 @limiter.limit("45/minute")
 async def read_news_reporter(request: Request):  # pylint: disable=unused-argument
     """Serve the news reporter page."""
-    with open("views/newsreporter.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=200)
+    return views.response(request, "newsreporter.html")
 
 
 # Serve mission reporter page
@@ -111,5 +152,4 @@ async def read_news_reporter(request: Request):  # pylint: disable=unused-argume
 @limiter.limit("45/minute")
 async def read_mission_reporter(request: Request):  # pylint: disable=unused-argument
     """Serve the mission reporter page. Where they can report on launches."""
-    with open("views/mission_reporter.html", "r", encoding="utf-8") as file:
-        return HTMLResponse(content=file.read(), status_code=200)
+    return views.response(request, "mission_reporter.html")
@@ -0,0 +1,200 @@
+"""
+In-memory registry of the HTML views.
+
+Pages are read from disk once, together with precompressed gzip and brotli
+bodies and a strong ETag, so handlers never touch the filesystem per request.
+With SSR enabled, pages can also be served with their data embedded as a
+JSON blob, so the browser does not need a second request to show anything.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from loguru import logger
+
+from src.responses import accepted_encodings, dumps
+from src.singleflight import response_flights
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+SSR_ENABLED = os.getenv("SSR", "true").lower() == "true"
+# Rendered pages kept in memory, one per (view, entity, data version)
+MAX_RENDERS = 512
+# Renders are compressed per request burst, so favour speed over ratio
+RENDER_GZIP_LEVEL = 6
+RENDER_BROTLI_QUALITY = 5
+INITIAL_DATA = b'<script id="initial-data" type="application/json">%s</script>\n'
+
+
+@dataclass
+class CachedView:
+    """A view's bytes in every encoding we serve, plus validators."""
+
+    body: bytes
+    gzip_body: bytes
+    br_body: Optional[bytes]
+    digest: str
+    mtime: float
+
+
+def _etag_matches(request: Request, digest: str) -> bool:
+    """Check If-None-Match against the page's ETag, in any encoding."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        if candidate.split("-", 1)[0] == digest:
+            return True
+    return False
+
+
+class ViewRegistry:
+    """Loads views/*.html once and serves them with caching headers."""
+
+    def __init__(self, directory: str = "views", reload: bool = False):
+        self.directory = Path(directory)
+        self.reload = reload
+        # Applied to each page's bytes on load, e.g. to point at hashed assets
+        self.transform: Optional[Callable[[bytes], bytes]] = None
+        self._views: Dict[str, CachedView] = {}
+        self._renders: "OrderedDict[Tuple, CachedView]" = OrderedDict()
+
+    @staticmethod
+    def _compress(
+        body: bytes, mtime: float, gzip_level: int = 9, brotli_quality: int = 11
+    ) -> CachedView:
+        return CachedView(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=gzip_level, mtime=0),
+            br_body=brotli.compress(body, quality=brotli_quality) if brotli else None,
+            digest=hashlib.sha256(body).hexdigest()[:32],
+            mtime=mtime,
+        )
+
+    def _embed(self, view: CachedView, data: Any) -> CachedView:
+        # Escape "<" so the data can never close the script element
+        payload = dumps(data).replace(b"<", b"\\u003c")
+        body = view.body.replace(b"</head>", INITIAL_DATA % payload + b"</head>", 1)
+        return self._compress(
+            body, view.mtime, RENDER_GZIP_LEVEL, RENDER_BROTLI_QUALITY
+        )
+
+    def _load(self, name: str) -> CachedView:
+        path = self.directory / name
+        body = path.read_bytes()
+        if self.transform is not None:
+            body = self.transform(body)
+        view = self._compress(body, path.stat().st_mtime)
+        self._views[name] = view
+        return view
+
+    def load_all(self):
+        """Read and precompress every HTML file in the views directory."""
+        for path in sorted(self.directory.glob("*.html")):
+            self._load(path.name)
+        logger.info(f"Loaded {len(self._views)} views into memory")
+
+    def get(self, name: str) -> CachedView:
+        """Return a cached view, reloading it in dev mode if the file changed."""
+        view = self._views.get(name)
+        if view is None:
+            return self._load(name)
+        if self.reload:
+            if (self.directory / name).stat().st_mtime != view.mtime:
+                logger.info(f"Reloading changed view {name}")
+                return self._load(name)
+        return view
+
+    def response(self, request: Request, name: str, status_code: int = 200) -> Response:
+        """Build the response for a view, honouring ETag and Accept-Encoding."""
+        return self._respond(request, self.get(name), status_code)
+
+    async def render(
+        self,
+        request: Request,
+        name: str,
+        key: Hashable,
+        load: Callable[[], Awaitable[Any]],
+        keep: bool = True,
+    ) -> Response:
+        """Serve a view with the data from ``load`` embedded for its script.
+
+        The page's script reads ``#initial-data`` instead of calling the API.
+        ``key`` names the entity and the version of the data it shows, so a
+        render is reused until a save moves the version on, without loading
+        or hashing the data again. With ``keep`` false the render is not
+        stored. The bare page is served if ``load`` returns None.
+        """
+        if not SSR_ENABLED:
+            return self.response(request, name)
+        view = self.get(name)
+        cache_key = (name, view.digest, key)
+        rendered = self._renders.get(cache_key) if keep else None
+        if rendered is not None:
+            self._renders.move_to_end(cache_key)
+            return self._respond(request, rendered, 200)
+
+        async def build() -> Optional[CachedView]:
+            data = await load()
+            if data is None:
+                return None
+            # Serialising and compressing a big page takes a while; keep the
+            # event loop free meanwhile
+            return await asyncio.to_thread(self._embed, view, data)
+
+        if not keep:
+            # Not shared either, so each response is marked with its staleness
+            rendered = await build()
+            return self._respond(request, rendered or view, 200)
+        rendered = await response_flights.do(f"view:{cache_key!r}", build)
+        if rendered is None:
+            return self._respond(request, view, 200)
+        self._renders[cache_key] = rendered
+        if len(self._renders) > MAX_RENDERS:
+            self._renders.popitem(last=False)
+        return self._respond(request, rendered, 200)
+
+    def _respond(self, request: Request, view: CachedView, status_code: int):
+        headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+        if status_code == 200:
+            headers["ETag"] = f'"{view.digest}"'
+            if _etag_matches(request, view.digest):
+                return Response(status_code=304, headers=headers)
+
+        body, encoding = view.body, None
+        accepted = accepted_encodings(request)
+        if view.br_body is not None and "br" in accepted:
+            body, encoding = view.br_body, "br"
+        elif "gzip" in accepted:
+            body, encoding = view.gzip_body, "gzip"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            if "ETag" in headers:
+                # Each encoding is its own representation, so tag it separately
+                headers["ETag"] = f'"{view.digest}-{encoding}"'
+
+        return Response(
+            content=body,
+            status_code=status_code,
+            headers=headers,
+            media_type="text/html; charset=utf-8",
+        )
+
+
+views = ViewRegistry(reload=os.getenv("DEV", "false").lower() == "true")
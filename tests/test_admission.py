@@ -0,0 +1,155 @@
+"""Tests for src/admission.py."""
+
+import asyncio
+
+from src.admission import (
+    READ,
+    SCAN,
+    WRITE,
+    AdaptiveLimit,
+    AdmissionController,
+    classify,
+)
+
+
+def http_scope(method: str, path: str, query: bytes = b"") -> dict:
+    return {"type": "http", "method": method, "path": path, "query_string": query}
+
+
+def test_classify():
+    assert classify(http_scope("POST", "/api/news/post")) == WRITE
+    assert classify(http_scope("GET", "/api/news")) == READ
+    assert classify(http_scope("GET", "/api/getlaunches")) == SCAN
+    assert classify(http_scope("GET", "/api/getlaunches", b"limit=50")) == READ
+    assert classify(http_scope("GET", "/api/stream")) is None
+    assert classify(http_scope("GET", "/styles/main.css")) is None
+
+
+def test_limit_grows_while_latency_holds_and_slots_are_used():
+    limit = AdaptiveLimit(initial=16, minimum=4, maximum=64)
+    for _ in range(50):
+        limit.update(0.01, in_flight=int(limit.limit))
+    assert limit.limit == 64
+
+
+def test_limit_holds_while_mostly_idle():
+    limit = AdaptiveLimit(initial=16)
+    for _ in range(50):
+        limit.update(0.01, in_flight=2)
+    assert limit.limit == 16
+
+
+def test_limit_shrinks_when_latency_climbs():
+    limit = AdaptiveLimit(initial=64, minimum=8, maximum=512)
+    for _ in range(20):
+        limit.update(0.01, in_flight=64)
+    before = limit.limit
+    for _ in range(50):
+        limit.update(0.5, in_flight=64)
+    assert limit.limit < before
+    assert limit.limit == 8
+
+
+def test_smoothing_sets_how_fast_recent_latency_moves():
+    slow = AdaptiveLimit(smoothing=0.1)
+    fast = AdaptiveLimit(smoothing=0.5)
+    for limit in (slow, fast):
+        limit.update(0.01, in_flight=0)
+        limit.update(0.11, in_flight=0)
+    assert round(slow.recent, 6) == 0.02
+    assert round(fast.recent, 6) == 0.06
+
+
+def controller(limit: int = 2, **kwargs) -> AdmissionController:
+    return AdmissionController(
+        AdaptiveLimit(initial=limit, minimum=1, maximum=limit), **kwargs
+    )
+
+
+def test_requests_over_the_limit_wait_for_a_slot():
+    admission = controller(limit=1, queue_timeout=1.0)
+
+    async def main():
+        assert await admission.acquire(READ)
+        waiting = asyncio.ensure_future(admission.acquire(READ))
+        await asyncio.sleep(0)
+        assert admission.queued() == 1
+        admission.release(READ)
+        return await waiting
+
+    assert asyncio.run(main()) is True
+    assert admission.in_flight == 1
+
+
+def test_writes_are_woken_before_reads():
+    admission = controller(limit=1, queue_timeout=1.0)
+    order = []
+
+    async def wait(priority):
+        await admission.acquire(priority)
+        order.append(priority)
+
+    async def main():
+        await admission.acquire(READ)
+        waiters = [
+            asyncio.ensure_future(wait(READ)),
+            asyncio.ensure_future(wait(WRITE)),
+        ]
+        await asyncio.sleep(0)
+        admission.release(READ)
+        await asyncio.sleep(0)
+        admission.release(WRITE)
+        await asyncio.gather(*waiters)
+
+    asyncio.run(main())
+    assert order == [WRITE, READ]
+
+
+def test_queued_request_is_shed_after_the_timeout():
+    admission = controller(limit=1, queue_timeout=0.01)
+
+    async def main():
+        await admission.acquire(READ)
+        return await admission.acquire(READ)
+
+    assert asyncio.run(main()) is False
+    assert admission.queued() == 0
+
+
+def test_full_queue_sheds_at_once():
+    admission = controller(limit=1, queue_size=1, queue_timeout=1.0)
+
+    async def main():
+        await admission.acquire(WRITE)
+        waiting = asyncio.ensure_future(admission.acquire(WRITE))
+        await asyncio.sleep(0)
+        shed = await admission.acquire(WRITE)
+        waiting.cancel()
+        return shed
+
+    assert asyncio.run(main()) is False
+
+
+def test_scans_only_get_their_share():
+    admission = controller(limit=8, scan_share=0.25)
+
+    async def main():
+        return [await admission.acquire(SCAN) for _ in range(3)]
+
+    assert asyncio.run(main()) == [True, True, False]
+    assert admission.scans == 2
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    admission = controller(limit=1, queue_timeout=1.0)
+
+    async def main():
+        await admission.acquire(READ)
+        waiting = asyncio.ensure_future(admission.acquire(READ))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+
+    asyncio.run(main())
+    assert admission.queued() == 0
+    assert admission.in_flight == 1
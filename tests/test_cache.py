@@ -0,0 +1,178 @@
+"""Tests for src/cache.py."""
+
+import asyncio
+import time
+
+from src.cache import (
+    CollectionVersions,
+    MemoryLRUBackend,
+    QueryCache,
+    no_cache,
+)
+
+
+def make_cache(**kwargs) -> QueryCache:
+    return QueryCache(MemoryLRUBackend(**kwargs), ttl=30.0)
+
+
+def test_lru_evicts_least_recently_used():
+    async def main():
+        backend = MemoryLRUBackend(max_entries=2)
+        await backend.set("a", 1, 30)
+        await backend.set("b", 2, 30)
+        await backend.get("a")
+        await backend.set("c", 3, 30)
+        return [await backend.get(key) for key in "abc"], backend.evictions
+
+    found, evictions = asyncio.run(main())
+    assert found == [(True, 1), (False, None), (True, 3)]
+    assert evictions == 1
+
+
+def test_lru_entries_expire():
+    async def main():
+        backend = MemoryLRUBackend()
+        await backend.set("a", 1, -1)
+        return await backend.get("a"), len(backend)
+
+    assert asyncio.run(main()) == ((False, None), 0)
+
+
+def test_cached_read_is_served_from_cache():
+    cache = make_cache()
+    calls = []
+
+    @cache.cached("launches")
+    async def read(page):
+        calls.append(page)
+        return [page]
+
+    async def main():
+        return await read(1), await read(1), await read(2)
+
+    assert asyncio.run(main()) == ([1], [1], [2])
+    assert calls == [1, 2]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_invalidate_drops_only_its_scope():
+    cache = make_cache()
+    calls = []
+
+    @cache.cached("ship", scope=int)
+    async def read(number):
+        calls.append(number)
+        return number
+
+    async def main():
+        await read("12")
+        await read(35)
+        await cache.invalidate("ship", 12)
+        await read("12")
+        await read(35)
+
+    asyncio.run(main())
+    assert calls == ["12", 35, "12"]
+
+
+def test_concurrent_misses_share_one_query():
+    cache = make_cache()
+    calls = []
+
+    @cache.cached("fleet")
+    async def read():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "fleet"
+
+    async def main():
+        return await asyncio.gather(*(read() for _ in range(5)))
+
+    assert asyncio.run(main()) == ["fleet"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_result_of_invalidated_query_is_not_stored():
+    cache = make_cache()
+    calls = []
+
+    @cache.cached("news")
+    async def read():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main():
+        running = asyncio.ensure_future(read())
+        await asyncio.sleep(0)
+        # A write lands while the first query is still running
+        await cache.invalidate("news")
+        stale = await running
+        return stale, await read()
+
+    assert asyncio.run(main()) == (1, 2)
+
+
+def test_uncached_results_are_not_stored():
+    cache = make_cache()
+    used = []
+
+    @cache.cached("launch")
+    async def read():
+        return no_cache("fallback", on_use=lambda: used.append(1))
+
+    async def main():
+        return await read(), await read()
+
+    assert asyncio.run(main()) == ("fallback", "fallback")
+    assert cache.misses == 2
+    assert len(used) == 2
+
+
+def test_disabled_cache_always_queries():
+    cache = make_cache()
+    cache.enabled = False
+    calls = []
+
+    @cache.cached("launches")
+    async def read():
+        calls.append(1)
+
+    async def main():
+        await read()
+        await read()
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_etag_needs_loaded_versions():
+    versions = CollectionVersions()
+    assert versions.etag("launch_reports") is None
+    versions.loaded = True
+    assert versions.etag("launch_reports") is not None
+
+
+def test_etag_follows_observed_versions():
+    versions = CollectionVersions(max_age=3600)
+    versions.loaded = True
+    before = versions.etag("launch_reports", "missions")
+    versions.observe("missions", 3)
+    after = versions.etag("launch_reports", "missions")
+    assert before != after
+    assert after.endswith('-0-3"')
+    # Older values seen late never move a counter back
+    versions.observe("missions", 2)
+    assert versions.get("missions") == 3
+
+
+def test_etag_rolls_over_with_max_age(monkeypatch):
+    versions = CollectionVersions(max_age=30)
+    versions.loaded = True
+    monkeypatch.setattr(time, "time", lambda: 60.0)
+    first = versions.etag("news_posts")
+    monkeypatch.setattr(time, "time", lambda: 89.0)
+    assert versions.etag("news_posts") == first
+    monkeypatch.setattr(time, "time", lambda: 90.0)
+    assert versions.etag("news_posts") != first
@@ -0,0 +1,203 @@
+"""Tests for src/idempotency.py and src/dedup.py."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from src import dedup
+from src.idempotency import (
+    HASH_FIELD,
+    KEY_FIELD,
+    Duplicate,
+    IdempotencyConflict,
+    RecentSubmissions,
+    content_hash,
+    created_at,
+    expired,
+)
+
+REPORT = {"launchSite": "Starbase", "boosterNumber": 14, "shipNumber": 35}
+
+
+def stored(document: dict, key=None, age: float = 0.0) -> dict:
+    """A stamped copy of a document as the database would hold it."""
+    when = datetime.now(timezone.utc) - timedelta(seconds=age)
+    copy = {**document, "_id": ObjectId.from_datetime(when)}
+    copy[HASH_FIELD] = content_hash(document)
+    if key:
+        copy[KEY_FIELD] = key
+    return copy
+
+
+def stamped(document: dict, key=None) -> dict:
+    """A new submission stamped for deduplication."""
+    copy = {**document, HASH_FIELD: content_hash(document)}
+    if key:
+        copy[KEY_FIELD] = key
+    return copy
+
+
+def test_content_hash_ignores_order_and_server_fields():
+    reordered = dict(reversed(list(REPORT.items())))
+    assert content_hash(reordered) == content_hash(REPORT)
+    assert content_hash({**REPORT, "_id": ObjectId(), "timestamp": 1}) == (
+        content_hash(REPORT)
+    )
+    assert content_hash({**REPORT, "shipNumber": 36}) != content_hash(REPORT)
+
+
+def test_content_hash_does_not_depend_on_time(monkeypatch):
+    first = content_hash(REPORT)
+    monkeypatch.setattr(time, "time", lambda: time.monotonic() + 10**9)
+    assert content_hash(REPORT) == first
+
+
+def test_created_at_reads_the_object_id():
+    when = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert created_at(ObjectId.from_datetime(when)) == when.timestamp()
+
+
+def test_expired_counts_from_when_the_copy_was_stored():
+    old = stored(REPORT, age=120)["_id"]
+    assert expired(old, ttl=60)
+    assert not expired(old, ttl=300)
+    # Ids that carry no timestamp are treated as just stored
+    assert not expired("custom-id", ttl=60)
+
+
+def test_recent_hash_match_is_a_duplicate():
+    recent = RecentSubmissions()
+    copy = stored(REPORT)
+    recent.remember("launch_reports", copy)
+    assert recent.check("launch_reports", stamped(REPORT)) == Duplicate(copy["_id"])
+    assert recent.check("missions", stamped(REPORT)) is None
+
+
+def test_key_of_a_content_match_is_recorded():
+    recent = RecentSubmissions()
+    copy = stored(REPORT)
+    recent.remember("launch_reports", copy)
+    duplicate = recent.check("launch_reports", stamped(REPORT, key="k1"))
+    assert duplicate == Duplicate(copy["_id"], new_key="k1")
+    # The key now belongs to that content
+    with pytest.raises(IdempotencyConflict):
+        recent.check("launch_reports", stamped({**REPORT, "shipNumber": 36}, "k1"))
+
+
+def test_key_reused_for_other_content_conflicts():
+    recent = RecentSubmissions()
+    recent.remember("launch_reports", stored(REPORT, key="k1"))
+    with pytest.raises(IdempotencyConflict):
+        recent.check("launch_reports", stamped({**REPORT, "shipNumber": 36}, "k1"))
+
+
+def test_recent_entries_expire_by_object_id_age():
+    recent = RecentSubmissions(ttl=60)
+    recent.remember("launch_reports", stored(REPORT, key="k1", age=30))
+    assert recent.check("launch_reports", stamped(REPORT)) is not None
+    recent.clear()
+    # Stored just over the window ago, however recently this worker saw it
+    recent.remember("launch_reports", stored(REPORT, key="k1", age=61))
+    assert recent.check("launch_reports", stamped(REPORT, key="k1")) is None
+    assert len(recent) == 0
+
+
+def test_forget_drops_every_entry_of_a_document():
+    recent = RecentSubmissions()
+    copy = stored(REPORT, key="k1")
+    recent.remember("launch_reports", copy)
+    assert len(recent) == 2
+    recent.forget("launch_reports", copy["_id"])
+    assert len(recent) == 0
+
+
+def test_recent_submissions_are_bounded():
+    recent = RecentSubmissions(max_entries=2)
+    for ship in range(3):
+        recent.remember("launch_reports", stored({**REPORT, "shipNumber": ship}))
+    assert len(recent) == 2
+    assert recent.check("launch_reports", stamped({**REPORT, "shipNumber": 0})) is None
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for the lookups in src/dedup.py."""
+
+    def __init__(self, name: str, *documents: dict):
+        self.name = name
+        self.documents = [dict(document) for document in documents]
+
+    @staticmethod
+    def _matches(document: dict, query: dict) -> bool:
+        for field, condition in query.items():
+            if isinstance(condition, dict) and "$exists" in condition:
+                if (field in document) != condition["$exists"]:
+                    return False
+            elif document.get(field) != condition:
+                return False
+        return True
+
+    async def find_one(self, query: dict, _projection=None):
+        for document in self.documents:
+            if self._matches(document, query):
+                return dict(document)
+        return None
+
+    async def update_one(self, query: dict, update: dict):
+        for document in self.documents:
+            if self._matches(document, query):
+                document.update(update.get("$set", {}))
+                for field in update.get("$unset", {}):
+                    document.pop(field, None)
+                return
+
+
+@pytest.fixture(autouse=True)
+def fresh_recent_submissions(monkeypatch):
+    monkeypatch.setattr(dedup, "recent_submissions", RecentSubmissions())
+
+
+def test_stored_content_match_records_the_key():
+    copy = stored(REPORT)
+    target = FakeCollection("launch_reports", copy)
+    duplicate = asyncio.run(dedup.find_duplicate(target, stamped(REPORT, "k1")))
+    assert duplicate == Duplicate(copy["_id"], new_key="k1")
+    assert target.documents[0][KEY_FIELD] == "k1"
+    # Another worker reusing the key for other content now conflicts
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(
+            dedup.find_duplicate(target, stamped({**REPORT, "shipNumber": 36}, "k1"))
+        )
+
+
+def test_stored_copy_keeps_its_own_key():
+    copy = stored(REPORT, key="k1")
+    target = FakeCollection("launch_reports", copy)
+    asyncio.run(dedup.find_duplicate(target, stamped(REPORT, "k2")))
+    assert target.documents[0][KEY_FIELD] == "k1"
+
+
+def test_stored_key_with_other_content_conflicts():
+    target = FakeCollection("launch_reports", stored(REPORT, key="k1"))
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(
+            dedup.find_duplicate(target, stamped({**REPORT, "shipNumber": 36}, "k1"))
+        )
+
+
+def test_expired_copy_gives_way(monkeypatch):
+    monkeypatch.setattr(dedup, "expired", lambda doc_id: expired(doc_id, ttl=60))
+    target = FakeCollection("launch_reports", stored(REPORT, key="k1", age=61))
+    assert asyncio.run(dedup.find_duplicate(target, stamped(REPORT, "k1"))) is None
+    assert HASH_FIELD not in target.documents[0]
+    assert KEY_FIELD not in target.documents[0]
+
+
+def test_copy_inside_the_window_still_counts(monkeypatch):
+    monkeypatch.setattr(dedup, "expired", lambda doc_id: expired(doc_id, ttl=60))
+    copy = stored(REPORT, age=59)
+    target = FakeCollection("launch_reports", copy)
+    duplicate = asyncio.run(dedup.find_duplicate(target, stamped(REPORT)))
+    assert duplicate == Duplicate(copy["_id"])
@@ -0,0 +1,158 @@
+"""Tests for src/search.py."""
+
+import asyncio
+
+from bson import ObjectId
+from pymongo.errors import ServerSelectionTimeoutError
+
+from src import search
+from src.search import SearchIndex, indexed_fields, tokenize
+
+
+def news(title: str, author: str = "staff", content: str = "") -> dict:
+    return {"_id": ObjectId(), "title": title, "author": author, "content": content}
+
+
+def launch(booster: int, ship: int, site: str = "Starbase") -> dict:
+    return {
+        "_id": ObjectId(),
+        "boosterNumber": booster,
+        "shipNumber": ship,
+        "launchSite": site,
+    }
+
+
+def built(*documents) -> SearchIndex:
+    index = SearchIndex()
+    for doc_type, document in documents:
+        index.add(doc_type, document)
+    index.mark_ready()
+    return index
+
+
+def ids(results) -> list:
+    return [result["id"] for result in results]
+
+
+def test_tokenize():
+    assert tokenize("Starship Flight-7!") == ["starship", "flight", "7"]
+    assert tokenize(None) == []
+    assert tokenize(14) == ["14"]
+
+
+def test_every_query_token_must_match():
+    first = news("Starship flight seven")
+    second = news("Starship static fire")
+    index = built(("news", first), ("news", second))
+    assert ids(index.search("starship flight")) == [str(first["_id"])]
+    assert index.search("falcon") == []
+    assert index.search("") == []
+
+
+def test_prefix_matches_rank_below_full_matches():
+    full = news("Booster catch")
+    partial = news("Catching the booster")
+    index = built(("news", full), ("news", partial))
+    assert ids(index.search("catch")) == [str(full["_id"]), str(partial["_id"])]
+
+
+def test_heavier_fields_rank_higher():
+    in_title = news("Raptor engines", content="update")
+    in_content = news("Update", content="raptor engines")
+    index = built(("news", in_content), ("news", in_title))
+    assert ids(index.search("raptor"))[0] == str(in_title["_id"])
+
+
+def test_vehicles_match_by_their_usual_names():
+    flight = launch(booster=14, ship=35)
+    index = built(("launch", flight))
+    assert ids(index.search("B14")) == [str(flight["_id"])]
+    assert ids(index.search("s35")) == [str(flight["_id"])]
+    assert index.search("b35") == []
+
+
+def test_search_by_type_and_limit():
+    post = news("Starbase update")
+    flight = launch(booster=14, ship=35, site="Starbase")
+    index = built(("news", post), ("launch", flight))
+    assert ids(index.search("starbase", doc_type="launch")) == [str(flight["_id"])]
+    assert len(index.search("starbase", limit=1)) == 1
+
+
+def test_reindexing_replaces_a_document():
+    post = news("Static fire")
+    index = built(("news", post))
+    index.add("news", {**post, "title": "Wet dress rehearsal"})
+    assert index.search("static") == []
+    assert len(index.search("rehearsal")) == 1
+    assert len(index) == 1
+
+
+def test_remove_forgets_terms():
+    post = news("Static fire")
+    index = built(("news", post), ("news", news("Static test")))
+    index.remove("news", post["_id"])
+    assert len(index.search("static")) == 1
+    assert index.search("fire") == []
+    assert index.search("fi") == []
+
+
+def test_documents_added_after_the_build_are_found_by_prefix():
+    index = built(("news", news("Alpha")))
+    later = news("Zulu")
+    index.add("news", later)
+    assert ids(index.search("zu")) == [str(later["_id"])]
+
+
+def test_disabled_index_stays_empty():
+    index = SearchIndex(enabled=False)
+    index.add("news", news("Starship"))
+    assert len(index) == 0
+
+
+class FakeCursor:
+    def __init__(self, documents, error=None):
+        self.documents = documents
+        self.error = error
+
+    def batch_size(self, _size):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+        if self.error:
+            raise self.error
+
+
+class FakeCollection:
+    def __init__(self, *documents, error=None):
+        self.documents = documents
+        self.error = error
+        self.projections = []
+
+    def find(self, _query, projection):
+        self.projections.append(projection)
+        return FakeCursor(self.documents, self.error)
+
+
+def test_build_loads_every_source(monkeypatch):
+    index = SearchIndex()
+    monkeypatch.setattr(search, "search_index", index)
+    posts = FakeCollection(news("Starship flight"))
+    launches = FakeCollection(launch(booster=14, ship=35))
+    assert asyncio.run(search.build_search_index({"news": posts, "launch": launches}))
+    assert index.ready
+    assert len(index) == 2
+    assert set(posts.projections[0]) == set(indexed_fields("news"))
+
+
+def test_failed_build_is_not_marked_ready(monkeypatch):
+    index = SearchIndex()
+    monkeypatch.setattr(search, "search_index", index)
+    failing = FakeCollection(news("Starship"), error=ServerSelectionTimeoutError())
+    assert not asyncio.run(search.build_search_index({"news": failing}))
+    assert not index.ready
@@ -0,0 +1,109 @@
+"""Tests for src/singleflight.py."""
+
+import asyncio
+
+import pytest
+
+from src.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    runs = []
+
+    async def load():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", load) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert len(runs) == 1
+    assert (flights.calls, flights.merged) == (1, 4)
+    assert len(flights) == 0
+
+
+def test_exception_reaches_every_caller():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            flights.do("key", fail), flights.do("key", fail), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_distinct_keys_run_separately():
+    flights = SingleFlight()
+
+    async def main():
+        async def load(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        return await asyncio.gather(
+            flights.do("a", lambda: load(1)), flights.do("b", lambda: load(2))
+        )
+
+    assert asyncio.run(main()) == [1, 2]
+    assert flights.calls == 2
+
+
+def test_forget_starts_a_fresh_call():
+    flights = SingleFlight()
+    runs = []
+
+    async def load():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return len(runs)
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("news:1", load))
+        await asyncio.sleep(0)
+        flights.forget("news:")
+        second = await flights.do("news:1", load)
+        return await first, second
+
+    assert asyncio.run(main()) == (2, 2)
+    assert len(runs) == 2
+
+
+def test_is_current_false_once_forgotten():
+    flights = SingleFlight()
+    seen = []
+
+    async def load():
+        seen.append(flights.is_current("key"))
+        flights.forget()
+        seen.append(flights.is_current("key"))
+
+    asyncio.run(flights.do("key", load))
+    assert seen == [True, False]
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flights = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def main():
+        leaving = asyncio.ensure_future(flights.do("key", load))
+        staying = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(main()) == "value"